@@ -17,6 +17,10 @@ def create_app():
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
+
+    from app.services.sqlite_tuning import init_sqlite_tuning
+    init_sqlite_tuning(app, db)
+
     login_manager.init_app(app)
     login_manager.login_view = "auth.login_trainer"
     login_manager.login_message_category = "warning"
@@ -42,6 +46,12 @@ def create_app():
     app.register_blueprint(member_bp)
     app.register_blueprint(template_bp)
 
+    from app.services.perf import init_perf
+    init_perf(app)
+
+    from app.services.food_search import init_food_search
+    init_food_search(app)
+
     @app.context_processor
     def inject_theme_mode():
         mode = session.get("theme_mode")
@@ -2,6 +2,7 @@ from app import db, login_manager
 from datetime import datetime
 import string, random
 from flask_login import UserMixin
+from sqlalchemy import event, inspect
 import pytz
 
 class User(db.Model, UserMixin):
@@ -30,7 +31,7 @@ class User(db.Model, UserMixin):
     macro_ratio_fats = db.Column(db.Float, nullable=True)
 
     # 🔹 Link each member to a trainer
-    trainer_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    trainer_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True, index=True)
 
     # Profile details for nutrition goals
     gender = db.Column(db.String(20), nullable=True)
@@ -89,10 +90,27 @@ class Food(db.Model):
     protein_g = db.Column(db.Float)
     carbs_g = db.Column(db.Float)
     fats_g = db.Column(db.Float)
-    source_id = db.Column(db.String(100))
+    source_id = db.Column(db.String(100), index=True)
     serving_size = db.Column(db.Float)
     serving_unit = db.Column(db.String(50))
     grams_per_unit = db.Column(db.Float)
+    # Digest of the normalized USDA payload (macros + portions); see app.services.usda_import.
+    content_hash = db.Column(db.String(32))
+    # Nutrients per gram with the calorie rules of scale_food_nutrients already
+    # applied, so totals are just SUM(grams * density). Kept current by the
+    # listener below and by the USDA bulk loader.
+    calories_per_g = db.Column(db.Float)
+    protein_per_g = db.Column(db.Float)
+    carbs_per_g = db.Column(db.Float)
+    fats_per_g = db.Column(db.Float)
+
+
+@event.listens_for(Food, "before_insert")
+@event.listens_for(Food, "before_update")
+def _store_food_densities(mapper, connection, target):
+    from app.services.nutrition import nutrient_densities
+    for column, value in nutrient_densities(target).items():
+        setattr(target, column, value)
 
 # Make sure this is defined somewhere
 UNIT_TO_GRAMS = {
@@ -122,11 +140,16 @@ UNIT_TO_GRAMS = {
 }
 
 class UserFoodLog(db.Model):
+    __table_args__ = (db.Index('ix_user_food_log_user_date', 'user_id', 'log_date'),)
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     food_id = db.Column(db.Integer, db.ForeignKey("food.id"), nullable=False)
     quantity = db.Column(db.Float, nullable=False)
     unit = db.Column(db.String(20), default="g")  # <--- add this column
+    # Quantity resolved to grams when the row is written, so aggregations never
+    # have to look up FoodMeasure rows per log.
+    quantity_grams = db.Column(db.Float, nullable=True)
     log_date = db.Column(db.Date, default=datetime.utcnow)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -134,15 +157,25 @@ class UserFoodLog(db.Model):
 
     def quantity_in_grams(self):
         """Convert the logged quantity to grams based on the unit."""
+        if self.quantity_grams is not None:
+            return self.quantity_grams
+        return self._resolve_quantity_grams(db.session.connection())
+
+    def _resolve_quantity_grams(self, connection):
         quantity = self.quantity or 0
         unit = (self.unit or "g").lower()
 
         if unit == "g":
             return quantity
         
-        measure = FoodMeasure.query.filter_by(food_id=self.food_id, measure_name=unit).first()
-        if measure:
-            return quantity * measure.grams
+        measure_grams = connection.execute(
+            db.select(FoodMeasure.grams)
+            .where(FoodMeasure.food_id == self.food_id, FoodMeasure.measure_name == unit)
+            .order_by(FoodMeasure.id)
+            .limit(1)
+        ).scalar()
+        if measure_grams:
+            return quantity * measure_grams
         
         grams_per_unit = UNIT_TO_GRAMS.get(unit)
         if grams_per_unit:
@@ -164,6 +197,116 @@ class UserFoodLog(db.Model):
         }
 
 
+@event.listens_for(UserFoodLog, "before_insert")
+@event.listens_for(UserFoodLog, "before_update")
+def _store_log_quantity_grams(mapper, connection, target):
+    state = inspect(target)
+    changed = any(
+        state.attrs[name].history.has_changes()
+        for name in ("quantity", "unit", "food_id")
+    )
+    if target.quantity_grams is None or changed:
+        target.quantity_grams = target._resolve_quantity_grams(connection)
+
+
+class DailyNutritionTotal(db.Model):
+    """Per-day nutrition totals for a user, maintained as food logs come and go."""
+    __tablename__ = 'daily_nutrition_totals'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    calories = db.Column(db.Float, nullable=False, default=0.0)
+    protein_g = db.Column(db.Float, nullable=False, default=0.0)
+    carbs_g = db.Column(db.Float, nullable=False, default=0.0)
+    fats_g = db.Column(db.Float, nullable=False, default=0.0)
+    log_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+def _log_day(value):
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def _log_contribution(connection, food_id, grams):
+    densities = connection.execute(
+        db.select(
+            Food.calories_per_g,
+            Food.protein_per_g,
+            Food.carbs_per_g,
+            Food.fats_per_g,
+        ).where(Food.id == food_id)
+    ).first()
+    grams = grams or 0.0
+    return {
+        key: grams * ((densities[index] or 0.0) if densities else 0.0)
+        for index, key in enumerate(("calories", "protein", "carbs", "fats"))
+    }
+
+
+def _apply_daily_totals_delta(connection, user_id, day, food_id, grams, sign):
+    day = _log_day(day)
+    if user_id is None or day is None:
+        return
+    scaled = _log_contribution(connection, food_id, grams)
+    values = {
+        "calories": sign * scaled["calories"],
+        "protein_g": sign * scaled["protein"],
+        "carbs_g": sign * scaled["carbs"],
+        "fats_g": sign * scaled["fats"],
+    }
+    table = DailyNutritionTotal.__table__
+    result = connection.execute(
+        table.update()
+        .where(table.c.user_id == user_id, table.c.date == day)
+        .values(
+            log_count=table.c.log_count + sign,
+            **{name: table.c[name] + value for name, value in values.items()},
+        )
+    )
+    if result.rowcount == 0 and sign > 0:
+        connection.execute(
+            table.insert().values(user_id=user_id, date=day, log_count=1, **values)
+        )
+
+
+@event.listens_for(UserFoodLog, "after_insert")
+def _daily_totals_log_added(mapper, connection, target):
+    _apply_daily_totals_delta(
+        connection, target.user_id, target.log_date, target.food_id, target.quantity_grams, 1
+    )
+
+
+@event.listens_for(UserFoodLog, "after_delete")
+def _daily_totals_log_removed(mapper, connection, target):
+    _apply_daily_totals_delta(
+        connection, target.user_id, target.log_date, target.food_id, target.quantity_grams, -1
+    )
+
+
+@event.listens_for(UserFoodLog, "after_update")
+def _daily_totals_log_changed(mapper, connection, target):
+    state = inspect(target)
+    tracked = ("user_id", "log_date", "food_id", "quantity_grams")
+    if not any(state.attrs[name].history.has_changes() for name in tracked):
+        return
+
+    def _previous(name):
+        history = state.attrs[name].history
+        return history.deleted[0] if history.deleted else getattr(target, name)
+
+    _apply_daily_totals_delta(
+        connection,
+        _previous("user_id"),
+        _previous("log_date"),
+        _previous("food_id"),
+        _previous("quantity_grams"),
+        -1,
+    )
+    _daily_totals_log_added(mapper, connection, target)
+
+
 class TrainerMeal(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     trainer_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -228,6 +371,8 @@ class MemberMealIngredient(db.Model):
 
     food = db.relationship('Food')
 class Progress(db.Model):
+    __table_args__ = (db.Index('ix_progress_user_date', 'user_id', 'date'),)
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     date = db.Column(db.DateTime, nullable=False)
@@ -235,6 +380,8 @@ class Progress(db.Model):
     notes = db.Column(db.Text, nullable=True)
 
 class FoodMeasure(db.Model):
+    __table_args__ = (db.Index('ix_food_measure_food_name', 'food_id', 'measure_name'),)
+
     id = db.Column(db.Integer, primary_key=True)
     food_id = db.Column(db.Integer, db.ForeignKey('food.id'))
     measure_name = db.Column(db.String(50))  # "cup", "tbsp", "tsp", "slice"
@@ -243,6 +390,34 @@ class FoodMeasure(db.Model):
     food = db.relationship("Food", backref="measures")
 
 
+class UsdaImportState(db.Model):
+    """Checkpoint of a USDA FoodData Central file import, one row per file."""
+    __tablename__ = 'usda_import_state'
+
+    id = db.Column(db.Integer, primary_key=True)
+    file_name = db.Column(db.String(255), unique=True, nullable=False)
+    # Size and mtime identify the exact download a checkpoint belongs to.
+    file_size = db.Column(db.BigInteger, nullable=False)
+    file_mtime = db.Column(db.Float, nullable=False)
+    byte_offset = db.Column(db.BigInteger, nullable=False, default=0)
+    record_index = db.Column(db.Integer, nullable=False, default=0)
+    status = db.Column(db.String(20), nullable=False, default='running')  # running | complete
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class CatalogVersion(db.Model):
+    """Version counter for a reference catalog, bumped whenever its rows change.
+
+    Workers cache catalogs in memory and reload them when the version moves.
+    """
+    __tablename__ = 'catalog_version'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), unique=True, nullable=False)  # e.g. "exercise_catalog"
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 # -----------------------------
 # Exercise Planner Models
 # -----------------------------
@@ -287,6 +462,8 @@ class ExerciseCatalog(db.Model):
 
 
 class AssignedTemplate(db.Model):
+    __table_args__ = (db.Index('ix_assigned_template_template_member', 'template_id', 'member_id'),)
+
     id = db.Column(db.Integer, primary_key=True)
     template_id = db.Column(db.Integer, db.ForeignKey('exercise_template.id'), nullable=False)
     trainer_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -299,6 +476,8 @@ class AssignedTemplate(db.Model):
 
 
 class WorkoutSession(db.Model):
+    __table_args__ = (db.Index('ix_workout_session_user_started', 'user_id', 'started_at'),)
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     template_id = db.Column(db.Integer, db.ForeignKey('exercise_template.id'))
@@ -313,6 +492,8 @@ class WorkoutSession(db.Model):
 
 
 class WorkoutSet(db.Model):
+    __table_args__ = (db.Index('ix_workout_set_session_id', 'session_id'),)
+
     id = db.Column(db.Integer, primary_key=True)
     session_id = db.Column(db.Integer, db.ForeignKey('workout_session.id'), nullable=False)
     template_exercise_id = db.Column(db.Integer, db.ForeignKey('template_exercise.id'))
@@ -325,6 +506,8 @@ class WorkoutSet(db.Model):
 
 
 class Message(db.Model):
+    __table_args__ = (db.Index('ix_message_client_read', 'client_id', 'read_at'),)
+
     id = db.Column(db.Integer, primary_key=True)
     trainer_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     client_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -12,9 +12,12 @@ from app.models import (
     MemberMeal,
     MemberMealIngredient,
     Message,
+    DailyNutritionTotal,
 )
 from app.services.nutrition import (
     scale_food_nutrients,
+    scale_foods_nutrients,
+    measure_grams_for_foods,
     calculate_meal_macros,
     group_meals_by_slot,
     serialize_meal,
@@ -22,15 +25,18 @@ from app.services.nutrition import (
     derive_macro_targets,
     MEAL_SLOT_LABELS,
 )
+from app.services.food_search import find_foods, best_food_match
+from app.services.food_autocomplete import autocomplete_food_ids
+from app.services.daily_totals import get_daily_totals, get_totals_between
+from app.services.charts import weight_trend_series, weekly_workout_series
 from sqlalchemy import or_, and_, func
+from sqlalchemy.orm import joinedload, selectinload
 from flask_login import current_user, login_required, logout_user
 from datetime import datetime, date, timedelta, timezone
 from collections import Counter, defaultdict
 from typing import Dict, Optional
 import math
 import calendar as _calendar
-import pandas as pd
-import plotly.graph_objs as go
 from zoneinfo import ZoneInfo
 
 member_bp = Blueprint('member', __name__, url_prefix='/member')
@@ -68,6 +74,75 @@ def _week_start_sunday(value: date) -> date:
     return value - timedelta(days=(value.weekday() + 1) % 7)
 
 
+def _utc_bounds(start: date, end: date):
+    """Naive UTC datetimes covering Eastern-local days ``start`` through ``end``."""
+    window_start = datetime.combine(start, datetime.min.time(), tzinfo=EASTERN_TZ)
+    window_end = datetime.combine(end + timedelta(days=1), datetime.min.time(), tzinfo=EASTERN_TZ)
+    return (
+        window_start.astimezone(timezone.utc).replace(tzinfo=None),
+        window_end.astimezone(timezone.utc).replace(tzinfo=None),
+    )
+
+
+def _calendar_window(user_id: int, start: date, end: date) -> dict:
+    """Collect weights, nutrition totals and workouts for an inclusive date range.
+
+    Runs one ranged query per data type regardless of how many days are shown
+    or how much history the user has.
+    """
+    utc_start, utc_end = _utc_bounds(start, end)
+
+    weights = {}
+    weight_rows = (
+        Progress.query
+        .filter(Progress.user_id == user_id)
+        .filter(Progress.date >= utc_start, Progress.date < utc_end)
+        .order_by(Progress.id.asc())
+        .all()
+    )
+    for entry in weight_rows:
+        day = _eastern_date(entry.date)
+        if day is None or not (start <= day <= end):
+            continue
+        # latest entry for the day wins
+        weights[day] = float(entry.weight) if entry.weight is not None else None
+
+    nutrition = {}
+    total_rows = (
+        DailyNutritionTotal.query
+        .filter(DailyNutritionTotal.user_id == user_id)
+        .filter(DailyNutritionTotal.date >= start, DailyNutritionTotal.date <= end)
+        .all()
+    )
+    for row in total_rows:
+        if not row.log_count:
+            continue
+        nutrition[row.date] = {
+            "calories": row.calories or 0.0,
+            "protein": row.protein_g or 0.0,
+            "carbs": row.carbs_g or 0.0,
+            "fats": row.fats_g or 0.0,
+        }
+
+    workouts = {}
+    session_time = func.coalesce(WorkoutSession.completed_at, WorkoutSession.started_at)
+    session_rows = (
+        WorkoutSession.query
+        .options(joinedload(WorkoutSession.template))
+        .filter(WorkoutSession.user_id == user_id)
+        .filter(session_time >= utc_start, session_time < utc_end)
+        .order_by(WorkoutSession.started_at.desc())
+        .all()
+    )
+    for sess in session_rows:
+        day = _eastern_date(sess.completed_at or sess.started_at)
+        if day is None or not (start <= day <= end):
+            continue
+        workouts.setdefault(day, []).append(sess)
+
+    return {"weights": weights, "nutrition": nutrition, "workouts": workouts}
+
+
 def _user_macro_targets(user: User) -> Dict[str, Optional[float]]:
     calorie_target = (
         user.custom_calorie_target
@@ -224,7 +299,7 @@ def dashboard():
         # If user just types a name and clicks Add → use top match
         # -----------------------------
         if not food_id and search_query:
-            top_result = Food.query.filter(Food.name.ilike(f"%{search_query}%")).first()
+            top_result = best_food_match(search_query)
             if top_result:
                 food_id = top_result.id
 
@@ -273,7 +348,7 @@ def dashboard():
         # Search foods without adding
         # -----------------------------
         elif search_query:
-            search_results = Food.query.filter(Food.name.ilike(f"%{search_query}%")).limit(10).all()
+            search_results = find_foods(search_query, limit=10)
             if not search_results:
                 flash("No matching foods found.", "warning")
         else:
@@ -282,7 +357,12 @@ def dashboard():
     # -----------------------------
     # Fetch today's logs + compute totals (default view)
     # -----------------------------
-    user_food_logs = UserFoodLog.query.filter_by(user_id=user.id, log_date=today).all()
+    user_food_logs = (
+        UserFoodLog.query
+        .options(joinedload(UserFoodLog.food))
+        .filter_by(user_id=user.id, log_date=today)
+        .all()
+    )
     totals = _calculate_daily_totals(user.id, today)
     macro_targets = _user_macro_targets(user)
     calorie_goal_value = macro_targets["calories"] or user.calorie_goal or 2000
@@ -338,13 +418,6 @@ def dashboard():
     selected_food_fats = None
     selected_workouts = []
 
-    workout_sessions = (
-        WorkoutSession.query
-        .filter_by(user_id=user.id)
-        .order_by(WorkoutSession.started_at.desc())
-        .all()
-    )
-
     if view == 'calendar':
         # default to current month if not provided
         if not cal_year or not cal_month:
@@ -357,20 +430,15 @@ def dashboard():
         except Exception:
             selected_date = today
 
-        workout_map = {}
-        for sess in workout_sessions:
-            dt_value = getattr(sess, 'completed_at', None) or getattr(sess, 'started_at', None)
-            if not dt_value:
-                continue
-            try:
-                day = _eastern_date(dt_value)
-            except Exception:
-                day = None
-            if not day:
-                continue
-            workout_map.setdefault(day, []).append(sess)
+        month_start = date(cal_year, cal_month, 1)
+        month_end = date(cal_year, cal_month, _calendar.monthrange(cal_year, cal_month)[1])
+        window = _calendar_window(user.id, month_start, month_end)
+        if not (month_start <= selected_date <= month_end):
+            window_selected = _calendar_window(user.id, selected_date, selected_date)
+        else:
+            window_selected = window
 
-        def _build_calendar_weeks(year, month, user_obj):
+        def _build_calendar_weeks(year, month):
             weeks = []
             cal = _calendar.Calendar(firstweekday=6)  # start on Sunday
             for week in cal.monthdatescalendar(year, month):
@@ -381,173 +449,64 @@ def dashboard():
                         week_list.append({'iso': '', 'day': '', 'in_month': False, 'data': None})
                         continue
 
-                    iso = d.strftime('%Y-%m-%d')
-
-                    # weight: pick most-recent Progress/WeightLog entry for that date
-                    weight_val = None
-                    try:
-                        # compute per-macro totals for selected day
-                        rows = Progress.query.filter_by(user_id=user_obj.id).all()
-                        day_rows = []
-                        for r in rows:
-                            dt = getattr(r, 'date', None) or getattr(r, 'log_date', None)
-                            compare_date = _eastern_date(dt)
-                            match = (compare_date == d)
-                            if match:
-                                day_rows.append(r)
-                        if day_rows:
-                            def _ord_key(x):
-                                return getattr(x, 'created_at', None) or getattr(x, 'id', 0)
-                            weight_entry = max(day_rows, key=_ord_key)
-                            weight_val = float(getattr(weight_entry, 'weight')) if getattr(weight_entry, 'weight', None) is not None else None
-                    except Exception:
-                        weight_val = None
-
-                    # food calories: sum UserFoodLog.quantity (grams) scaled by food.calories per serving
-                    food_calories = None
-                    try:
-                        # robust per-row date matching (support Date and DateTime columns)
-                        all_fls = UserFoodLog.query.filter_by(user_id=user_obj.id).all()
-                        fls = []
-                        for f in all_fls:
-                            dt = getattr(f, 'date', None) or getattr(f, 'log_date', None)
-                            compare_date = _eastern_date(dt)
-                            match = (compare_date == d)
-                            if match:
-                                fls.append(f)
-
-                        if fls:
-                            total_cals = 0.0
-                            total_protein = 0.0
-                            total_carbs = 0.0
-                            total_fats = 0.0
-                            for fl in fls:
-                                if getattr(fl, 'food', None):
-                                    grams_logged = fl.quantity_in_grams() if hasattr(fl, 'quantity_in_grams') else getattr(fl, 'quantity', 0)
-                                    scaled = scale_food_nutrients(fl.food, grams_logged)
-                                    total_cals += scaled["calories"]
-                                    total_protein += scaled["protein"]
-                                    total_carbs += scaled["carbs"]
-                                    total_fats += scaled["fats"]
-
-                            food_calories = round(total_cals, 1) if total_cals else None
-                            food_protein = round(total_protein, 1) if total_protein else None
-                            food_carbs = round(total_carbs, 1) if total_carbs else None
-                            food_fats = round(total_fats, 1) if total_fats else None
-                        else:
-                            food_calories = None
-                            food_protein = None
-                            food_carbs = None
-                            food_fats = None
-                    except Exception:
-                        food_calories = None
-                        items = []
-
-                    workouts_for_day = []
-                    for sess in workout_map.get(d, []):
-                        workouts_for_day.append({
+                    food = None
+                    totals = window["nutrition"].get(d)
+                    if totals:
+                        rounded = {
+                            key: (round(totals[key], 1) if totals[key] else None)
+                            for key in ("calories", "protein", "carbs", "fats")
+                        }
+                        if any(rounded.values()):
+                            food = rounded
+
+                    workouts_for_day = [
+                        {
                             'id': sess.id,
-                            'template': sess.template.name if getattr(sess, 'template', None) else None,
+                            'template': sess.template.name if sess.template else None,
                             'duration': _format_duration_display(sess.started_at, sess.completed_at),
-                        })
+                        }
+                        for sess in window["workouts"].get(d, [])
+                    ]
 
                     data = {
-                        'weight': weight_val,
-                        'food': {
-                            'calories': food_calories,
-                            'protein': food_protein if 'food_protein' in locals() else None,
-                            'carbs': food_carbs if 'food_carbs' in locals() else None,
-                            'fats': food_fats if 'food_fats' in locals() else None,
-                        } if (food_calories or (('food_protein' in locals() and food_protein) or ('food_carbs' in locals() and food_carbs) or ('food_fats' in locals() and food_fats))) else None,
+                        'weight': window["weights"].get(d),
+                        'food': food,
                         'workouts': workouts_for_day if workouts_for_day else None,
                     }
 
-                    week_list.append({'iso': iso, 'day': d.day, 'in_month': True, 'data': data})
+                    week_list.append({'iso': d.strftime('%Y-%m-%d'), 'day': d.day, 'in_month': True, 'data': data})
                 weeks.append(week_list)
             return weeks
 
-        calendar_weeks = _build_calendar_weeks(cal_year, cal_month, user)
+        calendar_weeks = _build_calendar_weeks(cal_year, cal_month)
 
         # selected-day details: weight and totals for the selected_date
-        try:
-            # selected weight (robust match)
-            sel_weight = None
-            try:
-                rows = Progress.query.filter_by(user_id=user.id).all()
-                day_rows = []
-                for r in rows:
-                    dt = getattr(r, 'date', None) or getattr(r, 'log_date', None)
-                    compare_date = _eastern_date(dt)
-                    if compare_date == selected_date:
-                        day_rows.append(r)
-                if day_rows:
-                    def _ord_key(x):
-                        return getattr(x, 'created_at', None) or getattr(x, 'id', 0)
-                    weight_entry = max(day_rows, key=_ord_key)
-                    sel_weight = float(getattr(weight_entry, 'weight')) if getattr(weight_entry, 'weight', None) is not None else None
-            except Exception:
-                sel_weight = None
-            selected_weight = sel_weight
-
-            # selected food totals (robust per-row matching)
-            try:
-                all_fls = UserFoodLog.query.filter_by(user_id=user.id).all()
-                tot = 0.0
-                total_protein = 0.0
-                total_carbs = 0.0
-                total_fats = 0.0
-                matched_any = False
-                for fl in all_fls:
-                    dt = getattr(fl, 'date', None) or getattr(fl, 'log_date', None)
-                    compare_date = _eastern_date(dt)
-                    if compare_date != selected_date:
-                        continue
-                    if getattr(fl, 'food', None):
-                        grams_logged = fl.quantity_in_grams() if hasattr(fl, 'quantity_in_grams') else getattr(fl, 'quantity', 0)
-                        scaled = scale_food_nutrients(fl.food, grams_logged)
-                        tot += scaled["calories"]
-                        total_protein += scaled["protein"]
-                        total_carbs += scaled["carbs"]
-                        total_fats += scaled["fats"]
-                        matched_any = True
-                if matched_any:
-                    selected_food_calories = round(tot, 1)
-                    selected_food_protein = round(total_protein, 1)
-                    selected_food_carbs = round(total_carbs, 1)
-                    selected_food_fats = round(total_fats, 1)
-                else:
-                    selected_food_calories = None
-                    selected_food_protein = None
-                    selected_food_carbs = None
-                    selected_food_fats = None
-                selected_food_items = []
-            except Exception:
-                selected_food_calories = None
-                selected_food_items = []
-                selected_food_protein = None
-                selected_food_carbs = None
-                selected_food_fats = None
-
-            try:
-                selected_workouts = []
-                for sess in workout_map.get(selected_date, []):
-                    workout_sets = (
-                        WorkoutSet.query
-                        .filter_by(session_id=sess.id)
-                        .order_by(WorkoutSet.exercise_name.asc(), WorkoutSet.set_number.asc())
-                        .all()
-                    )
-                    selected_workouts.append({
-                        'session': sess,
-                        'template_name': sess.template.name if sess.template else 'Workout',
-                        'duration': _format_duration_display(sess.started_at, sess.completed_at),
-                        'sets': workout_sets,
-                    })
-            except Exception:
-                selected_workouts = []
-        except Exception:
-            selected_weight = None
-            selected_food_calories = None
+        selected_weight = window_selected["weights"].get(selected_date)
+        selected_totals = window_selected["nutrition"].get(selected_date)
+        if selected_totals:
+            selected_food_calories = round(selected_totals["calories"], 1)
+            selected_food_protein = round(selected_totals["protein"], 1)
+            selected_food_carbs = round(selected_totals["carbs"], 1)
+            selected_food_fats = round(selected_totals["fats"], 1)
+
+        selected_sessions = window_selected["workouts"].get(selected_date, [])
+        sets_by_session = defaultdict(list)
+        if selected_sessions:
+            workout_sets = (
+                WorkoutSet.query
+                .filter(WorkoutSet.session_id.in_([sess.id for sess in selected_sessions]))
+                .order_by(WorkoutSet.exercise_name.asc(), WorkoutSet.set_number.asc())
+                .all()
+            )
+            for workout_set in workout_sets:
+                sets_by_session[workout_set.session_id].append(workout_set)
+        for sess in selected_sessions:
+            selected_workouts.append({
+                'session': sess,
+                'template_name': sess.template.name if sess.template else 'Workout',
+                'duration': _format_duration_display(sess.started_at, sess.completed_at),
+                'sets': sets_by_session.get(sess.id, []),
+            })
 
     latest_weight_lbs = _latest_weight_lbs(user)
     goal_weight_lbs = _kg_to_pounds(user.goal_weight_kg)
@@ -626,17 +585,7 @@ UNIT_TO_GRAMS = {
     "cup": 240
 }
 def _calculate_daily_totals(user_id: int, target_date: date) -> dict:
-    logs = UserFoodLog.query.filter_by(user_id=user_id, log_date=target_date).all()
-    totals = {"calories": 0.0, "protein": 0.0, "carbs": 0.0, "fat": 0.0}
-
-    for log in logs:
-        scaled = scale_food_nutrients(log.food, log.quantity_in_grams())
-        totals["calories"] += scaled["calories"]
-        totals["protein"] += scaled["protein"]
-        totals["carbs"] += scaled["carbs"]
-        totals["fat"] += scaled["fats"]
-
-    totals = {key: round(value, 1) for key, value in totals.items()}
+    totals = {key: round(value, 1) for key, value in get_daily_totals(user_id, target_date).items()}
     totals["macro_calories"] = round(
         totals["protein"] * 4 + totals["carbs"] * 4 + totals["fat"] * 9, 1
     )
@@ -708,44 +657,70 @@ def scale_nutrients(food_id, quantity, unit):
 # -----------------------------
 # Search Foods API
 # -----------------------------
-@member_bp.route("/search-foods")
-def search_foods():
+def _food_query_args():
     query = (request.args.get("q") or "").strip()
     unit = request.args.get("unit", "g")
     try:
         quantity = float(request.args.get("quantity", 1))
     except ValueError:
         quantity = 1
+    return query, unit, quantity
+
+
+def _food_results_payload(foods, quantity, unit):
+    # Resolve the requested measure for every result in one query, then scale
+    # the whole batch together.
+    default_grams = UNIT_TO_GRAMS.get(unit.lower(), 1)
+    measure_grams = measure_grams_for_foods([food.id for food in foods], unit)
+    quantities_in_grams = [
+        quantity * measure_grams.get(food.id, default_grams)
+        for food in foods
+    ]
+    scaled_rows = scale_foods_nutrients(foods, quantities_in_grams)
+
+    results = []
+    for food, scaled in zip(foods, scaled_rows):
+        results.append({
+            "id": food.id,
+            "name": food.name,
+            "calories": round(scaled["calories"], 1),
+            "protein_g": round(scaled["protein"], 1),
+            "carbs": round(scaled["carbs"], 1),
+            "fats": round(scaled["fats"], 1),
+            "serving_size": food.serving_size,
+            "serving_unit": food.serving_unit
+        })
+    return results
+
+
+@member_bp.route("/search-foods")
+def search_foods():
+    query, unit, quantity = _food_query_args()
 
     results = []
     if query:
-        foods = (
-            Food.query
-            .filter(Food.name != None)
-            .filter(Food.name.ilike(f"%{query}%"))
-            .limit(10)
-            .all()
-        )
-        for food in foods:
-            # Scale nutrients using food-specific measure if exists
-            grams_per_unit = UNIT_TO_GRAMS.get(unit.lower(), 1)
-            measure = FoodMeasure.query.filter_by(food_id=food.id, measure_name=unit.lower()).first()
-            if measure:
-                grams_per_unit = measure.grams
-
-            quantity_in_grams = quantity * grams_per_unit
-            scaled = scaled_macros(food, quantity_in_grams) 
-
-            results.append({
-                "id": food.id,
-                "name": food.name,
-                "calories": round(scaled["calories"], 1),
-                "protein_g": round(scaled["protein"], 1),
-                "carbs": round(scaled["carbs"], 1),
-                "fats": round(scaled["fats"], 1),
-                "serving_size": food.serving_size,
-                "serving_unit": food.serving_unit
-            })
+        foods = find_foods(query, limit=10)
+        results = _food_results_payload(foods, quantity, unit)
+
+    return jsonify({"results": results})
+
+
+@member_bp.route("/autocomplete-foods")
+def autocomplete_foods():
+    """Keystroke-friendly food suggestions served from the in-process prefix index."""
+    query, unit, quantity = _food_query_args()
+    try:
+        limit = max(1, min(int(request.args.get("limit", 10)), 25))
+    except ValueError:
+        limit = 10
+
+    results = []
+    if query:
+        food_ids = autocomplete_food_ids(query, limit=limit)
+        if food_ids:
+            by_id = {food.id: food for food in Food.query.filter(Food.id.in_(food_ids)).all()}
+            foods = [by_id[food_id] for food_id in food_ids if food_id in by_id]
+            results = _food_results_payload(foods, quantity, unit)
 
     return jsonify({"results": results})
 
@@ -1038,7 +1013,7 @@ def log_food():
             db.session.commit()
             created_food = True
         else:
-            food = Food.query.filter(Food.name.ilike(f"%{search_name}%")).first()
+            food = best_food_match(search_name)
             if not food:
                 return jsonify({"status": "error", "message": "No matching foods found."}), 404
 
@@ -1325,19 +1300,69 @@ def delete_food_log(log_id):
 #-----------------------------
 # Member Summary Page (Weekly and Monthly)
 #-----------------------------
+def _weight_entries(client: User):
+    return (
+        db.session.query(Progress.date, Progress.weight)
+        .filter(Progress.user_id == client.id)
+        .order_by(Progress.date)
+        .all()
+    )
+
+
+def _weekly_workout_counts(client: User, weeks_to_show: int = 5):
+    """Return (labels, counts) for workouts started in each of the last few weeks."""
+    current_week_start = _week_start_sunday(_now_eastern().date())
+    week_starts = [
+        current_week_start - timedelta(weeks=offset)
+        for offset in reversed(range(weeks_to_show))
+    ]
+
+    chart_window_start = datetime.combine(
+        week_starts[0],
+        datetime.min.time(),
+        tzinfo=EASTERN_TZ,
+    )
+    chart_start = chart_window_start.astimezone(timezone.utc).replace(tzinfo=None)
+    weekly_sessions = (
+        db.session.query(WorkoutSession.started_at)
+        .filter(WorkoutSession.user_id == client.id)
+        .filter(WorkoutSession.started_at.isnot(None))
+        .filter(WorkoutSession.started_at >= chart_start)
+        .all()
+    )
+
+    weekly_counts = defaultdict(int)
+    for (started_at,) in weekly_sessions:
+        session_date = _eastern_date(started_at)
+        if not session_date:
+            continue
+        session_week_start = _week_start_sunday(session_date)
+        weekly_counts[session_week_start] += 1
+
+    week_labels = []
+    week_values = []
+    for week_start in week_starts:
+        week_labels.append(f"{week_start.month}/{week_start.day:02d}")
+        week_values.append(weekly_counts.get(week_start, 0))
+    return week_labels, week_values
+
+
+def build_member_chart_data(client: User) -> dict:
+    """Chart series for the summary page, rendered client-side."""
+    week_labels, week_values = _weekly_workout_counts(client)
+    return {
+        "weight": weight_trend_series(_weight_entries(client)),
+        "weekly_workouts": weekly_workout_series(week_labels, week_values),
+    }
+
+
 def build_member_summary_context(client: User, macro_week_param: Optional[int] = None):
     now = _now_eastern()
 
     macro_targets = _user_macro_targets(client)
 
     # ----- WEIGHT TREND -----
-    weights = (
-        db.session.query(Progress.date, Progress.weight)
-        .filter(Progress.user_id == client.id)
-        .order_by(Progress.date)
-        .all()
-    )
-    df_weights = pd.DataFrame(weights, columns=["date", "weight"]) if weights else pd.DataFrame()
+    weights = _weight_entries(client)
     weight_span = None
     if weights:
         first_entry_date, first_entry_weight = weights[0]
@@ -1351,106 +1376,13 @@ def build_member_summary_context(client: User, macro_week_param: Optional[int] =
             "end_date": last_entry_date_str,
         }
 
-    chart_config = {"displayModeBar": False, "responsive": True}
-
-    weight_chart = None
-    if not df_weights.empty:
-        df_weights["date"] = pd.to_datetime(df_weights["date"]).dt.date
-        weights_series = pd.to_numeric(df_weights["weight"], errors="coerce").dropna()
-        y_min = weights_series.min() if not weights_series.empty else 0
-        y_max = weights_series.max() if not weights_series.empty else 0
-        padding = max(1, (y_max - y_min) * 0.1) if y_max != y_min else 5
-        y_axis_range = [max(0, y_min - padding), y_max + padding]
-
-        fig = go.Figure()
-        fig.add_trace(
-            go.Scatter(
-                x=df_weights["date"],
-                y=df_weights["weight"],
-                mode="lines+markers",
-                line=dict(color="#3c7df2", width=3),
-                marker=dict(size=7, color="#0b5394"),
-                fill="tozeroy",
-                fillcolor="rgba(60,125,242,0.18)",
-            )
-        )
-        fig.update_layout(
-            yaxis_title="Weight (lbs)",
-            yaxis=dict(range=y_axis_range, gridcolor="rgba(12,38,77,0.08)"),
-            xaxis=dict(title="", showgrid=False, zeroline=False, showticklabels=False),
-            template="plotly_white",
-            margin=dict(l=36, r=24, t=20, b=4),
-            plot_bgcolor="rgba(248,249,255,0.95)",
-            paper_bgcolor="rgba(248,249,255,0.95)",
-        )
-        weight_chart = fig.to_html(full_html=False, config=chart_config)
-
-    # ----- WEEKLY WORKOUTS (LAST 5 WEEKS) -----
-    weeks_to_show = 5
-
     current_week_start = _week_start_sunday(now.date())
-    week_starts = [
-        current_week_start - timedelta(weeks=offset)
-        for offset in reversed(range(weeks_to_show))
-    ]
-
-    weekly_workout_chart = None
-    if week_starts:
-        chart_window_start = datetime.combine(
-            week_starts[0],
-            datetime.min.time(),
-            tzinfo=EASTERN_TZ,
-        )
-        chart_start = chart_window_start.astimezone(timezone.utc).replace(tzinfo=None)
-        weekly_sessions = (
-            db.session.query(WorkoutSession.started_at)
-            .filter(WorkoutSession.user_id == client.id)
-            .filter(WorkoutSession.started_at.isnot(None))
-            .filter(WorkoutSession.started_at >= chart_start)
-            .all()
-        )
-
-        weekly_counts = defaultdict(int)
-        for (started_at,) in weekly_sessions:
-            session_date = _eastern_date(started_at)
-            if not session_date:
-                continue
-            session_week_start = _week_start_sunday(session_date)
-            weekly_counts[session_week_start] += 1
-
-        week_labels = []
-        week_values = []
-        for week_start in week_starts:
-            week_labels.append(f"{week_start.month}/{week_start.day:02d}")
-            week_values.append(weekly_counts.get(week_start, 0))
-
-        fig_weekly = go.Figure(
-            [
-                go.Bar(
-                    x=week_labels,
-                    y=week_values,
-                    marker=dict(
-                        color=["#0d6efd", "#5a8dee", "#8bb7ff", "#0a58ca", "#1c7ed6"][: len(week_values)]
-                    ),
-                )
-            ]
-        )
-        fig_weekly.update_layout(
-            title="Weekly Workouts (Last 5 Weeks)",
-            xaxis_title="Week Starting",
-            yaxis_title="Workouts",
-            template="plotly_white",
-            margin=dict(l=36, r=24, t=30, b=20),
-            yaxis=dict(dtick=1, tickmode="linear", tick0=0),
-            plot_bgcolor="rgba(248,249,255,0.95)",
-            paper_bgcolor="rgba(248,249,255,0.95)",
-        )
-        weekly_workout_chart = fig_weekly.to_html(full_html=False, config=chart_config)
 
     # ----- WORKOUT HISTORY -----
     history_limit = 10
     history_sessions = (
         WorkoutSession.query
+        .options(selectinload(WorkoutSession.sets))
         .filter(WorkoutSession.user_id == client.id)
         .order_by(WorkoutSession.started_at.desc())
         .limit(history_limit)
@@ -1539,33 +1471,7 @@ def build_member_summary_context(client: User, macro_week_param: Optional[int] =
     macro_week_start = current_week_start - timedelta(weeks=requested_offset)
     macro_week_end = macro_week_start + timedelta(days=6)
 
-    logs_for_macros = (
-        UserFoodLog.query
-        .filter(UserFoodLog.user_id == client.id)
-        .filter(UserFoodLog.log_date >= earliest_week_start)
-        .filter(UserFoodLog.log_date <= current_week_start + timedelta(days=6))
-        .all()
-    )
-    daily_macro_totals = defaultdict(lambda: {"calories": 0.0, "protein": 0.0, "carbs": 0.0, "fats": 0.0})
-    for log in logs_for_macros:
-        day = log.log_date or _eastern_date(log.created_at)
-        if not day:
-            continue
-        if day < earliest_week_start or day > current_week_start + timedelta(days=6):
-            continue
-        scaled = scale_food_nutrients(log.food, log.quantity_in_grams())
-        daily_macro_totals[day]["calories"] += scaled["calories"]
-        daily_macro_totals[day]["protein"] += scaled["protein"]
-        daily_macro_totals[day]["carbs"] += scaled["carbs"]
-        daily_macro_totals[day]["fats"] += scaled["fats"]
-
-    week_sums = {"calories": 0.0, "protein": 0.0, "carbs": 0.0, "fats": 0.0}
-    for day_offset in range(7):
-        day = macro_week_start + timedelta(days=day_offset)
-        totals = daily_macro_totals.get(day)
-        if totals:
-            for key in week_sums:
-                week_sums[key] += totals[key]
+    week_sums = get_totals_between(client.id, macro_week_start, macro_week_end)
     days_elapsed = 7
     if requested_offset == 0:
         today = now.date()
@@ -1631,8 +1537,7 @@ def build_member_summary_context(client: User, macro_week_param: Optional[int] =
     return {
         "client": client,
         "weight_span": weight_span,
-        "weight_chart": weight_chart,
-        "weekly_workout_chart": weekly_workout_chart,
+        "has_weight_chart": bool(weights),
         "workout_history": workout_history,
         "macro_week_summary": macro_week_summary,
         "macro_week_prev": macro_week_prev,
@@ -1659,11 +1564,20 @@ def member_summary():
         "summary_role": "member",
         "stats_heading": "My Stats",
         "summary_nav": "member",
+        "chart_data_url": url_for('member.member_summary_chart_data'),
         "macro_prev_url": url_for('member.member_summary', macro_week=macro_week_prev) if macro_week_prev is not None else None,
         "macro_next_url": url_for('member.member_summary', macro_week=macro_week_next) if macro_week_next is not None else None,
     })
     return render_template("member-summary.html", **context)
 
+
+@member_bp.route('/summary/chart-data')
+@login_required
+def member_summary_chart_data():
+    if current_user.role != 'member':
+        return jsonify({"status": "error", "message": "Access denied."}), 403
+    return jsonify(build_member_chart_data(current_user))
+
 # -----------------------------
 # Log out
 # -----------------------------
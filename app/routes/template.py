@@ -5,49 +5,22 @@ from app.models import (
     User,
     ExerciseTemplate,
     TemplateExercise,
-    ExerciseCatalog,
     AssignedTemplate,
     WorkoutSession,
     WorkoutSet,
 )
 from datetime import datetime
 import json
-from sqlalchemy import or_
+from app.services.exercise_search import search_exercises
 
 
 template_bp = Blueprint('template', __name__, url_prefix='/templates')
 
 
-def _search_exercises(term):
-    if not term:
-        return []
-
-    like_term = f"%{term}%"
-    rows = (
-        ExerciseCatalog.query
-        .filter(
-            or_(
-                ExerciseCatalog.name.ilike(like_term),
-                ExerciseCatalog.primary_muscles.ilike(like_term),
-                ExerciseCatalog.secondary_muscles.ilike(like_term),
-                ExerciseCatalog.equipment.ilike(like_term),
-                ExerciseCatalog.category.ilike(like_term),
-            )
-        )
-        .order_by(ExerciseCatalog.name.asc())
-        .limit(25)
-        .all()
-    )
-
-    results = []
-    for row in rows:
-        muscle = row.primary_muscles or row.secondary_muscles or (row.category.title() if row.category else None)
-        results.append({
-            "name": row.name,
-            "muscle": muscle,
-            "equipment": row.equipment,
-        })
-    return results
+def _search_exercises(term, muscle=None, equipment=None):
+    if not term and not (muscle or equipment):
+        return [], {}
+    return search_exercises(term, muscle=muscle, equipment=equipment)
 
 
 def _human_duration(started_at, completed_at):
@@ -72,11 +45,13 @@ def _human_duration(started_at, completed_at):
 @login_required
 def search_exercises_api():
     query = (request.args.get('q') or '').strip()
-    if not query:
+    muscle = (request.args.get('muscle') or '').strip() or None
+    equipment = (request.args.get('equipment') or '').strip() or None
+    if not query and not (muscle or equipment):
         return jsonify({"results": []})
 
-    matches = _search_exercises(query)
-    return jsonify({"results": matches or []})
+    matches, facets = _search_exercises(query, muscle=muscle, equipment=equipment)
+    return jsonify({"results": matches or [], "facets": facets})
 
 
 @template_bp.route('/', methods=['GET', 'POST'])
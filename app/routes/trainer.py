@@ -27,55 +27,75 @@ from app.services.nutrition import (
     group_meals_by_slot,
     MEAL_SLOT_LABELS,
 )
-from app.routes.member import build_member_summary_context
+from app.services.daily_totals import get_daily_totals_for_users
+from app.routes.member import build_member_summary_context, build_member_chart_data
 from sqlalchemy import or_, func
 import pytz
 
 trainer_bp = Blueprint('trainer', __name__, url_prefix='/trainer')
 
-@trainer_bp.route('/dashboard-trainer')
-@login_required
-def dashboard_trainer():
-    if current_user.role != 'trainer':
-        flash("Access denied.", "danger")
-        return redirect(url_for('main.home'))
 
-    est = pytz.timezone("America/New_York")
-    today = datetime.now(est).date()
+def _latest_weights(user_ids):
+    """Map user id -> most recent Progress weight using one grouped-max query."""
+    if not user_ids:
+        return {}
+    latest = (
+        db.session.query(Progress.user_id, func.max(Progress.date).label("latest_date"))
+        .filter(Progress.user_id.in_(user_ids))
+        .group_by(Progress.user_id)
+        .subquery()
+    )
+    rows = (
+        db.session.query(Progress.user_id, Progress.weight)
+        .join(latest, (Progress.user_id == latest.c.user_id) & (Progress.date == latest.c.latest_date))
+        .order_by(Progress.id.asc())
+        .all()
+    )
+    # Entries sharing the latest timestamp resolve to the highest id.
+    return {user_id: weight for user_id, weight in rows}
+
+
+def _client_roster(trainer_id, day):
+    """Build the trainer dashboard roster in three queries regardless of client count."""
     members = (
         User.query
-        .filter_by(trainer_id=current_user.id, role='member')
+        .filter_by(trainer_id=trainer_id, role='member')
         .order_by(User.first_name.asc(), User.last_name.asc())
         .all()
     )
+    member_ids = [member.id for member in members]
+    totals_by_user = get_daily_totals_for_users(member_ids, day)
+    weights = _latest_weights(member_ids)
 
     clients = []
     for member in members:
-        totals = {key: 0.0 for key in ("calories", "protein", "carbs", "fats")}
-        logs = UserFoodLog.query.filter_by(user_id=member.id, log_date=today).all()
-        for log in logs:
-            scaled = log.scaled
-            for key in totals:
-                totals[key] += scaled.get(key, 0)
-
-        latest_progress = (
-            Progress.query
-            .filter_by(user_id=member.id)
-            .order_by(Progress.date.desc())
-            .first()
-        )
-
-        weight = None
-        if latest_progress and latest_progress.weight is not None:
-            weight = round(latest_progress.weight, 1)
-
+        totals = totals_by_user.get(member.id, {})
+        weight = weights.get(member.id)
         clients.append({
             "record": member,
-            "macros": {k: round(v, 1) for k, v in totals.items()},
-            "weight": weight,
+            "macros": {
+                "calories": round(totals.get("calories", 0.0), 1),
+                "protein": round(totals.get("protein", 0.0), 1),
+                "carbs": round(totals.get("carbs", 0.0), 1),
+                "fats": round(totals.get("fat", 0.0), 1),
+            },
+            "weight": round(weight, 1) if weight is not None else None,
             "age": getattr(member, "age", None),
             "gender": getattr(member, "gender", None),
         })
+    return clients
+
+
+@trainer_bp.route('/dashboard-trainer')
+@login_required
+def dashboard_trainer():
+    if current_user.role != 'trainer':
+        flash("Access denied.", "danger")
+        return redirect(url_for('main.home'))
+
+    est = pytz.timezone("America/New_York")
+    today = datetime.now(est).date()
+    clients = _client_roster(current_user.id, today)
 
     return render_template(
         'dashboard-trainer.html',
@@ -85,6 +105,31 @@ def dashboard_trainer():
     )
 
 
+@trainer_bp.route('/roster')
+@login_required
+def client_roster():
+    if current_user.role != 'trainer':
+        return jsonify({"status": "error", "message": "Access denied."}), 403
+
+    today = datetime.now(pytz.timezone("America/New_York")).date()
+    clients = _client_roster(current_user.id, today)
+    return jsonify({
+        "date": today.isoformat(),
+        "clients": [
+            {
+                "id": client["record"].id,
+                "first_name": client["record"].first_name,
+                "last_name": client["record"].last_name,
+                "macros": client["macros"],
+                "weight": client["weight"],
+                "age": client["age"],
+                "gender": client["gender"],
+            }
+            for client in clients
+        ],
+    })
+
+
 def _format_height(height_cm):
     if not height_cm:
         return None, None
@@ -757,12 +802,20 @@ def client_summary_view(member_id):
     context.update({
         "summary_role": "trainer",
         "summary_nav": "trainer",
+        "chart_data_url": url_for('trainer.client_summary_chart_data', member_id=client.id),
         "macro_prev_url": url_for('trainer.client_summary_view', member_id=client.id, macro_week=macro_week_prev) if macro_week_prev is not None else None,
         "macro_next_url": url_for('trainer.client_summary_view', member_id=client.id, macro_week=macro_week_next) if macro_week_next is not None else None,
     })
     return render_template("member-summary.html", **context)
 
 
+
+@trainer_bp.route('/clients/<int:member_id>/summary-chart-data')
+@login_required
+def client_summary_chart_data(member_id):
+    client = _get_trainer_client(member_id)
+    return jsonify(build_member_chart_data(client))
+
 @trainer_bp.route('/send-message/<int:client_id>', methods=['GET', 'POST'])
 @login_required
 def send_message(client_id: int):
@@ -0,0 +1,40 @@
+"""Version counters for the reference data workers cache in memory.
+
+Each cached catalog has a row in ``catalog_version``. Writers bump it in the
+same transaction as their change; workers poll it and reload their copy when
+the number has moved. Used by the exercise catalog snapshot, the
+grams-per-unit measure cache and the USDA importer.
+"""
+from __future__ import annotations
+
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import CatalogVersion
+
+
+def get_catalog_version(name: str) -> int:
+    version = db.session.execute(
+        db.select(CatalogVersion.version).where(CatalogVersion.name == name)
+    ).scalar()
+    return version or 0
+
+
+def bump_catalog_version(name: str, session=None) -> int:
+    """Increment a catalog's version in the current transaction; the caller commits.
+
+    The increment is a single ``UPDATE ... SET version = version + 1`` so
+    concurrent bumps from several processes are never lost.
+    """
+    session = session or db.session
+    table = CatalogVersion.__table__
+    increment = table.update().where(table.c.name == name).values(version=table.c.version + 1)
+    if session.execute(increment).rowcount == 0:
+        # First bump for this catalog. Another process may insert the row
+        # first, in which case the unique name rejects ours and we increment.
+        try:
+            with session.begin_nested():
+                session.execute(table.insert().values(name=name, version=1))
+        except IntegrityError:
+            session.execute(increment)
+    return session.execute(db.select(table.c.version).where(table.c.name == name)).scalar_one()
@@ -0,0 +1,36 @@
+"""Compact chart series for the member summary page.
+
+The summary page fetches these as JSON and draws them in the browser with
+Plotly.js, so the server only shapes plain lists of numbers and labels.
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+def _weight_axis_range(values: List[float]) -> List[float]:
+    y_min = min(values) if values else 0
+    y_max = max(values) if values else 0
+    padding = max(1, (y_max - y_min) * 0.1) if y_max != y_min else 5
+    return [max(0, y_min - padding), y_max + padding]
+
+
+def weight_trend_series(weights: Sequence[Tuple]) -> Optional[Dict]:
+    """Shape (datetime, weight) rows into dates, weights and a padded y-axis range."""
+    if not weights:
+        return None
+    dates = []
+    values = []
+    for entry_date, weight in weights:
+        dates.append(entry_date.date().isoformat() if hasattr(entry_date, "date") else str(entry_date))
+        values.append(round(float(weight), 1) if weight is not None else None)
+    return {
+        "dates": dates,
+        "weights": values,
+        "y_range": _weight_axis_range([value for value in values if value is not None]),
+    }
+
+
+def weekly_workout_series(week_labels: List[str], week_values: List[int]) -> Dict:
+    """Shape per-week workout counts for the weekly bar chart."""
+    return {"labels": list(week_labels), "counts": list(week_values)}
@@ -0,0 +1,155 @@
+"""Read and repair the materialized ``daily_nutrition_totals`` table.
+
+Rows are kept current by the ``UserFoodLog`` mapper events in ``app.models``;
+this module serves the totals to routes and can rebuild them from raw logs
+when they drift (for example after a food's macros are edited).
+"""
+from __future__ import annotations
+
+from datetime import date
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func, tuple_
+
+from app import db
+from app.models import DailyNutritionTotal, Food, UserFoodLog
+
+
+def _scaled_sums():
+    """Aggregate calories and macros per group as SUM(grams * per-gram density)."""
+    grams = func.coalesce(UserFoodLog.quantity_grams, UserFoodLog.quantity, 0.0)
+    return (
+        func.coalesce(func.sum(grams * Food.calories_per_g), 0.0),
+        func.coalesce(func.sum(grams * Food.protein_per_g), 0.0),
+        func.coalesce(func.sum(grams * Food.carbs_per_g), 0.0),
+        func.coalesce(func.sum(grams * Food.fats_per_g), 0.0),
+        func.count(UserFoodLog.id),
+    )
+
+
+def get_daily_totals(user_id: int, target_date: date) -> Dict[str, float]:
+    """Return unrounded calories/protein/carbs/fat for one day via a primary-key lookup."""
+    row = db.session.get(DailyNutritionTotal, (user_id, target_date))
+    if row is None:
+        return {"calories": 0.0, "protein": 0.0, "carbs": 0.0, "fat": 0.0}
+    return {
+        "calories": row.calories or 0.0,
+        "protein": row.protein_g or 0.0,
+        "carbs": row.carbs_g or 0.0,
+        "fat": row.fats_g or 0.0,
+    }
+
+
+def get_totals_between(user_id: int, start: date, end: date) -> Dict[str, float]:
+    """Sum calories and macros logged from ``start`` to ``end`` inclusive, in SQL."""
+    calories, protein, carbs, fats, _ = _scaled_sums()
+    row = db.session.execute(
+        db.select(calories, protein, carbs, fats)
+        .select_from(UserFoodLog)
+        .outerjoin(Food, Food.id == UserFoodLog.food_id)
+        .where(UserFoodLog.user_id == user_id)
+        .where(UserFoodLog.log_date >= start, UserFoodLog.log_date <= end)
+    ).one()
+    return {"calories": row[0], "protein": row[1], "carbs": row[2], "fats": row[3]}
+
+
+def get_daily_totals_for_users(user_ids: Iterable[int], target_date: date) -> Dict[int, Dict[str, float]]:
+    """Return unrounded totals for many users on one day in a single query.
+
+    Users with nothing logged that day are omitted from the result.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {}
+    rows = (
+        DailyNutritionTotal.query
+        .filter(DailyNutritionTotal.user_id.in_(user_ids))
+        .filter(DailyNutritionTotal.date == target_date)
+        .all()
+    )
+    return {
+        row.user_id: {
+            "calories": row.calories or 0.0,
+            "protein": row.protein_g or 0.0,
+            "carbs": row.carbs_g or 0.0,
+            "fat": row.fats_g or 0.0,
+        }
+        for row in rows
+    }
+
+
+def _totals_select():
+    """Per-(user, day) totals from raw logs, in ``daily_nutrition_totals`` column order."""
+    calories, protein, carbs, fats, log_count = _scaled_sums()
+    return (
+        db.select(
+            UserFoodLog.user_id,
+            UserFoodLog.log_date,
+            calories,
+            protein,
+            carbs,
+            fats,
+            log_count,
+            func.current_timestamp(),
+        )
+        .select_from(UserFoodLog)
+        .outerjoin(Food, Food.id == UserFoodLog.food_id)
+        .where(UserFoodLog.log_date.isnot(None))
+        .group_by(UserFoodLog.user_id, UserFoodLog.log_date)
+    )
+
+
+_TOTALS_COLUMNS = ["user_id", "date", "calories", "protein_g", "carbs_g", "fats_g", "log_count", "updated_at"]
+
+
+def rebuild_daily_totals(user_id: Optional[int] = None) -> int:
+    """Recompute totals from ``user_food_log`` (for one user or everyone).
+
+    Returns the number of day rows written. The caller commits.
+    """
+    table = DailyNutritionTotal.__table__
+    delete = table.delete()
+    if user_id is not None:
+        delete = delete.where(table.c.user_id == user_id)
+    db.session.execute(delete)
+
+    select = _totals_select()
+    if user_id is not None:
+        select = select.where(UserFoodLog.user_id == user_id)
+
+    result = db.session.execute(table.insert().from_select(_TOTALS_COLUMNS, select))
+    return result.rowcount
+
+
+def rebuild_daily_totals_for_days(days: Iterable[Tuple[int, date]], batch_size: int = 500) -> int:
+    """Recompute only the given ``(user_id, date)`` rows.
+
+    Returns the number of days rebuilt; the caller commits.
+    """
+    days = sorted(set(days))
+    table = DailyNutritionTotal.__table__
+    for start in range(0, len(days), batch_size):
+        batch = days[start:start + batch_size]
+        db.session.execute(table.delete().where(tuple_(table.c.user_id, table.c.date).in_(batch)))
+        select = _totals_select().where(tuple_(UserFoodLog.user_id, UserFoodLog.log_date).in_(batch))
+        db.session.execute(table.insert().from_select(_TOTALS_COLUMNS, select))
+    return len(days)
+
+
+def rebuild_daily_totals_for_foods(food_ids: Iterable[int], batch_size: int = 500) -> int:
+    """Rebuild the days on which any of ``food_ids`` was logged.
+
+    Used after a food's macros change. Returns the number of days rebuilt;
+    the caller commits.
+    """
+    food_ids = list(food_ids)
+    days = set()
+    for start in range(0, len(food_ids), batch_size):
+        batch = food_ids[start:start + batch_size]
+        rows = db.session.execute(
+            db.select(UserFoodLog.user_id, UserFoodLog.log_date)
+            .where(UserFoodLog.food_id.in_(batch), UserFoodLog.log_date.isnot(None))
+            .distinct()
+        )
+        days.update((user_id, log_date) for user_id, log_date in rows)
+    return rebuild_daily_totals_for_days(days, batch_size)
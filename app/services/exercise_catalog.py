@@ -0,0 +1,134 @@
+"""Read-only in-process snapshot of ``exercise_catalog``.
+
+The catalog only changes when ``cache_exercises.py`` syncs it, which bumps the
+``exercise_catalog`` row in ``catalog_version``. Each worker loads the catalog
+lazily into ``__slots__`` records on first use and afterwards only polls the
+version number (at most every ``VERSION_CHECK_INTERVAL`` seconds), reloading
+when it has moved. The muscle and equipment facets (value -> row positions)
+back the filters in ``exercise_search``, so they never touch the database.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from sys import intern
+from typing import Dict, List, Optional, Tuple
+
+from app import db
+from app.models import ExerciseCatalog
+from app.services.catalog_version import get_catalog_version
+
+CATALOG_NAME = "exercise_catalog"
+VERSION_CHECK_INTERVAL = 5.0
+
+
+def _split_list(value: Optional[str]) -> Tuple[str, ...]:
+    """Split a flattened ``"chest, triceps"`` column into lower-cased values."""
+    return tuple(intern(part.strip().lower()) for part in (value or "").split(",") if part.strip())
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return intern(value) if value else value
+
+
+class CatalogExercise:
+    """One catalog row, with the muscle lists pre-split."""
+
+    __slots__ = ("id", "name", "equipment", "category", "level", "primary_muscles", "secondary_muscles", "muscle")
+
+    def __init__(self, row_id, name, equipment, category, level, primary_muscles, secondary_muscles) -> None:
+        self.id = row_id
+        self.name = name
+        # Low-cardinality values are interned so every row shares one string.
+        self.equipment = _intern(equipment)
+        self.category = _intern(category)
+        self.level = _intern(level)
+        self.primary_muscles = _split_list(primary_muscles)
+        self.secondary_muscles = _split_list(secondary_muscles)
+        # Display label used by the template builder, as stored in the catalog.
+        self.muscle = _intern(primary_muscles or secondary_muscles or (category.title() if category else None))
+
+    def as_result(self) -> dict:
+        return {"name": self.name, "muscle": self.muscle, "equipment": self.equipment}
+
+
+class ExerciseCatalogSnapshot:
+    """Immutable view of the catalog at one version, sorted by name."""
+
+    def __init__(self, version: int, exercises: List[CatalogExercise]) -> None:
+        self.version = version
+        self.exercises = tuple(exercises)
+
+        muscles: Dict[str, List[int]] = {}
+        equipment: Dict[str, List[int]] = {}
+        for index, exercise in enumerate(self.exercises):
+            for muscle in dict.fromkeys(exercise.primary_muscles + exercise.secondary_muscles):
+                muscles.setdefault(muscle, []).append(index)
+            if exercise.equipment:
+                equipment.setdefault(exercise.equipment.strip().lower(), []).append(index)
+        # Facet value -> positions in ``exercises``.
+        self.muscles: Dict[str, Tuple[int, ...]] = {value: tuple(ids) for value, ids in muscles.items()}
+        self.equipment: Dict[str, Tuple[int, ...]] = {value: tuple(ids) for value, ids in equipment.items()}
+
+    def __len__(self) -> int:
+        return len(self.exercises)
+
+
+class ExerciseCatalogCache:
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._snapshot: Optional[ExerciseCatalogSnapshot] = None
+        self._checked_at = 0.0
+
+    def invalidate(self) -> None:
+        """Re-check the stored version on the next access."""
+        with self._lock:
+            self._checked_at = 0.0
+
+    def _load(self, version: int) -> ExerciseCatalogSnapshot:
+        rows = db.session.execute(
+            db.select(
+                ExerciseCatalog.id,
+                ExerciseCatalog.name,
+                ExerciseCatalog.equipment,
+                ExerciseCatalog.category,
+                ExerciseCatalog.level,
+                ExerciseCatalog.primary_muscles,
+                ExerciseCatalog.secondary_muscles,
+            ).order_by(ExerciseCatalog.name, ExerciseCatalog.id)
+        )
+        return ExerciseCatalogSnapshot(version, [CatalogExercise(*row) for row in rows])
+
+    def get(self) -> ExerciseCatalogSnapshot:
+        """Return the current snapshot, loading or reloading it if needed."""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < VERSION_CHECK_INTERVAL:
+            return snapshot
+        with self._lock:
+            now = time.monotonic()
+            if self._snapshot is not None and now - self._checked_at < VERSION_CHECK_INTERVAL:
+                return self._snapshot
+            version = get_catalog_version(CATALOG_NAME)
+            if self._snapshot is None or self._snapshot.version != version:
+                self._snapshot = self._load(version)
+            self._checked_at = now
+            return self._snapshot
+
+    def stats(self) -> Dict[str, int]:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {"loaded": 0}
+        return {
+            "loaded": 1,
+            "version": snapshot.version,
+            "exercises": len(snapshot),
+            "muscles": len(snapshot.muscles),
+            "equipment": len(snapshot.equipment),
+        }
+
+
+exercise_catalog = ExerciseCatalogCache()
+
+
+def current_catalog() -> ExerciseCatalogSnapshot:
+    return exercise_catalog.get()
@@ -0,0 +1,203 @@
+"""In-process search index over the exercise catalog snapshot.
+
+The index is derived from ``current_catalog()`` (see ``exercise_catalog``)
+and rebuilt whenever a new snapshot version is loaded, so searches are served
+from memory. Each catalog row is tokenized into a sorted vocabulary with
+per-word postings. A query token matches every vocabulary word it is a prefix
+of (``bisect`` range), and all tokens must match. Each hit is scored by the
+best field it matched in, so a name match outranks a muscle match, which
+outranks equipment, category and secondary muscles.
+
+Muscle and equipment facets come from the snapshot and are used for filtering
+and for the facet counts returned alongside results.
+"""
+from __future__ import annotations
+
+import re
+import threading
+from bisect import bisect_left
+from sys import intern
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from app.services.exercise_catalog import ExerciseCatalogSnapshot, current_catalog
+
+DEFAULT_LIMIT = 25
+
+# Field bits stored in each posting, and the score of a token matching there.
+NAME, PRIMARY, EQUIPMENT, CATEGORY, SECONDARY = 1, 2, 4, 8, 16
+FIELD_WEIGHTS = ((NAME, 100), (PRIMARY, 40), (EQUIPMENT, 20), (CATEGORY, 15), (SECONDARY, 10))
+# A token equal to the whole word scores above a bare prefix match.
+EXACT_WORD_BONUS = 5
+NAME_PREFIX_BONUS = 50
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _words(value: Optional[str]) -> List[str]:
+    return _WORD_RE.findall((value or "").lower())
+
+
+def _field_score(mask: int) -> int:
+    for bit, weight in FIELD_WEIGHTS:
+        if mask & bit:
+            return weight
+    return 0
+
+
+class ExerciseSearchIndex:
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._snapshot: Optional[ExerciseCatalogSnapshot] = None
+            self._names: List[str] = []
+            self._words: List[str] = []
+            self._postings: Dict[str, List[Tuple[int, int]]] = {}
+            self._muscles: Dict[str, FrozenSet[int]] = {}
+            self._equipment: Dict[str, FrozenSet[int]] = {}
+
+    # -- maintenance -------------------------------------------------------
+
+    def _build(self, snapshot: ExerciseCatalogSnapshot) -> None:
+        postings: Dict[str, Dict[int, int]] = {}
+        for index, exercise in enumerate(snapshot.exercises):
+            for field, values in (
+                (NAME, (exercise.name,)),
+                (PRIMARY, exercise.primary_muscles),
+                (SECONDARY, exercise.secondary_muscles),
+                (EQUIPMENT, (exercise.equipment,)),
+                (CATEGORY, (exercise.category,)),
+            ):
+                for value in values:
+                    for word in _words(value):
+                        entry = postings.setdefault(intern(word), {})
+                        entry[index] = entry.get(index, 0) | field
+
+        self._names = [exercise.name.lower() for exercise in snapshot.exercises]
+        self._postings = {word: sorted(entry.items()) for word, entry in postings.items()}
+        self._words = sorted(self._postings)
+        self._muscles = {value: frozenset(ids) for value, ids in snapshot.muscles.items()}
+        self._equipment = {value: frozenset(ids) for value, ids in snapshot.equipment.items()}
+        self._snapshot = snapshot
+
+    def refresh(self) -> ExerciseCatalogSnapshot:
+        """Rebuild the index if the catalog snapshot has changed since the last build."""
+        snapshot = current_catalog()
+        if snapshot is not self._snapshot:
+            with self._lock:
+                if snapshot is not self._snapshot:
+                    self._build(snapshot)
+        return snapshot
+
+    # -- lookup ------------------------------------------------------------
+
+    def _prefix_range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect_left(self._words, prefix)
+        hi = bisect_left(self._words, prefix + "\uffff", lo)
+        return lo, hi
+
+    def _token_scores(self, token: str) -> Dict[int, int]:
+        scores: Dict[int, int] = {}
+        lo, hi = self._prefix_range(token)
+        for word in self._words[lo:hi]:
+            bonus = EXACT_WORD_BONUS if word == token else 0
+            for index, mask in self._postings[word]:
+                score = _field_score(mask) + bonus
+                if score > scores.get(index, 0):
+                    scores[index] = score
+        return scores
+
+    def _facet_filter(self, muscle: Optional[str], equipment: Optional[str]) -> Optional[FrozenSet[int]]:
+        allowed: Optional[FrozenSet[int]] = None
+        for facet, value in ((self._muscles, muscle), (self._equipment, equipment)):
+            value = (value or "").strip().lower()
+            if not value:
+                continue
+            ids = facet.get(value, frozenset())
+            allowed = ids if allowed is None else allowed & ids
+        return allowed
+
+    def search(
+        self,
+        query: str,
+        muscle: Optional[str] = None,
+        equipment: Optional[str] = None,
+        limit: int = DEFAULT_LIMIT,
+    ) -> Tuple[List[dict], Dict[str, Dict[str, int]]]:
+        """Return ``(results, facets)`` for a query and optional facet filters.
+
+        Results are ranked by field score, then name. ``facets`` counts the
+        muscles and equipment across every match, not just the returned page.
+        With no query, facet filters alone list matching exercises by name.
+        """
+        tokens = _words(query)
+        if not tokens and not (muscle or equipment):
+            return [], {"muscles": {}, "equipment": {}}
+        self.refresh()
+
+        with self._lock:
+            allowed = self._facet_filter(muscle, equipment)
+            if tokens:
+                scores: Optional[Dict[int, int]] = None
+                for token in tokens:
+                    token_scores = self._token_scores(token)
+                    if scores is None:
+                        scores = token_scores
+                    else:
+                        scores = {
+                            index: score + token_scores[index]
+                            for index, score in scores.items()
+                            if index in token_scores
+                        }
+                    if not scores:
+                        break
+                scores = scores or {}
+                if allowed is not None:
+                    scores = {index: score for index, score in scores.items() if index in allowed}
+                phrase = " ".join(tokens)
+                for index in scores:
+                    if self._names[index].startswith(phrase):
+                        scores[index] += NAME_PREFIX_BONUS
+                # Rows are stored in name order, so the index breaks ties by name.
+                ranked = sorted(scores, key=lambda index: (-scores[index], index))
+            else:
+                ranked = sorted(allowed or ())
+
+            exercises = self._snapshot.exercises
+            results = [exercises[index].as_result() for index in ranked[:limit]]
+            return results, self._facet_counts(ranked)
+
+    def _facet_counts(self, matched: List[int]) -> Dict[str, Dict[str, int]]:
+        matched_set = set(matched)
+        counts: Dict[str, Dict[str, int]] = {}
+        for label, facet in (("muscles", self._muscles), ("equipment", self._equipment)):
+            values = {value: len(ids & matched_set) for value, ids in facet.items()}
+            counts[label] = {value: count for value, count in sorted(values.items()) if count}
+        return counts
+
+    def facet_values(self) -> Dict[str, List[str]]:
+        """All muscle and equipment values, for building filter controls."""
+        self.refresh()
+        with self._lock:
+            return {"muscles": sorted(self._muscles), "equipment": sorted(self._equipment)}
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "exercises": len(self._names),
+                "words": len(self._words),
+                "postings": sum(len(posting) for posting in self._postings.values()),
+                "muscles": len(self._muscles),
+                "equipment": len(self._equipment),
+            }
+
+
+exercise_search = ExerciseSearchIndex()
+
+
+def search_exercises(
+    query: str, muscle: Optional[str] = None, equipment: Optional[str] = None, limit: int = DEFAULT_LIMIT
+) -> Tuple[List[dict], Dict[str, Dict[str, int]]]:
+    return exercise_search.search(query, muscle=muscle, equipment=equipment, limit=limit)
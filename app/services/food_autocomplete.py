@@ -0,0 +1,284 @@
+"""In-process prefix index for food name autocomplete.
+
+Each worker keeps a sorted list of the distinct words found in ``Food.name``
+plus, per word, the ids of the foods that contain it. A keystroke is then a
+``bisect`` over the word list and a scan of a few postings, with no SQL.
+Results are ranked by how often members have logged each food.
+
+The index is built lazily on first use and grows incrementally: new foods are
+picked up by id high-water mark, either immediately after this process
+inserts one or every ``REFRESH_INTERVAL`` seconds for rows written elsewhere
+(other workers, the USDA importer). Renames and deletes cannot be applied
+incrementally, so a committed ORM rename or delete marks the index stale and
+the next lookup rebuilds it. A full rebuild also runs every
+``FULL_REBUILD_INTERVAL`` seconds to catch changes made elsewhere and to
+recount popularity after logs are deleted.
+"""
+from __future__ import annotations
+
+import heapq
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left, insort
+from sys import intern
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import Food, UserFoodLog
+
+REFRESH_INTERVAL = 30.0
+FULL_REBUILD_INTERVAL = 900.0
+# Above this many candidate foods we stop scoring every candidate and rank the
+# most popular foods first, then fill alphabetically by matched word.
+RANK_SCAN_LIMIT = 4000
+POPULAR_POOL_SIZE = 2000
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_STATE_FIELDS = (
+    "_words", "_postings", "_names", "_popularity", "_popular",
+    "_max_food_id", "_max_log_id", "_built", "_built_at", "_checked_at",
+)
+
+
+def _words(value: Optional[str]) -> List[str]:
+    return _WORD_RE.findall((value or "").lower())
+
+
+class FoodAutocompleteIndex:
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._words: List[str] = []
+            self._postings: Dict[str, array] = {}
+            self._names: Dict[int, str] = {}
+            self._popularity: Dict[int, int] = {}
+            self._popular: List[int] = []
+            self._max_food_id = 0
+            self._max_log_id = 0
+            self._built = False
+            self._built_at = 0.0
+            self._dirty = False
+            self._stale = False
+            self._rebuilding = False
+            self._checked_at = 0.0
+
+    def mark_dirty(self) -> None:
+        self._dirty = True
+
+    def invalidate(self) -> None:
+        """Rebuild from scratch on next use (foods were renamed or deleted)."""
+        self._stale = True
+
+    # -- maintenance -------------------------------------------------------
+
+    def _add_foods(self, rows: Iterable[Tuple[int, Optional[str]]]) -> None:
+        for food_id, name in rows:
+            words = _words(name)
+            self._max_food_id = max(self._max_food_id, food_id)
+            if not words:
+                continue
+            self._names[food_id] = " " + " ".join(words)
+            for word in set(words):
+                posting = self._postings.get(word)
+                if posting is None:
+                    word = intern(word)
+                    posting = self._postings[word] = array("l")
+                    if self._built:
+                        insort(self._words, word)
+                posting.append(food_id)
+
+    def _add_log_counts(self) -> None:
+        rows = (
+            db.session.query(UserFoodLog.food_id, func.count(UserFoodLog.id), func.max(UserFoodLog.id))
+            .filter(UserFoodLog.id > self._max_log_id)
+            .group_by(UserFoodLog.food_id)
+            .all()
+        )
+        if not rows:
+            return
+        for food_id, count, max_id in rows:
+            self._popularity[food_id] = self._popularity.get(food_id, 0) + count
+            self._max_log_id = max(self._max_log_id, max_id or 0)
+        self._popular = heapq.nlargest(
+            POPULAR_POOL_SIZE, self._popularity, key=self._popularity.__getitem__
+        )
+
+    def _new_food_rows(self):
+        return (
+            db.session.query(Food.id, Food.name)
+            .filter(Food.id > self._max_food_id)
+            .order_by(Food.id)
+            .yield_per(10000)
+        )
+
+    def _rebuild(self) -> None:
+        # Build into a fresh index without holding our lock, so lookups keep
+        # answering from the current state, then swap the new state in.
+        fresh = FoodAutocompleteIndex()
+        fresh.refresh(force=True)
+        with self._lock:
+            for field in _STATE_FIELDS:
+                setattr(self, field, getattr(fresh, field))
+            self._rebuilding = False
+
+    def refresh(self, force: bool = False) -> None:
+        """Build the index on first use, then pull in foods and logs added since."""
+        with self._lock:
+            now = time.monotonic()
+            needs_rebuild = self._built and (self._stale or now - self._built_at >= FULL_REBUILD_INTERVAL)
+            if needs_rebuild and not self._rebuilding:
+                self._stale = False
+                self._rebuilding = True
+            else:
+                needs_rebuild = False
+        if needs_rebuild:
+            try:
+                self._rebuild()
+            except Exception:
+                with self._lock:
+                    self._stale = True
+                    self._rebuilding = False
+                raise
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            if self._built and not force and not self._dirty and now - self._checked_at < REFRESH_INTERVAL:
+                return
+            self._dirty = False
+            self._add_foods(self._new_food_rows())
+            if not self._built:
+                self._words = sorted(self._postings)
+                self._built = True
+                self._built_at = now
+            self._add_log_counts()
+            self._checked_at = now
+
+    # -- lookup ------------------------------------------------------------
+
+    def _prefix_range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect_left(self._words, prefix)
+        hi = bisect_left(self._words, prefix + "\uffff", lo)
+        return lo, hi
+
+    def _candidate_size(self, lo: int, hi: int, cap: int) -> int:
+        total = 0
+        for word in self._words[lo:hi]:
+            total += len(self._postings[word])
+            if total > cap:
+                break
+        return total
+
+    def lookup(self, query: str, limit: int = 10) -> List[int]:
+        """Return up to ``limit`` food ids whose words start with every query token."""
+        tokens = _words(query)
+        if not tokens or limit <= 0:
+            return []
+        self.refresh()
+
+        with self._lock:
+            ranges = [self._prefix_range(token) for token in tokens]
+            if any(lo == hi for lo, hi in ranges):
+                return []
+
+            # Drive the scan from the most selective token and check the rest
+            # against the normalized name.
+            sizes = [self._candidate_size(lo, hi, RANK_SCAN_LIMIT) for lo, hi in ranges]
+            driver = min(range(len(tokens)), key=sizes.__getitem__)
+            lo, hi = ranges[driver]
+            needles = [" " + token for index, token in enumerate(tokens) if index != driver]
+            names = self._names
+
+            def matches(food_id: int) -> bool:
+                name = names.get(food_id)
+                return name is not None and all(needle in name for needle in needles)
+
+            popularity = self._popularity
+            if sizes[driver] <= RANK_SCAN_LIMIT:
+                candidates = {
+                    food_id
+                    for word in self._words[lo:hi]
+                    for food_id in self._postings[word]
+                }
+                ranked = heapq.nsmallest(
+                    limit,
+                    (food_id for food_id in candidates if matches(food_id)),
+                    key=lambda food_id: (-popularity.get(food_id, 0), len(names[food_id]), food_id),
+                )
+                return ranked
+
+            prefix = " " + tokens[driver]
+            results: List[int] = []
+            for food_id in self._popular:
+                name = names.get(food_id)
+                if name and prefix in name and matches(food_id):
+                    results.append(food_id)
+                    if len(results) >= limit:
+                        return results
+            seen = set(results)
+            for word in self._words[lo:hi]:
+                for food_id in self._postings[word]:
+                    if food_id in seen or not matches(food_id):
+                        continue
+                    seen.add(food_id)
+                    results.append(food_id)
+                    if len(results) >= limit:
+                        return results
+            return results
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "foods": len(self._names),
+                "words": len(self._words),
+                "postings": sum(len(posting) for posting in self._postings.values()),
+                "popular_foods": len(self._popularity),
+            }
+
+
+food_autocomplete = FoodAutocompleteIndex()
+
+
+@event.listens_for(Food, "after_insert")
+def _food_inserted(mapper, connection, target) -> None:
+    food_autocomplete.mark_dirty()
+
+
+def _mark_stale(target) -> None:
+    session = inspect(target).session
+    if session is not None:
+        session.info["food_autocomplete_stale"] = True
+
+
+@event.listens_for(Food, "after_update")
+def _food_updated(mapper, connection, target) -> None:
+    if inspect(target).attrs.name.history.has_changes():
+        _mark_stale(target)
+
+
+@event.listens_for(Food, "after_delete")
+def _food_deleted(mapper, connection, target) -> None:
+    _mark_stale(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _rebuild_after_commit(session: Session) -> None:
+    if session.info.pop("food_autocomplete_stale", False):
+        food_autocomplete.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop("food_autocomplete_stale", None)
+
+
+def autocomplete_food_ids(query: str, limit: int = 10) -> List[int]:
+    return food_autocomplete.lookup(query, limit)
@@ -0,0 +1,228 @@
+"""Full-text search over food names.
+
+SQLite databases get an FTS5 index (``food_fts``) that mirrors ``food.name``.
+Triggers on the ``food`` table keep it in sync, so rows written by the USDA
+importer, custom-food creation or plain SQL are indexed without any extra
+application code. Other backends, and SQLite builds compiled without FTS5,
+fall back to a ranked ``LIKE`` query.
+
+The index is created by migration 5b1e7c9d2f40. ``init_food_search`` only
+warns at startup when it is missing; ``ensure_food_search_index`` builds it
+for schemas made with ``db.create_all()``, such as the test database.
+"""
+from __future__ import annotations
+
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func, text
+from sqlalchemy.engine import Engine
+
+from app import db
+from app.models import Food
+
+FOOD_FTS_TABLE = "food_fts"
+# Maximum number of matching rows scored with bm25 per query. Ranking is
+# approximate: when a query matches more rows than this, only the first
+# RANK_WINDOW in rowid order are scored, so a better match beyond them can be
+# missed.
+RANK_WINDOW = 2000
+# How long a "no FTS table" answer is trusted before sqlite_master is read again.
+FTS_RECHECK_SECONDS = 60.0
+
+FOOD_FTS_DDL = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FOOD_FTS_TABLE} USING fts5(
+        name,
+        content='food',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS food_fts_ai AFTER INSERT ON food BEGIN
+        INSERT INTO {FOOD_FTS_TABLE}(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS food_fts_ad AFTER DELETE ON food BEGIN
+        INSERT INTO {FOOD_FTS_TABLE}({FOOD_FTS_TABLE}, rowid, name) VALUES ('delete', old.id, old.name);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS food_fts_au AFTER UPDATE OF name ON food BEGIN
+        INSERT INTO {FOOD_FTS_TABLE}({FOOD_FTS_TABLE}, rowid, name) VALUES ('delete', old.id, old.name);
+        INSERT INTO {FOOD_FTS_TABLE}(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Engine URL -> (FTS table exists, monotonic time checked). A positive answer
+# is kept for the life of the process; a negative one expires so an index
+# created later (migration, another worker) is picked up.
+_FTS_READY: Dict[str, Tuple[bool, float]] = {}
+
+
+def _engine() -> Engine:
+    return db.engine
+
+
+def _tokens(query: str) -> List[str]:
+    return _TOKEN_RE.findall((query or "").lower())
+
+
+def _fts5_supported(engine: Engine) -> bool:
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.connect() as conn:
+        return bool(conn.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar())
+
+
+def _fts_table_exists(engine: Engine) -> bool:
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.connect() as conn:
+        return conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FOOD_FTS_TABLE},
+        ).first() is not None
+
+
+def fts_enabled(engine: Optional[Engine] = None) -> bool:
+    """Return True when the FTS5 food index exists for this engine."""
+    engine = engine or _engine()
+    key = str(engine.url)
+    cached = _FTS_READY.get(key)
+    now = time.monotonic()
+    if cached is None or (not cached[0] and now - cached[1] >= FTS_RECHECK_SECONDS):
+        cached = _FTS_READY[key] = (_fts_table_exists(engine), now)
+    return cached[0]
+
+
+def ensure_food_search_index(engine: Optional[Engine] = None, rebuild: bool = False) -> bool:
+    """Create the FTS5 table and sync triggers if missing; optionally rebuild from ``food``.
+
+    Returns False when the database cannot host the index (non-SQLite or no FTS5),
+    in which case searches use the ``LIKE`` fallback.
+    """
+    engine = engine or _engine()
+    if not _fts5_supported(engine):
+        return False
+
+    existed = _fts_table_exists(engine)
+    with engine.begin() as conn:
+        for statement in FOOD_FTS_DDL:
+            conn.exec_driver_sql(statement)
+        if rebuild or not existed:
+            conn.exec_driver_sql(f"INSERT INTO {FOOD_FTS_TABLE}({FOOD_FTS_TABLE}) VALUES ('rebuild')")
+    _FTS_READY[str(engine.url)] = (True, time.monotonic())
+    return True
+
+
+def init_food_search(app) -> None:
+    """Warn at startup when the ``food`` table exists without its FTS index.
+
+    Nothing is created here: concurrent workers would race to build the index
+    and the schema would change outside Alembic. ``flask db upgrade`` creates it.
+    """
+    with app.app_context():
+        engine = _engine()
+        if engine.dialect.name != "sqlite":
+            return
+        with engine.connect() as conn:
+            has_food = conn.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'food'"
+            ).first() is not None
+        # Before the first migration there is nothing to index yet.
+        if not has_food or fts_enabled(engine):
+            return
+        if _fts5_supported(engine):
+            app.logger.warning(
+                "The %s full-text index is missing; food search uses the LIKE fallback "
+                "until 'flask db upgrade' creates it",
+                FOOD_FTS_TABLE,
+            )
+        else:
+            app.logger.warning("SQLite was built without FTS5; food search uses the LIKE fallback")
+
+
+def _fts_match_expression(tokens: List[str], anchored: bool = False) -> str:
+    # Every token must match, the last one as a prefix so partially typed words hit.
+    terms = [f'"{token}"' for token in tokens[:-1]]
+    terms.append(f'"{tokens[-1]}"*')
+    if anchored:
+        terms[0] = "^" + terms[0]
+    return " ".join(terms)
+
+
+def _fts_food_ids(tokens: List[str], limit: int) -> List[int]:
+    # bm25 is only computed for a bounded window of candidates (RANK_WINDOW,
+    # taken unordered) so very common prefixes ("chi", "a") stay cheap on
+    # catalogs with millions of rows; the order is therefore only approximately
+    # top-ranked for such prefixes. Names that start with the query are
+    # collected first since they are almost always what the user is typing
+    # towards.
+    statement = text(
+        f"SELECT rowid FROM ("
+        f"SELECT rowid, rank FROM {FOOD_FTS_TABLE} WHERE {FOOD_FTS_TABLE} MATCH :match LIMIT :window"
+        f") ORDER BY rank LIMIT :limit"
+    )
+    food_ids: List[int] = []
+    for anchored in (True, False):
+        rows = db.session.execute(
+            statement,
+            {
+                "match": _fts_match_expression(tokens, anchored=anchored),
+                "window": RANK_WINDOW,
+                "limit": limit + len(food_ids),
+            },
+        )
+        for (food_id,) in rows:
+            if food_id not in food_ids:
+                food_ids.append(food_id)
+        if len(food_ids) >= limit:
+            break
+    return food_ids[:limit]
+
+
+def _like_food_ids(tokens: List[str], limit: int) -> List[int]:
+    phrase = " ".join(tokens)
+    relevance = case(
+        (func.lower(Food.name) == phrase, 0),
+        (Food.name.ilike(f"{phrase}%"), 1),
+        (Food.name.ilike(f"%{phrase}%"), 2),
+        else_=3,
+    )
+    stmt = db.select(Food.id).filter(Food.name.isnot(None))
+    for token in tokens:
+        stmt = stmt.filter(Food.name.ilike(f"%{token}%"))
+    stmt = stmt.order_by(relevance, func.length(Food.name), Food.id).limit(limit)
+    return list(db.session.execute(stmt).scalars())
+
+
+def find_food_ids(query: str, limit: int = 10) -> List[int]:
+    """Return food ids matching ``query``, best match first."""
+    tokens = _tokens(query)
+    if not tokens or limit <= 0:
+        return []
+    if fts_enabled():
+        return _fts_food_ids(tokens, limit)
+    return _like_food_ids(tokens, limit)
+
+
+def find_foods(query: str, limit: int = 10) -> List[Food]:
+    """Return ``Food`` rows matching ``query`` in relevance order."""
+    food_ids = find_food_ids(query, limit)
+    if not food_ids:
+        return []
+    by_id = {food.id: food for food in Food.query.filter(Food.id.in_(food_ids)).all()}
+    return [by_id[food_id] for food_id in food_ids if food_id in by_id]
+
+
+def best_food_match(query: str) -> Optional[Food]:
+    """Return the single most relevant food for ``query``, if any."""
+    matches = find_foods(query, limit=1)
+    return matches[0] if matches else None
@@ -1,9 +1,16 @@
 from __future__ import annotations
 
-from typing import Dict, Iterable, Optional, Tuple
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from pathlib import Path
 import json
+import threading
+import time
 
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app import db
 from app.models import (
     Food,
     FoodMeasure,
@@ -13,6 +20,7 @@ from app.models import (
     MemberMealIngredient,
     UNIT_TO_GRAMS,
 )
+from app.services.catalog_version import bump_catalog_version, get_catalog_version
 
 WEIGHT_OUNCE_IN_GRAMS = 28.3495
 FLUID_OUNCE_IN_ML = 29.5735
@@ -139,6 +147,121 @@ def scale_food_nutrients(food: Optional[Food], quantity_in_grams: float) -> Dict
     }
 
 
+NUTRIENT_KEYS = ("calories", "protein", "carbs", "fats")
+# Food columns holding per-gram values, in NUTRIENT_KEYS order.
+DENSITY_COLUMNS = ("calories_per_g", "protein_per_g", "carbs_per_g", "fats_per_g")
+
+
+def nutrient_densities(food) -> Dict[str, float]:
+    """Return the ``Food`` per-gram density columns for a food (or food-like object)."""
+    scaled = scale_food_nutrients(food, 1.0)
+    return {column: scaled[key] for column, key in zip(DENSITY_COLUMNS, NUTRIENT_KEYS)}
+
+
+def scale_nutrients_batch(
+    calories: Sequence[float],
+    protein: Sequence[float],
+    carbs: Sequence[float],
+    fats: Sequence[float],
+    serving_grams: Sequence[float],
+    quantities_in_grams: Sequence[float],
+) -> Dict[str, "numpy.ndarray"]:
+    """Vectorized ``scale_food_nutrients`` over parallel per-food arrays.
+
+    Inputs are the per-serving label values, the gram weight of that serving
+    and the logged quantity in grams. Calories follow the same rule as the
+    single-food path: macro-derived calories win whenever the food has any
+    macros, otherwise the label calories are scaled.
+    """
+    import numpy as np
+
+    calories = np.asarray(calories, dtype=float)
+    protein = np.asarray(protein, dtype=float)
+    carbs = np.asarray(carbs, dtype=float)
+    fats = np.asarray(fats, dtype=float)
+    serving_grams = np.asarray(serving_grams, dtype=float)
+    grams = np.asarray(quantities_in_grams, dtype=float)
+
+    factor = np.divide(grams, serving_grams, out=np.zeros_like(grams), where=serving_grams != 0)
+    macro_calories = protein * 4 + carbs * 4 + fats * 9
+    base_calories = np.where(macro_calories != 0, macro_calories, calories)
+    return {
+        "calories": base_calories * factor,
+        "protein": protein * factor,
+        "carbs": carbs * factor,
+        "fats": fats * factor,
+    }
+
+
+def scale_food_arrays(
+    foods: Sequence[Optional[Food]],
+    quantities_in_grams: Sequence[float],
+) -> Dict[str, "numpy.ndarray"]:
+    """Gather nutrient columns from ``foods`` and scale them in one batch.
+
+    Missing foods (None) contribute zeros.
+    """
+    count = len(foods)
+    calories = [0.0] * count
+    protein = [0.0] * count
+    carbs = [0.0] * count
+    fats = [0.0] * count
+    serving = [100.0] * count
+    grams = [float(value or 0.0) for value in quantities_in_grams]
+    for index, food in enumerate(foods):
+        if not food:
+            continue
+        calories[index] = food.calories or 0.0
+        protein[index] = food.protein_g or 0.0
+        carbs[index] = food.carbs_g or 0.0
+        fats[index] = food.fats_g or 0.0
+        serving[index] = _serving_grams(food)
+    return scale_nutrients_batch(calories, protein, carbs, fats, serving, grams)
+
+
+def scale_foods_nutrients(
+    foods: Sequence[Optional[Food]],
+    quantities_in_grams: Sequence[float],
+) -> List[Dict[str, float]]:
+    """Scale a batch of foods, pairing each with the gram quantity at the same position."""
+    if not foods:
+        return []
+    scaled = scale_food_arrays(foods, quantities_in_grams)
+    columns = [scaled[key].tolist() for key in NUTRIENT_KEYS]
+    return [dict(zip(NUTRIENT_KEYS, values)) for values in zip(*columns)]
+
+
+def sum_foods_nutrients(
+    foods: Sequence[Optional[Food]],
+    quantities_in_grams: Sequence[float],
+) -> Dict[str, float]:
+    """Total calories and macros for a batch of (food, grams) pairs."""
+    if not foods:
+        return {key: 0.0 for key in NUTRIENT_KEYS}
+    scaled = scale_food_arrays(foods, quantities_in_grams)
+    return {key: float(scaled[key].sum()) for key in NUTRIENT_KEYS}
+
+
+def measure_grams_for_foods(food_ids: Iterable[int], unit: str) -> Dict[int, float]:
+    """Return ``{food_id: grams}`` for a named measure across many foods in one query."""
+    ids = {food_id for food_id in food_ids if food_id is not None}
+    name = _normalize_unit(unit)
+    if not ids or not name:
+        return {}
+    rows = (
+        FoodMeasure.query
+        .with_entities(FoodMeasure.food_id, FoodMeasure.grams)
+        .filter(FoodMeasure.food_id.in_(ids), FoodMeasure.measure_name == name)
+        .order_by(FoodMeasure.id.asc())
+        .all()
+    )
+    grams_by_food: Dict[int, float] = {}
+    for food_id, grams in rows:
+        if grams and food_id not in grams_by_food:
+            grams_by_food[food_id] = float(grams)
+    return grams_by_food
+
+
 def derive_macro_targets(
     calorie_target: Optional[float],
     custom_protein_g: Optional[float],
@@ -184,11 +307,17 @@ def derive_macro_targets(
 
 def find_measure(food_id: int, unit: str) -> Optional[FoodMeasure]:
     """Try to locate a FoodMeasure for a given unit name, ignoring pluralization and punctuation."""
-    for candidate in _candidate_units(unit):
-        if not candidate:
-            continue
-        measure = FoodMeasure.query.filter_by(food_id=food_id, measure_name=candidate).first()
-        if measure and measure.grams:
+    candidates = [candidate for candidate in _candidate_units(unit) if candidate]
+    if not candidates:
+        return None
+    measures = (
+        FoodMeasure.query
+        .filter(FoodMeasure.food_id == food_id, FoodMeasure.measure_name.in_(candidates))
+        .order_by(FoodMeasure.id.asc())
+        .all()
+    )
+    for measure in measures:
+        if measure.grams:
             return measure
     return None
 
@@ -208,6 +337,197 @@ def _override_measure(food: Optional[Food], unit: str) -> Optional[float]:
     return None
 
 
+_CACHE_MISS = object()
+# ``catalog_version`` row bumped whenever food measures change, so every
+# worker's cache can tell that another process wrote new values.
+MEASURE_CATALOG = "food_measures"
+VERSION_CHECK_INTERVAL = 5.0
+
+
+class MeasureCache:
+    """Bounded LRU of resolved grams-per-unit keyed by ``(food_id, normalized unit)``.
+
+    Unresolvable units are cached as ``None`` too, so repeated misses stay cheap.
+    Entries for a food are dropped whenever one of its ``FoodMeasure`` rows is
+    written, or its name or serving columns change, through the app session,
+    and again on commit or rollback. Writes from other processes bump the
+    ``food_measures`` catalog version; the cache polls it at most every
+    ``VERSION_CHECK_INTERVAL`` seconds and empties itself when it has moved.
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[int, str], Optional[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+
+    def sync_version(self) -> None:
+        """Drop every entry if another process changed food measures."""
+        now = time.monotonic()
+        if now - self._checked_at < VERSION_CHECK_INTERVAL:
+            return
+        version = get_catalog_version(MEASURE_CATALOG)
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            self._checked_at = now
+
+    def get(self, food_id: int, unit: str):
+        key = (food_id, unit)
+        with self._lock:
+            value = self._entries.get(key, _CACHE_MISS)
+            if value is _CACHE_MISS:
+                self.misses += 1
+                return _CACHE_MISS
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, food_id: int, unit: str, grams: Optional[float]) -> None:
+        with self._lock:
+            self._entries[(food_id, unit)] = grams
+            self._entries.move_to_end((food_id, unit))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate_food(self, food_id: Optional[int]) -> None:
+        if food_id is None:
+            return
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == food_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self._version = None
+            self._checked_at = 0.0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "version": self._version,
+            }
+
+
+measure_cache = MeasureCache()
+
+
+def grams_per_unit(food_id: int, unit: Optional[str]) -> Optional[float]:
+    """Return grams for one ``unit`` of a food, or None when no conversion rule applies.
+
+    Resolution order is the food's own measures, the generic ``UNIT_TO_GRAMS``
+    table, then the bundled measure overrides. Results are memoized in
+    ``measure_cache``.
+    """
+    normalized_unit = _normalize_unit(unit)
+    if not normalized_unit or normalized_unit == "g":
+        return 1.0
+
+    measure_cache.sync_version()
+    cached = measure_cache.get(food_id, normalized_unit)
+    if cached is not _CACHE_MISS:
+        return cached
+
+    grams: Optional[float] = None
+    measure = find_measure(food_id, normalized_unit)
+    if measure and measure.grams:
+        grams = float(measure.grams)
+    elif normalized_unit in UNIT_TO_GRAMS:
+        grams = float(UNIT_TO_GRAMS[normalized_unit])
+    else:
+        grams = _override_measure(Food.query.get(food_id), normalized_unit)
+
+    measure_cache.put(food_id, normalized_unit, grams)
+    return grams
+
+
+# Food columns that feed unit resolution: the bundled overrides are keyed by
+# name, and the serving columns describe the food's own unit.
+MEASURE_FOOD_FIELDS = ("name", "serving_size", "serving_unit", "grams_per_unit")
+
+
+def _pending_invalidations(session: Session) -> set:
+    return session.info.setdefault("measure_cache_food_ids", set())
+
+
+def _invalidate_measure_foods(target, food_ids) -> None:
+    for food_id in food_ids:
+        measure_cache.invalidate_food(food_id)
+    session = inspect(target).session
+    if session is not None:
+        _pending_invalidations(session).update(food_ids)
+
+
+def _invalidate_measure_target(mapper, connection, target) -> None:
+    food_ids = {target.food_id}
+    food_ids.update(inspect(target).attrs.food_id.history.deleted or ())
+    _invalidate_measure_foods(target, food_ids)
+
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(FoodMeasure, _event_name, _invalidate_measure_target)
+
+
+@event.listens_for(Food, "after_update")
+def _invalidate_food_serving(mapper, connection, target) -> None:
+    # A new food cannot have cached entries, and macro edits do not change
+    # grams per unit, so only these columns count.
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in MEASURE_FOOD_FIELDS):
+        _invalidate_measure_foods(target, {target.id})
+
+
+@event.listens_for(Food, "after_delete")
+def _forget_deleted_food(mapper, connection, target) -> None:
+    # Nothing can look a deleted food up again, so other workers need no bump.
+    measure_cache.invalidate_food(target.id)
+
+
+def _has_measure_changes(session: Session) -> bool:
+    if any(isinstance(obj, FoodMeasure) for obj in (*session.new, *session.dirty, *session.deleted)):
+        return True
+    return any(isinstance(obj, Food) for obj in session.dirty)
+
+
+@event.listens_for(db.session, "before_commit")
+def _bump_measure_version(session: Session) -> None:
+    # Flush first so measure changes still pending in the session are counted;
+    # commits that touch no foods or measures skip it.
+    if _has_measure_changes(session):
+        session.flush()
+    if session.info.get("measure_cache_food_ids"):
+        bump_catalog_version(MEASURE_CATALOG, session)
+
+
+@event.listens_for(db.session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    # Another request may have re-cached the old value between our flush and
+    # commit, so drop the affected foods once more when the change is visible.
+    food_ids = session.info.pop("measure_cache_food_ids", None)
+    for food_id in food_ids or ():
+        measure_cache.invalidate_food(food_id)
+
+
+@event.listens_for(db.session, "after_rollback")
+def _invalidate_after_rollback(session: Session) -> None:
+    # Lookups between the flush and the rollback may have cached values that
+    # were never committed.
+    food_ids = session.info.pop("measure_cache_food_ids", None)
+    for food_id in food_ids or ():
+        measure_cache.invalidate_food(food_id)
+
+
 def convert_to_grams(
     food_id: int,
     quantity: float,
@@ -228,23 +548,12 @@ def convert_to_grams(
     grams: Optional[float] = None
     volume_ml: Optional[float] = None
 
-    food = Food.query.get(food_id)
-
     if grams_override is not None:
         grams = float(quantity) * float(grams_override)
     else:
-        if not normalized_unit or normalized_unit == "g":
-            grams = float(quantity)
-        else:
-            measure = find_measure(food_id, normalized_unit)
-            if measure and measure.grams:
-                grams = float(quantity) * float(measure.grams)
-            elif normalized_unit in UNIT_TO_GRAMS:
-                grams = float(quantity) * float(UNIT_TO_GRAMS[normalized_unit])
-            else:
-                override_grams = _override_measure(food, normalized_unit)
-                if override_grams:
-                    grams = float(quantity) * override_grams
+        unit_grams = grams_per_unit(food_id, normalized_unit)
+        if unit_grams:
+            grams = float(quantity) * unit_grams
 
     # Fallback to direct grams if no conversion rule found
     if grams is None:
@@ -261,17 +570,11 @@ def convert_to_grams(
 
 
 def calculate_meal_macros(meal: TrainerMeal) -> Dict[str, float]:
-    totals = {"calories": 0.0, "protein": 0.0, "carbs": 0.0, "fats": 0.0}
-    for ingredient in meal.ingredients:
-        scaled = scale_food_nutrients(
-            ingredient.food,
-            float(ingredient.quantity_grams or 0.0)
-        )
-        totals["calories"] += scaled["calories"]
-        totals["protein"] += scaled["protein"]
-        totals["carbs"] += scaled["carbs"]
-        totals["fats"] += scaled["fats"]
-
+    ingredients = list(meal.ingredients)
+    totals = sum_foods_nutrients(
+        [ingredient.food for ingredient in ingredients],
+        [float(ingredient.quantity_grams or 0.0) for ingredient in ingredients],
+    )
     return {key: round(value, 1) for key, value in totals.items()}
 
 
@@ -0,0 +1,275 @@
+"""Opt-in per-request SQL and timing instrumentation.
+
+Enabled with ``PERF_INSTRUMENTATION=True``. Every request then records how
+many statements it executed, the time spent in SQL and the remaining Python
+time, aggregated per endpoint. Requests slower than ``PERF_SLOW_REQUEST_MS``
+are logged with their most repeated statements, which is usually enough to
+spot an N+1 loop. Aggregates are served as JSON at ``/_debug/perf`` only when
+``PERF_DEBUG_ENDPOINT`` is set as well, and only to requests that carry
+``PERF_DEBUG_TOKEN`` in an ``X-Perf-Token`` header. The client address is
+not trusted, since behind a local reverse proxy every request is 127.0.0.1.
+
+``record_queries()`` exposes the same statement hooks to scripts and tests
+without the Flask side.
+"""
+from __future__ import annotations
+
+import hmac
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from flask import Blueprint, abort, current_app, g, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+TOP_STATEMENTS = 5
+# Expanded IN lists vary in length; fold them so repeats group together.
+_PARAM_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+_local = threading.local()
+_installed = False
+_install_lock = threading.Lock()
+
+
+def _normalize(statement: str) -> str:
+    return _PARAM_LIST_RE.sub("(?, ...)", " ".join(statement.split()))
+
+
+class QueryRecorder:
+    """Counts statements and SQL time while it is active."""
+
+    def __init__(self, keep_samples: bool = False) -> None:
+        self.count = 0
+        self.sql_seconds = 0.0
+        self.statements: Dict[str, List[float]] = {}
+        # Normalized statement -> first raw (statement, parameters) seen, for EXPLAIN.
+        self.samples: Optional[Dict[str, Tuple[str, Any]]] = {} if keep_samples else None
+
+    def record(self, statement: str, seconds: float, parameters: Any = None, executemany: bool = False) -> None:
+        self.count += 1
+        self.sql_seconds += seconds
+        normalized = _normalize(statement)
+        entry = self.statements.setdefault(normalized, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+        if self.samples is not None and not executemany and normalized not in self.samples:
+            self.samples[normalized] = (statement, parameters)
+
+    def top_repeated(self, limit: int = TOP_STATEMENTS) -> List[Tuple[str, int, float]]:
+        """Statements run more than once, as ``(sql, count, total_ms)``, most frequent first."""
+        repeated = [
+            (statement, int(count), seconds * 1000)
+            for statement, (count, seconds) in self.statements.items()
+            if count > 1
+        ]
+        repeated.sort(key=lambda item: (-item[1], -item[2]))
+        return repeated[:limit]
+
+
+def _recorders() -> List[QueryRecorder]:
+    recorders = getattr(_local, "recorders", None)
+    if recorders is None:
+        recorders = _local.recorders = []
+    return recorders
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _recorders():
+        conn.info.setdefault("perf_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    starts = conn.info.get("perf_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    for recorder in _recorders():
+        recorder.record(statement, elapsed, parameters, executemany)
+
+
+def _handle_error(exception_context) -> None:
+    # after_cursor_execute does not fire for a failed statement; drop its
+    # start time so the stack stays aligned with the statements in flight.
+    connection = exception_context.connection
+    if connection is None or exception_context.statement is None:
+        return
+    starts = connection.info.get("perf_query_start")
+    if starts:
+        starts.pop()
+
+
+def install_query_hooks() -> None:
+    """Attach the cursor listeners to every engine; idempotent."""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+        _installed = True
+
+
+@contextmanager
+def record_queries(keep_samples: bool = False) -> Iterator[QueryRecorder]:
+    """Record every statement executed by this thread inside the block.
+
+    With ``keep_samples`` the recorder also keeps one raw statement and its
+    parameters per distinct query, which is what the index advisor explains.
+    """
+    install_query_hooks()
+    recorder = QueryRecorder(keep_samples)
+    recorders = _recorders()
+    recorders.append(recorder)
+    try:
+        yield recorder
+    finally:
+        recorders.remove(recorder)
+
+
+class PerfStats:
+    """Per-endpoint request aggregates, shared by all threads of a worker."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, Dict[str, float]] = {}
+
+    def add(self, endpoint: str, total_ms: float, sql_ms: float, queries: int, slow: bool) -> None:
+        with self._lock:
+            entry = self._endpoints.setdefault(endpoint, dict.fromkeys(
+                ("requests", "total_ms", "sql_ms", "python_ms", "queries", "max_ms", "max_queries", "slow"), 0
+            ))
+            entry["requests"] += 1
+            entry["total_ms"] += total_ms
+            entry["sql_ms"] += sql_ms
+            entry["python_ms"] += total_ms - sql_ms
+            entry["queries"] += queries
+            entry["max_ms"] = max(entry["max_ms"], total_ms)
+            entry["max_queries"] = max(entry["max_queries"], queries)
+            entry["slow"] += int(slow)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per-endpoint averages and maxima, slowest average first."""
+        with self._lock:
+            rows = {name: dict(entry) for name, entry in self._endpoints.items()}
+        result = {}
+        for name, entry in sorted(rows.items(), key=lambda item: -item[1]["total_ms"] / item[1]["requests"]):
+            requests = entry["requests"]
+            result[name] = {
+                "requests": requests,
+                "avg_ms": round(entry["total_ms"] / requests, 2),
+                "avg_sql_ms": round(entry["sql_ms"] / requests, 2),
+                "avg_python_ms": round(entry["python_ms"] / requests, 2),
+                "avg_queries": round(entry["queries"] / requests, 2),
+                "max_ms": round(entry["max_ms"], 2),
+                "max_queries": entry["max_queries"],
+                "slow_requests": entry["slow"],
+            }
+        return result
+
+
+perf_stats = PerfStats()
+
+
+def _cache_stats() -> Dict[str, Dict[str, int]]:
+    from app.services.exercise_catalog import exercise_catalog
+    from app.services.food_autocomplete import food_autocomplete
+    from app.services.nutrition import measure_cache
+
+    return {
+        "measure_cache": measure_cache.stats(),
+        "food_autocomplete": food_autocomplete.stats(),
+        "exercise_catalog": exercise_catalog.stats(),
+    }
+
+
+perf_bp = Blueprint("perf", __name__, url_prefix="/_debug")
+
+
+@perf_bp.route("/perf")
+def perf_report():
+    token = current_app.config.get("PERF_DEBUG_TOKEN") or ""
+    supplied = request.headers.get("X-Perf-Token", "")
+    if not token or not hmac.compare_digest(supplied.encode(), token.encode()):
+        abort(404)
+    if request.args.get("reset"):
+        perf_stats.reset()
+    return jsonify({
+        "slow_request_ms": current_app.config.get("PERF_SLOW_REQUEST_MS"),
+        "endpoints": perf_stats.summary(),
+        "caches": _cache_stats(),
+    })
+
+
+def _start_request() -> None:
+    recorder = QueryRecorder()
+    _recorders().append(recorder)
+    g._perf = (time.perf_counter(), recorder)
+
+
+def _current() -> Optional[Tuple[float, QueryRecorder]]:
+    return g.pop("_perf", None)
+
+
+def _finish_request(response):
+    started, recorder = g.get("_perf", (None, None))
+    if recorder is not None:
+        total_ms = (time.perf_counter() - started) * 1000
+        sql_ms = recorder.sql_seconds * 1000
+        response.headers["Server-Timing"] = (
+            f'sql;dur={sql_ms:.1f};desc="{recorder.count} queries", app;dur={total_ms - sql_ms:.1f}'
+        )
+    return response
+
+
+def _teardown_request(exc) -> None:
+    current = _current()
+    if current is None:
+        return
+    started, recorder = current
+    recorders = _recorders()
+    if recorder in recorders:
+        recorders.remove(recorder)
+
+    total_ms = (time.perf_counter() - started) * 1000
+    sql_ms = recorder.sql_seconds * 1000
+    endpoint = request.endpoint or request.path
+    threshold = current_app.config.get("PERF_SLOW_REQUEST_MS") or 0
+    slow = bool(threshold) and total_ms >= threshold
+    perf_stats.add(endpoint, total_ms, sql_ms, recorder.count, slow)
+    if slow:
+        lines = [
+            f"    {count}x {ms:.1f}ms  {statement[:200]}"
+            for statement, count, ms in recorder.top_repeated()
+        ]
+        current_app.logger.warning(
+            "Slow request %s %s (%s): %.1fms total, %.1fms SQL across %d queries%s",
+            request.method,
+            request.path,
+            endpoint,
+            total_ms,
+            sql_ms,
+            recorder.count,
+            ("\n  top repeated statements:\n" + "\n".join(lines)) if lines else "",
+        )
+
+
+def init_perf(app) -> None:
+    """Wire the instrumentation into ``app`` when ``PERF_INSTRUMENTATION`` is set."""
+    if not app.config.get("PERF_INSTRUMENTATION"):
+        return
+    install_query_hooks()
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_teardown_request)
+    if app.config.get("PERF_DEBUG_ENDPOINT"):
+        if not app.config.get("PERF_DEBUG_TOKEN"):
+            app.logger.warning("PERF_DEBUG_ENDPOINT is set without PERF_DEBUG_TOKEN; /_debug/perf stays disabled")
+        app.register_blueprint(perf_bp)
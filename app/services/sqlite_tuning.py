@@ -0,0 +1,73 @@
+"""Connection pragmas for running on a file-backed SQLite database.
+
+Stock SQLite uses a rollback journal, so a writer locks out every reader and
+concurrent workers fail with "database is locked". The profile applied here
+on every new DB-API connection switches to WAL (readers no longer block on
+the writer), waits ``busy_timeout`` for a lock instead of failing at once,
+and gives each connection a larger page cache, a memory map and in-memory
+temp tables. Every value comes from ``config.Config`` (``SQLITE_*``); set
+``SQLITE_TUNING=False`` to keep the stock settings.
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+from sqlalchemy import event
+
+_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+_SYNCHRONOUS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+_TEMP_STORE = {"DEFAULT", "FILE", "MEMORY"}
+
+
+def _choice(config, key: str, allowed) -> str:
+    value = str(config[key]).upper()
+    if value not in allowed:
+        raise ValueError(f"{key}={config[key]!r}; expected one of {', '.join(sorted(allowed))}")
+    return value
+
+
+def pragma_profile(config) -> List[Tuple[str, object]]:
+    """The ``(pragma, value)`` pairs to run on connect, in order."""
+    return [
+        ("journal_mode", _choice(config, "SQLITE_JOURNAL_MODE", _JOURNAL_MODES)),
+        ("synchronous", _choice(config, "SQLITE_SYNCHRONOUS", _SYNCHRONOUS)),
+        ("busy_timeout", int(config["SQLITE_BUSY_TIMEOUT_MS"])),
+        ("mmap_size", int(config["SQLITE_MMAP_SIZE"])),
+        ("cache_size", int(config["SQLITE_CACHE_SIZE"])),
+        ("temp_store", _choice(config, "SQLITE_TEMP_STORE", _TEMP_STORE)),
+    ]
+
+
+def apply_pragmas(engine, profile: List[Tuple[str, object]]) -> None:
+    """Run ``profile`` on every connection ``engine`` opens from now on."""
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in profile:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def current_pragmas(connection) -> Dict[str, object]:
+    """The values SQLite reports for the profile's pragmas on ``connection``."""
+    return {
+        name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+        for name in ("journal_mode", "synchronous", "busy_timeout", "mmap_size", "cache_size", "temp_store")
+    }
+
+
+def init_sqlite_tuning(app, db) -> None:
+    """Install the pragma profile on ``db``'s engine for file-backed SQLite databases."""
+    if not app.config.get("SQLITE_TUNING"):
+        return
+    profile = pragma_profile(app.config)
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name != "sqlite" or engine.url.database in (None, "", ":memory:"):
+            return
+        apply_pragmas(engine, profile)
+        # Connections pooled before the listener existed keep stock settings.
+        engine.dispose()
@@ -0,0 +1,383 @@
+"""Bulk loading of USDA FoodData Central records into ``food``/``food_measure``.
+
+Records are normalized into plain dicts (``normalize_fdc_food``) and written
+in chunks with Core ``executemany`` statements. Existing foods are matched by
+``source_id`` against a map loaded once per import instead of one query per
+record, and existing portions are fetched with one ``IN`` query per chunk.
+
+Each normalized food carries a ``content_hash`` of its stored payload. On a
+refresh, foods whose hash matches the database are skipped outright, so only
+records that changed between FDC releases are rewritten.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import bindparam
+
+from app import db
+from app.models import Food, FoodMeasure, UsdaImportState
+from app.services.catalog_version import bump_catalog_version
+from app.services.daily_totals import rebuild_daily_totals_for_foods
+from app.services.nutrition import DENSITY_COLUMNS, MEASURE_CATALOG, nutrient_densities
+from app.services.usda_stream import iter_fdc_foods, iter_fdc_record_batches
+
+KILOJOULE_TO_KILOCALORIE = 1 / 4.184
+CHUNK_SIZE = 2000
+# Raw records handed to a worker process at a time.
+WORKER_BATCH_SIZE = 500
+
+_MACRO_NUTRIENTS = {
+    "Protein": "protein_g",
+    "Carbohydrate, by difference": "carbs_g",
+    "Total lipid (fat)": "fats_g",
+}
+
+
+def normalize_fdc_food(food_data: dict) -> Optional[dict]:
+    """Reduce a raw FDC record to the columns we store, or None to skip it.
+
+    Nutrients are per 100 g. Energy reported in kJ is converted to kcal, and a
+    kcal value wins when both are present.
+    """
+    description = food_data.get("description", "")
+    if not description:
+        return None
+
+    macros = {column: 0 for column in _MACRO_NUTRIENTS.values()}
+    energy_kcal = None
+    for nutrient in food_data.get("foodNutrients", []):
+        nutrient_info = nutrient.get("nutrient", {})
+        name = nutrient_info.get("name")
+        if not name:
+            continue
+
+        amount = nutrient.get("amount") or 0
+        unit = (nutrient_info.get("unitName") or "").lower()
+
+        if name == "Energy":
+            converted = amount * KILOJOULE_TO_KILOCALORIE if unit == "kj" else amount
+            if energy_kcal is None or unit != "kj":
+                energy_kcal = converted
+        elif name in _MACRO_NUTRIENTS:
+            macros[_MACRO_NUTRIENTS[name]] = amount
+
+    # Later portions with the same measure name win, as they did row-by-row.
+    portions: Dict[str, float] = {}
+    for portion in food_data.get("foodPortions", []) or []:
+        measure_name = ((portion.get("measureUnit") or {}).get("name") or "").lower()
+        gram_weight = portion.get("gramWeight") or 0
+        if measure_name and gram_weight > 0:
+            portions[measure_name] = gram_weight
+
+    food = {
+        "source_id": str(food_data.get("fdcId")),
+        "name": description,
+        "calories": energy_kcal or 0,
+        "serving_size": 100,
+        "serving_unit": "g",
+        "portions": sorted(portions.items()),
+        **macros,
+    }
+    food["content_hash"] = content_hash(food)
+    return food
+
+
+def content_hash(food: dict) -> str:
+    """Stable digest of everything we store for a normalized food."""
+    payload = json.dumps(
+        {key: value for key, value in food.items() if key != "content_hash"},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def normalize_raw_records(raw_records: List[bytes]) -> List[dict]:
+    """Decode and normalize a batch of raw JSON records; runs in worker processes."""
+    foods = []
+    for raw in raw_records:
+        food = normalize_fdc_food(json.loads(raw))
+        if food is not None:
+            foods.append(food)
+    return foods
+
+
+def iter_normalized_foods(
+    path: str, workers: int = 1, start_offset: Optional[int] = None
+) -> Iterator[Tuple[List[dict], int, int]]:
+    """Yield ``(foods, end_offset, records_read)`` batches in file order.
+
+    With ``workers > 1`` the file is sliced into raw records in this process
+    and decoding plus normalization run in a process pool; results are still
+    yielded in order so a single writer can load them.
+    """
+    if workers <= 1:
+        batch: List[dict] = []
+        records = 0
+        end_offset = start_offset
+        for food_data, end_offset in iter_fdc_foods(path, start_offset):
+            records += 1
+            food = normalize_fdc_food(food_data)
+            if food is not None:
+                batch.append(food)
+            if records >= WORKER_BATCH_SIZE:
+                yield batch, end_offset, records
+                batch, records = [], 0
+        if records:
+            yield batch, end_offset, records
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for raw_records, end_offset in iter_fdc_record_batches(path, start_offset, WORKER_BATCH_SIZE):
+            in_flight.append((pool.submit(normalize_raw_records, raw_records), end_offset, len(raw_records)))
+            # Bound read-ahead so memory stays flat on multi-GB files.
+            if len(in_flight) >= workers * 4:
+                future, offset, records = in_flight.popleft()
+                yield future.result(), offset, records
+        while in_flight:
+            future, offset, records = in_flight.popleft()
+            yield future.result(), offset, records
+
+
+class UsdaBulkLoader:
+    """Write normalized FDC foods in chunks, one commit per chunk.
+
+    ``counts`` tracks foods added, changed and unchanged, portions added and
+    updated, and member days whose daily totals were rebuilt, across every
+    file passed through the loader.
+    """
+
+    def __init__(self, chunk_size: int = CHUNK_SIZE, on_commit: Optional[Callable[[], None]] = None) -> None:
+        self.chunk_size = chunk_size
+        # Called inside each chunk's transaction just before it commits, so
+        # checkpoints are written atomically with the rows they describe.
+        self.on_commit = on_commit
+        self.counts = dict.fromkeys(
+            ("added", "changed", "unchanged", "portions_added", "portions_updated", "totals_rebuilt"), 0
+        )
+        self.seen_source_ids: Set[str] = set()
+        self._known = self._load_known_foods()
+        self._pending: List[dict] = []
+
+    @staticmethod
+    def _load_known_foods() -> Dict[str, Tuple[int, Optional[str]]]:
+        rows = db.session.execute(
+            db.select(Food.source_id, Food.id, Food.content_hash).where(Food.source_id.isnot(None))
+        )
+        return {source_id: (food_id, digest) for source_id, food_id, digest in rows}
+
+    def add(self, food: dict) -> bool:
+        """Queue a normalized food; returns True when a chunk was flushed."""
+        return self.add_many([food])
+
+    def add_many(self, foods: Iterable[dict]) -> bool:
+        """Queue a batch of foods, flushing once the chunk is full.
+
+        Chunks only ever end on batch boundaries, so a checkpoint taken in
+        ``on_commit`` always covers whole batches.
+        """
+        self._pending.extend(foods)
+        if len(self._pending) >= self.chunk_size:
+            self.flush()
+            return True
+        return False
+
+    def flush(self) -> None:
+        chunk, self._pending = self._pending, []
+        if chunk:
+            self._write_chunk(chunk)
+        if self.on_commit is not None:
+            self.on_commit()
+        db.session.commit()
+
+    def removed_source_ids(self) -> List[str]:
+        """Previously imported foods that none of the processed files contained.
+
+        Only meaningful once every file of a release has been loaded. Rows are
+        left in place because member food logs may still reference them.
+        """
+        return [
+            source_id
+            for source_id, (_, digest) in self._known.items()
+            if digest is not None and source_id not in self.seen_source_ids
+        ]
+
+    def _write_chunk(self, chunk: List[dict]) -> None:
+        food_table = Food.__table__
+        new_rows = []
+        changed_rows = []
+        touched = []
+        for food in chunk:
+            source_id = food["source_id"]
+            if source_id in self.seen_source_ids:
+                continue
+            self.seen_source_ids.add(source_id)
+            row = {key: value for key, value in food.items() if key != "portions"}
+            # Core writes bypass the Food mapper listener, so fill densities here.
+            row.update(nutrient_densities(SimpleNamespace(**row)))
+            known = self._known.get(source_id)
+            if known is None:
+                new_rows.append(row)
+                touched.append(food)
+            elif known[1] != food["content_hash"]:
+                changed_rows.append({"target_id": known[0], **row})
+                touched.append(food)
+            else:
+                self.counts["unchanged"] += 1
+
+        if new_rows:
+            inserted = db.session.execute(
+                food_table.insert().returning(
+                    food_table.c.id, food_table.c.source_id, food_table.c.content_hash
+                ),
+                new_rows,
+            )
+            for food_id, source_id, digest in inserted:
+                self._known[source_id] = (food_id, digest)
+            self.counts["added"] += len(new_rows)
+
+        if changed_rows:
+            repriced = self._repriced_food_ids(changed_rows)
+            columns = [key for key in changed_rows[0] if key not in ("target_id", "source_id")]
+            db.session.execute(
+                food_table.update()
+                .where(food_table.c.id == bindparam("target_id"))
+                .values({column: bindparam(f"new_{column}") for column in columns}),
+                [
+                    {"target_id": row["target_id"], **{f"new_{column}": row[column] for column in columns}}
+                    for row in changed_rows
+                ],
+            )
+            for row in changed_rows:
+                self._known[row["source_id"]] = (row["target_id"], row["content_hash"])
+            self.counts["changed"] += len(changed_rows)
+            # Only days that logged a food whose macros moved have stale totals.
+            if repriced:
+                self.counts["totals_rebuilt"] += rebuild_daily_totals_for_foods(repriced)
+
+        portions_written = self._write_portions(
+            (self._known[food["source_id"]][0], food["portions"]) for food in touched if food["portions"]
+        )
+        # Core writes bypass the ORM listeners that keep measure caches fresh;
+        # the version bump tells every worker to drop its cached grams.
+        if changed_rows or portions_written:
+            bump_catalog_version(MEASURE_CATALOG)
+
+    @staticmethod
+    def _repriced_food_ids(changed_rows: List[dict]) -> List[int]:
+        """Ids among ``changed_rows`` whose stored per-gram macros differ from the new ones.
+
+        A new hash alone (portions or name changed, or a row imported before
+        hashes existed) leaves logged totals as they are.
+        """
+        stored = {
+            food_id: densities
+            for food_id, *densities in db.session.execute(
+                db.select(Food.id, *(getattr(Food, column) for column in DENSITY_COLUMNS))
+                .where(Food.id.in_([row["target_id"] for row in changed_rows]))
+            )
+        }
+        repriced = []
+        for row in changed_rows:
+            old = stored.get(row["target_id"])
+            if old is None or any(
+                before is None or not math.isclose(before, row[column] or 0.0, rel_tol=1e-9, abs_tol=1e-12)
+                for before, column in zip(old, DENSITY_COLUMNS)
+            ):
+                repriced.append(row["target_id"])
+        return repriced
+
+    def _write_portions(self, food_portions: Iterable[Tuple[int, List[Tuple[str, float]]]]) -> int:
+        wanted: Dict[Tuple[int, str], float] = {}
+        for food_id, portions in food_portions:
+            for measure_name, grams in portions:
+                wanted[(food_id, measure_name)] = grams
+        if not wanted:
+            return 0
+
+        measure_table = FoodMeasure.__table__
+        food_ids = {food_id for food_id, _ in wanted}
+        existing: Dict[Tuple[int, str], Tuple[int, float]] = {}
+        rows = db.session.execute(
+            db.select(measure_table.c.id, measure_table.c.food_id, measure_table.c.measure_name, measure_table.c.grams)
+            .where(measure_table.c.food_id.in_(food_ids))
+        )
+        for measure_id, food_id, measure_name, grams in rows:
+            existing.setdefault((food_id, measure_name), (measure_id, grams))
+
+        inserts = []
+        updates = []
+        for (food_id, measure_name), grams in wanted.items():
+            current = existing.get((food_id, measure_name))
+            if current is None:
+                inserts.append({"food_id": food_id, "measure_name": measure_name, "grams": grams})
+            elif current[1] != grams:
+                updates.append({"measure_id": current[0], "new_grams": grams})
+
+        if inserts:
+            db.session.execute(measure_table.insert(), inserts)
+            self.counts["portions_added"] += len(inserts)
+        if updates:
+            db.session.execute(
+                measure_table.update()
+                .where(measure_table.c.id == bindparam("measure_id"))
+                .values(grams=bindparam("new_grams")),
+                updates,
+            )
+            self.counts["portions_updated"] += len(updates)
+        return len(inserts) + len(updates)
+
+
+class ImportCheckpoint:
+    """Resume point for one FDC file, stored in ``usda_import_state``.
+
+    A checkpoint only applies to the exact file it was taken from: if the
+    size or modification time differ (a new release was downloaded), it is
+    discarded and the import starts over.
+    """
+
+    def __init__(self, path: str) -> None:
+        stat = os.stat(path)
+        self.file_name = os.path.basename(path)
+        self.file_size = stat.st_size
+        self.file_mtime = stat.st_mtime
+        self.byte_offset: Optional[int] = None
+        self.record_index = 0
+        self.complete = False
+
+        state = UsdaImportState.query.filter_by(file_name=self.file_name).first()
+        if state and state.file_size == self.file_size and state.file_mtime == self.file_mtime:
+            self.byte_offset = state.byte_offset
+            self.record_index = state.record_index
+            self.complete = state.status == "complete"
+
+    def reset(self) -> None:
+        self.byte_offset = None
+        self.record_index = 0
+        self.complete = False
+
+    def advance(self, byte_offset: int, records: int) -> None:
+        self.byte_offset = byte_offset
+        self.record_index += records
+
+    def save(self, complete: bool = False) -> None:
+        """Stage the checkpoint in the current transaction; the caller commits."""
+        self.complete = complete
+        state = UsdaImportState.query.filter_by(file_name=self.file_name).first()
+        if state is None:
+            state = UsdaImportState(file_name=self.file_name)
+            db.session.add(state)
+        state.file_size = self.file_size
+        state.file_mtime = self.file_mtime
+        state.byte_offset = self.byte_offset or 0
+        state.record_index = self.record_index
+        state.status = "complete" if complete else "running"
@@ -0,0 +1,282 @@
+"""Incremental reader for USDA FoodData Central JSON downloads.
+
+FDC files are a single object such as ``{"BrandedFoods": [ {...}, {...} ]}``
+and the branded file alone is several GB, so it cannot be ``json.load``-ed.
+``iter_fdc_foods`` walks the top-level array and decodes one food record at a
+time with ``json.JSONDecoder.raw_decode`` over a small rolling buffer, keeping
+memory proportional to the largest single record rather than the file.
+
+Every record is yielded with the byte offset just past it, which is a valid
+``start_offset`` for resuming a later read.
+"""
+from __future__ import annotations
+
+import io
+import json
+import os
+import time
+from typing import Iterator, List, Optional, Tuple
+
+FDC_ROOT_KEYS = ("FoundationFoods", "SRLegacyFoods", "SurveyFoods", "BrandedFoods")
+READ_SIZE = 1 << 20
+_WHITESPACE = " \t\r\n"
+_UTF8_BOM = b"\xef\xbb\xbf"
+
+
+class FdcFormatError(ValueError):
+    """Raised when a file does not look like an FDC JSON download."""
+
+
+class _Reader:
+    def __init__(self, path: str, offset: int) -> None:
+        raw = open(path, "rb")
+        raw.seek(offset)
+        self._file = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+        # Byte offset in the file of self._buf[self._pos].
+        self.offset = offset
+
+    def close(self) -> None:
+        self._file.close()
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._file.read(READ_SIZE)
+        if not chunk:
+            self._eof = True
+            return False
+        if self._pos:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        self._buf += chunk
+        return True
+
+    def _advance(self, end: int) -> None:
+        self.offset += len(self._buf[self._pos:end].encode("utf-8"))
+        self._pos = end
+
+    def peek(self) -> Optional[str]:
+        """Skip whitespace and return the next character without consuming it."""
+        while True:
+            buf, pos = self._buf, self._pos
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            self.offset += pos - self._pos
+            self._pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return None
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise FdcFormatError(f"expected {char!r} at byte {self.offset}")
+        self._advance(self._pos + 1)
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as exc:
+                # Most likely the value straddles the end of the buffer.
+                if not self._fill():
+                    raise FdcFormatError(f"invalid or truncated JSON at byte {self.offset}: {exc.msg}") from exc
+                continue
+            self._advance(end)
+            return value
+
+
+def _locate_foods_array(path: str) -> Tuple[Optional[str], int]:
+    """Return (dataset key, byte offset of the first record) for an FDC file.
+
+    Bare top-level arrays, such as files written by older split tools, are
+    accepted and reported with a dataset key of None.
+    """
+    with open(path, "rb") as raw:
+        start = len(_UTF8_BOM) if raw.read(len(_UTF8_BOM)) == _UTF8_BOM else 0
+    reader = _Reader(path, start)
+    try:
+        first = reader.peek()
+        if first == "[":
+            reader.expect("[")
+            return None, reader.offset
+        if first != "{":
+            raise FdcFormatError(f"{path} is not a JSON object or array")
+        reader.expect("{")
+        while reader.peek() == '"':
+            key = reader.value()
+            reader.expect(":")
+            if key in FDC_ROOT_KEYS and reader.peek() == "[":
+                reader.expect("[")
+                return key, reader.offset
+            reader.value()
+            if reader.peek() == ",":
+                reader.expect(",")
+        raise FdcFormatError(f"no FoodData Central food list found in {path}")
+    finally:
+        reader.close()
+
+
+def fdc_dataset_name(path: str) -> Optional[str]:
+    """Return the FDC root key (``BrandedFoods`` etc.) of a file."""
+    return _locate_foods_array(path)[0]
+
+
+def iter_fdc_foods(path: str, start_offset: Optional[int] = None) -> Iterator[Tuple[dict, int]]:
+    """Yield ``(food_record, end_offset)`` for each food in an FDC JSON file.
+
+    ``start_offset`` must be an ``end_offset`` previously yielded for the same
+    file; iteration then continues with the following record.
+    """
+    _, first_offset = _locate_foods_array(path)
+    offset = first_offset if start_offset is None else start_offset
+    reader = _Reader(path, offset)
+    try:
+        expect_separator = start_offset is not None and start_offset != first_offset
+        while True:
+            char = reader.peek()
+            if char is None:
+                raise FdcFormatError(f"unexpected end of file in {path}")
+            if char == "]":
+                return
+            if expect_separator:
+                reader.expect(",")
+            record = reader.value()
+            expect_separator = True
+            if isinstance(record, dict):
+                yield record, reader.offset
+    finally:
+        reader.close()
+
+
+# Bytes read per step when slicing raw records for worker processes.
+SLICE_READ_SIZE = 4 << 20
+
+
+def _record_bounds(buf: bytes):
+    """Locate top-level records in ``buf``, which must begin between records.
+
+    Returns (starts, ends, array_closed): byte indexes of each record's opening
+    brace and of the closing brace of each complete record, and whether the
+    enclosing array ends inside ``buf``. Quote, escape and nesting state is
+    tracked with vectorized NumPy passes, so no Python code runs per byte.
+    """
+    import numpy as np
+
+    data = np.frombuffer(buf, dtype=np.uint8)
+    # Work only on the structural characters: quotes and brackets.
+    positions = np.flatnonzero(
+        (data == 0x22) | (data == 0x7B) | (data == 0x7D) | (data == 0x5B) | (data == 0x5D)
+    )
+    if not positions.size:
+        return [], [], False
+    chars = data[positions]
+
+    quotes = chars == 0x22
+    # A quote preceded by an odd run of backslashes is escaped. Escaped quotes
+    # are rare, so only those candidates are examined individually.
+    candidates = positions[quotes]
+    candidates = candidates[candidates > 0]
+    for position in candidates[data[candidates - 1] == 0x5C].tolist():
+        run = 0
+        while position - run - 1 >= 0 and buf[position - run - 1] == 0x5C:
+            run += 1
+        if run % 2:
+            quotes[np.searchsorted(positions, position)] = False
+    outside = (np.cumsum(quotes) % 2 == 0) & ~quotes
+
+    opens = outside & ((chars == 0x7B) | (chars == 0x5B))
+    closes = outside & ((chars == 0x7D) | (chars == 0x5D))
+    depth = np.cumsum(opens.astype(np.int32) - closes.astype(np.int32))
+
+    starts = positions[opens & (chars == 0x7B) & (depth == 1)]
+    ends = positions[closes & (chars == 0x7D) & (depth == 0)]
+    array_end = positions[closes & (chars == 0x5D) & (depth == -1)]
+    if array_end.size:
+        starts = starts[starts < array_end[0]]
+        ends = ends[ends < array_end[0]]
+    return starts.tolist(), ends.tolist(), bool(array_end.size)
+
+
+def iter_fdc_record_batches(
+    path: str, start_offset: Optional[int] = None, batch_size: int = 500
+) -> Iterator[Tuple[List[bytes], int]]:
+    """Yield ``(raw_records, end_offset)`` batches of undecoded JSON records.
+
+    This is the cheap half of ``iter_fdc_foods``: records are cut out of the
+    file without being parsed so that decoding can happen in worker processes.
+    Offsets have the same meaning as those yielded by ``iter_fdc_foods``.
+    """
+    _, first_offset = _locate_foods_array(path)
+    # ``base`` is the file offset of pending[0]; pending always begins between records.
+    base = first_offset if start_offset is None else start_offset
+    end_offset = base
+    pending = b""
+    batch: List[bytes] = []
+    with open(path, "rb") as raw:
+        raw.seek(base)
+        while True:
+            chunk = raw.read(SLICE_READ_SIZE)
+            buf = pending + chunk
+            starts, ends, closed = _record_bounds(buf)
+            for start, end in zip(starts, ends):
+                batch.append(buf[start:end + 1])
+                end_offset = base + end + 1
+                if len(batch) >= batch_size:
+                    yield batch, end_offset
+                    batch = []
+            if closed:
+                break
+            if not chunk:
+                raise FdcFormatError(f"unexpected end of file in {path}")
+            # Carry an incomplete trailing record over; separators can be dropped.
+            cut = starts[len(ends)] if len(starts) > len(ends) else len(buf)
+            pending = buf[cut:]
+            base += cut
+    if batch:
+        yield batch, end_offset
+
+
+class ImportProgress:
+    """Periodic records/second progress line for long imports."""
+
+    def __init__(self, path: str, interval: float = 5.0, start_offset: int = 0) -> None:
+        self.total_bytes = os.path.getsize(path)
+        self.interval = interval
+        self.records = 0
+        self.offset = start_offset
+        self._start_offset = start_offset
+        self._started = time.monotonic()
+        self._last_report = self._started
+
+    def update(self, offset: int, records: int = 1) -> None:
+        self.records += records
+        self.offset = offset
+        now = time.monotonic()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            print(self.describe(now))
+
+    def describe(self, now: Optional[float] = None) -> str:
+        elapsed = max((now or time.monotonic()) - self._started, 1e-9)
+        rate = self.records / elapsed
+        mb_done = self.offset / (1024 * 1024)
+        mb_total = self.total_bytes / (1024 * 1024)
+        percent = (self.offset / self.total_bytes * 100) if self.total_bytes else 100.0
+        mb_rate = (self.offset - self._start_offset) / (1024 * 1024) / elapsed
+        return (
+            f"   {self.records:,} records | {rate:,.0f} rec/s | "
+            f"{mb_done:,.1f}/{mb_total:,.1f} MB ({percent:.1f}%) | {mb_rate:.1f} MB/s"
+        )
+
+    def finish(self) -> str:
+        elapsed = time.monotonic() - self._started
+        summary = self.describe()
+        print(f"{summary} | {elapsed:.1f}s")
+        return summary
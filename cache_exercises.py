@@ -4,24 +4,53 @@ Usage::
 
     python scripts/cache_exercises.py
 
+    python scripts/cache_exercises.py --source path/to/exercises.json
+
 This script requires an application context, so run it from the project
-root with the virtualenv activated. It will download the latest JSON
-from GitHub, upsert rows in the ``exercise_catalog`` table, and remove any
-entries that no longer exist in the upstream dataset.
+root with the virtualenv activated. It loads the dataset from GitHub (or a
+local file / mirror URL given by ``--source`` or ``EXERCISE_SOURCE_URL``),
+diffs it against the ``exercise_catalog`` table by content hash, writes only
+new and changed rows, and removes any entries that no longer exist in the
+upstream dataset.
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
+import os
 import sys
+import time
 from typing import Iterable
 
 import requests
+from sqlalchemy import bindparam
 
 from app import create_app, db
 from app.models import ExerciseCatalog
-
-EXERCISE_SOURCE_URL = "https://raw.githubusercontent.com/yuhonas/free-exercise-db/main/dist/exercises.json"
+from app.services.catalog_version import bump_catalog_version
+from app.services.exercise_catalog import CATALOG_NAME
+
+EXERCISE_SOURCE_URL = (
+    os.environ.get("EXERCISE_SOURCE_URL")
+    or "https://raw.githubusercontent.com/yuhonas/free-exercise-db/main/dist/exercises.json"
+)
+
+# Columns populated from the upstream dataset and covered by the content hash.
+CATALOG_FIELDS = (
+    "name",
+    "force",
+    "level",
+    "mechanic",
+    "equipment",
+    "category",
+    "primary_muscles",
+    "secondary_muscles",
+    "instructions",
+    "image_main",
+    "image_secondary",
+)
 
 
 def _flatten_list(values: Iterable[str] | None) -> str | None:
@@ -46,50 +75,98 @@ def fetch_dataset(url: str = EXERCISE_SOURCE_URL) -> list[dict]:
     return data
 
 
-def upsert_catalog(data: list[dict], delete_missing: bool = True) -> tuple[int, int, int]:
-    existing = {row.source_id: row for row in ExerciseCatalog.query.all()}
-    seen_ids: set[str] = set()
+def load_dataset(source: str = EXERCISE_SOURCE_URL) -> list[dict]:
+    """Load the dataset from an http(s) URL or a local JSON file path."""
+    if source.startswith(("http://", "https://")):
+        return fetch_dataset(source)
+    path = source[len("file://"):] if source.startswith("file://") else source
+    with open(path, "r", encoding="utf-8") as handle:
+        data = json.load(handle)
+    if not isinstance(data, list):
+        raise ValueError(f"Unexpected payload in exercise dataset file {path}")
+    return data
 
-    created = 0
-    updated = 0
 
+def _catalog_values(item: dict, source_id: str) -> dict:
+    images = item.get("images") or []
+    return {
+        "name": item.get("name") or source_id,
+        "force": item.get("force"),
+        "level": item.get("level"),
+        "mechanic": item.get("mechanic"),
+        "equipment": item.get("equipment"),
+        "category": item.get("category"),
+        "primary_muscles": _flatten_list(item.get("primaryMuscles")),
+        "secondary_muscles": _flatten_list(item.get("secondaryMuscles")),
+        "instructions": _flatten_instructions(item.get("instructions")),
+        "image_main": images[0] if len(images) > 0 else None,
+        "image_secondary": images[1] if len(images) > 1 else None,
+    }
+
+
+def _content_hash(values: dict) -> str:
+    payload = json.dumps([values.get(field) for field in CATALOG_FIELDS], separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def upsert_catalog(data: list[dict], delete_missing: bool = True) -> tuple[int, int, int, int]:
+    """Apply the dataset to ``exercise_catalog``; returns (created, updated, unchanged, deleted).
+
+    Existing rows are hashed from their stored column values, so only rows
+    whose content differs from upstream are written. The catalog version is
+    bumped in the same transaction whenever anything was written.
+    """
+    table = ExerciseCatalog.__table__
+    existing = {
+        row.source_id: (row.id, _content_hash(row._asdict()))
+        for row in db.session.execute(
+            db.select(table.c.id, table.c.source_id, *(table.c[field] for field in CATALOG_FIELDS))
+        )
+    }
+
+    upstream: dict[str, dict] = {}
     for item in data:
         source_id = str(item.get("id") or item.get("name"))
         if not source_id:
             continue
-        seen_ids.add(source_id)
-
-        row = existing.get(source_id)
-        if row is None:
-            row = ExerciseCatalog(source_id=source_id)
-            db.session.add(row)
-            created += 1
+        # Later duplicates win, matching the previous row-by-row behaviour.
+        upstream[source_id] = _catalog_values(item, source_id)
+
+    inserts = []
+    updates = []
+    unchanged = 0
+    for source_id, values in upstream.items():
+        current = existing.get(source_id)
+        if current is None:
+            inserts.append({"source_id": source_id, **values})
+        elif current[1] != _content_hash(values):
+            updates.append({"row_id": current[0], **{f"new_{field}": values[field] for field in CATALOG_FIELDS}})
         else:
-            updated += 1
-
-        row.name = item.get("name") or source_id
-        row.force = item.get("force")
-        row.level = item.get("level")
-        row.mechanic = item.get("mechanic")
-        row.equipment = item.get("equipment")
-        row.category = item.get("category")
-        row.primary_muscles = _flatten_list(item.get("primaryMuscles"))
-        row.secondary_muscles = _flatten_list(item.get("secondaryMuscles"))
-        row.instructions = _flatten_instructions(item.get("instructions"))
-
-        images = item.get("images") or []
-        row.image_main = images[0] if len(images) > 0 else None
-        row.image_secondary = images[1] if len(images) > 1 else None
+            unchanged += 1
+
+    if inserts:
+        db.session.execute(table.insert(), inserts)
+    if updates:
+        db.session.execute(
+            table.update()
+            .where(table.c.id == bindparam("row_id"))
+            .values({field: bindparam(f"new_{field}") for field in CATALOG_FIELDS}),
+            updates,
+        )
 
     deleted = 0
     if delete_missing:
-        for source_id, row in existing.items():
-            if source_id not in seen_ids:
-                db.session.delete(row)
-                deleted += 1
-
+        stale_ids = [row_id for source_id, (row_id, _) in existing.items() if source_id not in upstream]
+        for start in range(0, len(stale_ids), 500):
+            batch = stale_ids[start:start + 500]
+            db.session.execute(table.delete().where(table.c.id.in_(batch)))
+        deleted = len(stale_ids)
+
+    if inserts or updates or deleted:
+        # Running workers reload their in-memory catalog when this moves.
+        bump_catalog_version(CATALOG_NAME)
     db.session.commit()
-    return created, updated, deleted
+    return len(inserts), len(updates), unchanged, deleted
 
 
 def main() -> int:
@@ -99,17 +176,27 @@ def main() -> int:
         action="store_true",
         help="Do not delete catalog entries that disappear from the upstream dataset.",
     )
+    parser.add_argument(
+        "--source",
+        default=EXERCISE_SOURCE_URL,
+        help="Dataset URL or local JSON file (default: EXERCISE_SOURCE_URL or the GitHub release).",
+    )
     args = parser.parse_args()
 
     app = create_app()
     with app.app_context():
-        data = fetch_dataset()
-        created, updated, deleted = upsert_catalog(data, delete_missing=not args.no_delete)
+        started = time.perf_counter()
+        data = load_dataset(args.source)
+        loaded = time.perf_counter()
+        created, updated, unchanged, deleted = upsert_catalog(data, delete_missing=not args.no_delete)
+        finished = time.perf_counter()
 
     print(f"Exercises created: {created}")
     print(f"Exercises updated: {updated}")
+    print(f"Exercises unchanged: {unchanged}")
     if not args.no_delete:
         print(f"Exercises deleted: {deleted}")
+    print(f"Loaded {len(data)} records in {loaded - started:.2f}s, synced in {finished - loaded:.2f}s")
     return 0
 
 
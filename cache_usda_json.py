@@ -1,131 +1,90 @@
-import json
+import argparse
 import os
 
 from app import create_app, db
-from app.models import Food, FoodMeasure
-
-KILOJOULE_TO_KILOCALORIE = 1 / 4.184
+from app.services.usda_import import ImportCheckpoint, UsdaBulkLoader, iter_normalized_foods
+from app.services.usda_stream import FdcFormatError, ImportProgress, fdc_dataset_name
 
 app = create_app()
 
 # Directory where you'll put all your USDA JSON files
 USDA_DATA_DIR = "data/usda_foods"  # Update this path
 
-def import_usda_file(filepath, dataset_name):
-    """Import foods and portions from a single USDA JSON file"""
+def import_usda_file(filepath, dataset_name, loader=None, workers=1, resume=False):
+    """Import foods and portions from a single USDA JSON file.
+
+    Records are streamed one at a time, so memory stays flat even for the
+    multi-GB Branded Foods download, and written in bulk one chunk at a time.
+    With ``workers > 1`` records are parsed in a process pool while this
+    process remains the only database writer. Foods whose content hash is
+    unchanged since the last import are skipped.
+
+    Every chunk commits together with a checkpoint (byte offset and record
+    index) in ``usda_import_state``; with ``resume`` the import continues
+    from the last committed chunk instead of the start of the file.
+
+    Returns this file's counts (added, changed, unchanged, portions_*).
+    """
     print(f"\n{'='*60}")
     print(f"Processing: {dataset_name}")
     print(f"{'='*60}")
     
-    with open(filepath, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    loader = loader or UsdaBulkLoader()
+    before = dict(loader.counts)
+    try:
+        fdc_dataset_name(filepath)
+    except FdcFormatError as exc:
+        print(f"⚠️  Unknown data format in {filepath}: {exc}")
+        return {key: 0 for key in before}
     
-    # Different datasets have different root keys
-    foods_list = None
-    if 'FoundationFoods' in data:
-        foods_list = data['FoundationFoods']
-    elif 'SRLegacyFoods' in data:
-        foods_list = data['SRLegacyFoods']
-    elif 'SurveyFoods' in data:
-        foods_list = data['SurveyFoods']
-    elif 'BrandedFoods' in data:
-        foods_list = data['BrandedFoods']
-    else:
-        print(f"⚠️  Unknown data format in {filepath}")
-        return 0, 0
-    
-    foods_added = 0
-    portions_added = 0
-    foods_updated = 0
-    
-    for food_data in foods_list:
-        description = food_data.get('description', '')
-        if not description:
-            continue
-        
-        fdc_id = food_data.get('fdcId')
-        
-        # Check if food already exists
-        existing_food = Food.query.filter_by(source_id=str(fdc_id)).first()
-        
-        if not existing_food:
-            # Extract nutrient data (per 100g)
-            nutrient_amounts = {}
-            energy_kcal = None
-
-            for nutrient in food_data.get('foodNutrients', []):
-                nutrient_info = nutrient.get('nutrient', {})
-                name = nutrient_info.get('name')
-                if not name:
-                    continue
-
-                amount = nutrient.get('amount') or 0
-                unit = (nutrient_info.get('unitName') or '').lower()
-
-                if name == 'Energy':
-                    converted = amount * KILOJOULE_TO_KILOCALORIE if unit == 'kj' else amount
-                    if energy_kcal is None or unit != 'kj':
-                        energy_kcal = converted
-                else:
-                    nutrient_amounts[name] = amount
-
-            # Create new food
-            food = Food(
-                name=description,
-                source_id=str(fdc_id),
-                calories=energy_kcal or 0,
-                protein_g=nutrient_amounts.get('Protein', 0),
-                carbs_g=nutrient_amounts.get('Carbohydrate, by difference', 0),
-                fats_g=nutrient_amounts.get('Total lipid (fat)', 0),
-                serving_size=100,
-                serving_unit='g'
-            )
-            db.session.add(food)
-            db.session.flush()  # Get the food.id
-            foods_added += 1
-        else:
-            food = existing_food
-            foods_updated += 1
-        
-        # Import foodPortions
-        food_portions = food_data.get('foodPortions', [])
-        
-        if food_portions:
-            for portion in food_portions:
-                measure_unit = portion.get('measureUnit', {})
-                measure_name = measure_unit.get('name', '').lower()
-                gram_weight = portion.get('gramWeight', 0)
-                
-                if measure_name and gram_weight > 0:
-                    # Check if measure already exists
-                    existing_measure = FoodMeasure.query.filter_by(
-                        food_id=food.id,
-                        measure_name=measure_name
-                    ).first()
-                    
-                    if not existing_measure:
-                        measure = FoodMeasure(
-                            food_id=food.id,
-                            measure_name=measure_name,
-                            grams=gram_weight
-                        )
-                        db.session.add(measure)
-                        portions_added += 1
-                    elif existing_measure.grams != gram_weight:
-                        # Update if different
-                        existing_measure.grams = gram_weight
+    checkpoint = ImportCheckpoint(filepath)
+    if not resume:
+        checkpoint.reset()
+    elif checkpoint.complete:
+        print("⏭️  Already imported (checkpoint complete), skipping")
+        return {key: 0 for key in before}
+    elif checkpoint.byte_offset:
+        print(f"↪️  Resuming after record {checkpoint.record_index:,} (byte {checkpoint.byte_offset:,})")
     
+    progress = ImportProgress(filepath, start_offset=checkpoint.byte_offset or 0)
+    loader.on_commit = checkpoint.save
+    for foods, offset, records in iter_normalized_foods(
+        filepath, workers=workers, start_offset=checkpoint.byte_offset
+    ):
+        checkpoint.advance(offset, records)
+        loader.add_many(foods)
+        progress.update(offset, records)
+    loader.on_commit = None
+    loader.flush()
+    checkpoint.save(complete=True)
     db.session.commit()
+    progress.finish()
     
-    print(f"✅ Foods added: {foods_added}")
-    print(f"✅ Foods updated: {foods_updated}")
-    print(f"✅ Portions added: {portions_added}")
+    counts = {key: loader.counts[key] - before[key] for key in before}
+    print(f"✅ Foods added: {counts['added']}")
+    print(f"✅ Foods changed: {counts['changed']}")
+    print(f"✅ Foods unchanged: {counts['unchanged']}")
+    print(f"✅ Portions added: {counts['portions_added']}")
+    print(f"✅ Portions updated: {counts['portions_updated']}")
     
-    return foods_added, portions_added
+    return counts
 
 
 def main():
     """Process all USDA JSON files in the directory"""
+    parser = argparse.ArgumentParser(description="Import USDA FoodData Central JSON files")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes used to parse records (default 1: parse in the writer process).",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue each file from its last committed checkpoint and skip files already completed.",
+    )
+    args = parser.parse_args()
     
     if not os.path.exists(USDA_DATA_DIR):
         print(f"❌ Directory not found: {USDA_DATA_DIR}")
@@ -144,20 +103,30 @@ def main():
     print(f"Found {len(json_files)} JSON file(s)")
     
     with app.app_context():
-        total_foods = 0
-        total_portions = 0
+        loader = UsdaBulkLoader()
         
         for json_file in json_files:
             filepath = os.path.join(USDA_DATA_DIR, json_file)
-            foods, portions = import_usda_file(filepath, json_file)
-            total_foods += foods
-            total_portions += portions
+            import_usda_file(filepath, json_file, loader=loader, workers=args.workers, resume=args.resume)
+        
+        # Foods from earlier releases that this one no longer contains. They are
+        # kept because member logs may reference them. A resumed run has not
+        # seen the records before its checkpoints, so it cannot tell.
+        removed = None if args.resume else loader.removed_source_ids()
         
+        counts = loader.counts
         print(f"\n{'='*60}")
         print(f"TOTAL SUMMARY")
         print(f"{'='*60}")
-        print(f"✅ Total foods imported: {total_foods}")
-        print(f"✅ Total portions imported: {total_portions}")
+        print(f"✅ Foods added: {counts['added']}")
+        print(f"✅ Foods changed: {counts['changed']}")
+        print(f"✅ Foods unchanged: {counts['unchanged']}")
+        if removed is not None:
+            print(f"✅ Foods removed from release: {len(removed)}")
+        print(f"✅ Portions added: {counts['portions_added']}")
+        print(f"✅ Portions updated: {counts['portions_updated']}")
+        if counts['totals_rebuilt']:
+            print(f"✅ Daily totals rebuilt for {counts['totals_rebuilt']} member day(s)")
         print(f"\nDone!")
 
 
@@ -10,6 +10,23 @@ class Config:
         "sqlite:///" + os.path.join(basedir, "db.sqlite3")
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Per-request SQL/timing instrumentation (see app.services.perf); off by default.
+    PERF_INSTRUMENTATION = os.environ.get("PERF_INSTRUMENTATION", "False") == "True"
+    PERF_SLOW_REQUEST_MS = float(os.environ.get("PERF_SLOW_REQUEST_MS", 500))
+    # /_debug/perf exposes SQL text; it needs both flags and a matching X-Perf-Token header.
+    PERF_DEBUG_ENDPOINT = os.environ.get("PERF_DEBUG_ENDPOINT", "False") == "True"
+    PERF_DEBUG_TOKEN = os.environ.get("PERF_DEBUG_TOKEN") or ""
+
+    # SQLite connection pragmas (see app.services.sqlite_tuning); WAL lets
+    # readers proceed while a worker writes. Cache size is in KiB when negative.
+    SQLITE_TUNING = os.environ.get("SQLITE_TUNING", "True") == "True"
+    SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE") or "WAL"
+    SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS") or "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+    SQLITE_CACHE_SIZE = int(os.environ.get("SQLITE_CACHE_SIZE", -64 * 1024))
+    SQLITE_TEMP_STORE = os.environ.get("SQLITE_TEMP_STORE") or "MEMORY"
     # Mail settings (used for email verification). Configure via environment variables.
     MAIL_SERVER = os.environ.get("MAIL_SERVER") or "smtp.gmail.com"
     MAIL_PORT = int(os.environ.get("MAIL_PORT", 587))
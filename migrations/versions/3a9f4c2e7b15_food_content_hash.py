@@ -0,0 +1,28 @@
+"""Add a content hash to foods imported from USDA FoodData Central.
+
+Revision ID: 3a9f4c2e7b15
+Revises: e7a2b91c4d58
+Create Date: 2025-11-21 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a9f4c2e7b15'
+down_revision = 'e7a2b91c4d58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Left NULL for existing rows; the next USDA refresh treats them as changed
+    # and fills the hash in.
+    with op.batch_alter_table('food', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=32), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('food', schema=None) as batch_op:
+        batch_op.drop_column('content_hash')
@@ -0,0 +1,75 @@
+"""Add FTS5 full-text index over food names.
+
+Revision ID: 5b1e7c9d2f40
+Revises: 8730b01a3e26
+Create Date: 2025-11-18 19:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# Frozen copy of the index definition as of this revision; later changes to
+# app.services.food_search must not alter what this migration does.
+FOOD_FTS_TABLE = 'food_fts'
+FOOD_FTS_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS food_fts USING fts5(
+        name,
+        content='food',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS food_fts_ai AFTER INSERT ON food BEGIN
+        INSERT INTO food_fts(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS food_fts_ad AFTER DELETE ON food BEGIN
+        INSERT INTO food_fts(food_fts, rowid, name) VALUES ('delete', old.id, old.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS food_fts_au AFTER UPDATE OF name ON food BEGIN
+        INSERT INTO food_fts(food_fts, rowid, name) VALUES ('delete', old.id, old.name);
+        INSERT INTO food_fts(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+)
+
+
+# revision identifiers, used by Alembic.
+revision = '5b1e7c9d2f40'
+down_revision = '8730b01a3e26'
+branch_labels = None
+depends_on = None
+
+
+def _fts5_available(bind):
+    if bind.dialect.name != 'sqlite':
+        return False
+    return bool(bind.execute(sa.text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar())
+
+
+def upgrade():
+    bind = op.get_bind()
+    if not _fts5_available(bind):
+        # Non-SQLite backends (or SQLite without FTS5) use the LIKE fallback in
+        # app.services.food_search, so there is nothing to create here.
+        return
+
+    for statement in FOOD_FTS_DDL:
+        op.execute(statement)
+    op.execute(f"INSERT INTO {FOOD_FTS_TABLE}({FOOD_FTS_TABLE}) VALUES ('rebuild')")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    op.execute("DROP TRIGGER IF EXISTS food_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS food_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS food_fts_ai")
+    op.execute(f"DROP TABLE IF EXISTS {FOOD_FTS_TABLE}")
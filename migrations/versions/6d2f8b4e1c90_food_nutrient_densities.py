@@ -0,0 +1,52 @@
+"""Store per-gram nutrient densities on foods.
+
+Revision ID: 6d2f8b4e1c90
+Revises: 4c7e2a9d1b63
+Create Date: 2025-11-25 11:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6d2f8b4e1c90'
+down_revision = '4c7e2a9d1b63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('food', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('calories_per_g', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('protein_per_g', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('carbs_per_g', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('fats_per_g', sa.Float(), nullable=True))
+
+    # Backfill using the same scaling rules as
+    # app.services.nutrition.scale_food_nutrients applied to one gram.
+    op.execute(
+        """
+        UPDATE food SET
+            calories_per_g = (
+                CASE WHEN coalesce(protein_g, 0) * 4 + coalesce(carbs_g, 0) * 4 + coalesce(fats_g, 0) * 9 != 0
+                     THEN coalesce(protein_g, 0) * 4 + coalesce(carbs_g, 0) * 4 + coalesce(fats_g, 0) * 9
+                     ELSE coalesce(calories, 0)
+                END
+            ) / (CASE WHEN serving_size > 0 THEN serving_size WHEN grams_per_unit > 0 THEN grams_per_unit ELSE 100.0 END),
+            protein_per_g = coalesce(protein_g, 0)
+                / (CASE WHEN serving_size > 0 THEN serving_size WHEN grams_per_unit > 0 THEN grams_per_unit ELSE 100.0 END),
+            carbs_per_g = coalesce(carbs_g, 0)
+                / (CASE WHEN serving_size > 0 THEN serving_size WHEN grams_per_unit > 0 THEN grams_per_unit ELSE 100.0 END),
+            fats_per_g = coalesce(fats_g, 0)
+                / (CASE WHEN serving_size > 0 THEN serving_size WHEN grams_per_unit > 0 THEN grams_per_unit ELSE 100.0 END)
+        """
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('food', schema=None) as batch_op:
+        batch_op.drop_column('fats_per_g')
+        batch_op.drop_column('carbs_per_g')
+        batch_op.drop_column('protein_per_g')
+        batch_op.drop_column('calories_per_g')
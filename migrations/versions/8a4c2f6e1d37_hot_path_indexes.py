@@ -0,0 +1,43 @@
+"""Index the hot per-user and foreign-key access paths.
+
+Revision ID: 8a4c2f6e1d37
+Revises: 6d2f8b4e1c90
+Create Date: 2025-11-27 10:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4c2f6e1d37'
+down_revision = '6d2f8b4e1c90'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns). Each composite leads with the equality column
+# the routes filter on, followed by the column they range over or sort by.
+INDEXES = [
+    ('ix_user_food_log_user_date', 'user_food_log', ['user_id', 'log_date']),
+    ('ix_progress_user_date', 'progress', ['user_id', 'date']),
+    ('ix_workout_session_user_started', 'workout_session', ['user_id', 'started_at']),
+    ('ix_workout_set_session_id', 'workout_set', ['session_id']),
+    ('ix_message_client_read', 'message', ['client_id', 'read_at']),
+    ('ix_food_measure_food_name', 'food_measure', ['food_id', 'measure_name']),
+    ('ix_food_source_id', 'food', ['source_id']),
+    ('ix_assigned_template_template_member', 'assigned_template', ['template_id', 'member_id']),
+    ('ix_user_trainer_id', 'user', ['trainer_id']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+    # Give the planner fresh statistics for the new indexes.
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute('ANALYZE')
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
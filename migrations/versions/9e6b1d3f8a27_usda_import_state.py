@@ -0,0 +1,35 @@
+"""Track USDA import checkpoints so long imports can resume.
+
+Revision ID: 9e6b1d3f8a27
+Revises: 3a9f4c2e7b15
+Create Date: 2025-11-21 14:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e6b1d3f8a27'
+down_revision = '3a9f4c2e7b15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('usda_import_state',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('file_name', sa.String(length=255), nullable=False),
+    sa.Column('file_size', sa.BigInteger(), nullable=False),
+    sa.Column('file_mtime', sa.Float(), nullable=False),
+    sa.Column('byte_offset', sa.BigInteger(), nullable=False),
+    sa.Column('record_index', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('file_name')
+    )
+
+
+def downgrade():
+    op.drop_table('usda_import_state')
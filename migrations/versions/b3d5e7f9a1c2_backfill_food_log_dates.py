@@ -0,0 +1,93 @@
+"""Backfill missing food log dates from created_at.
+
+Revision ID: b3d5e7f9a1c2
+Revises: 8a4c2f6e1d37
+Create Date: 2025-11-28 09:30:00.000000
+
+"""
+from datetime import timezone
+from zoneinfo import ZoneInfo
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3d5e7f9a1c2'
+down_revision = '8a4c2f6e1d37'
+branch_labels = None
+depends_on = None
+
+# Same zone the member pages used to derive a day from created_at.
+EASTERN_TZ = ZoneInfo('America/New_York')
+
+user_food_log = sa.table(
+    'user_food_log',
+    sa.column('id', sa.Integer),
+    sa.column('user_id', sa.Integer),
+    sa.column('created_at', sa.DateTime),
+    sa.column('log_date', sa.Date),
+)
+
+
+def _eastern_date(value):
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(EASTERN_TZ).date()
+
+
+def upgrade():
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(user_food_log.c.id, user_food_log.c.user_id, user_food_log.c.created_at)
+        .where(user_food_log.c.log_date.is_(None), user_food_log.c.created_at.isnot(None))
+    ).all()
+    updates = [
+        {'log_id': log_id, 'day': _eastern_date(created_at)}
+        for log_id, _, created_at in rows
+    ]
+    if not updates:
+        return
+    bind.execute(
+        user_food_log.update()
+        .where(user_food_log.c.id == sa.bindparam('log_id'))
+        .values(log_date=sa.bindparam('day')),
+        updates,
+    )
+
+    # Those logs were never counted in the stored per-day totals; rebuild
+    # the affected users with the same SUM(grams * density) as
+    # app.services.daily_totals.rebuild_daily_totals.
+    user_ids = sorted({user_id for _, user_id, _ in rows})
+    for start in range(0, len(user_ids), 500):
+        batch = user_ids[start:start + 500]
+        params = {f'u{index}': user_id for index, user_id in enumerate(batch)}
+        in_list = ', '.join(f':{name}' for name in params)
+        bind.execute(sa.text(f'DELETE FROM daily_nutrition_totals WHERE user_id IN ({in_list})'), params)
+        bind.execute(
+            sa.text(
+                f"""
+                INSERT INTO daily_nutrition_totals
+                    (user_id, date, calories, protein_g, carbs_g, fats_g, log_count, updated_at)
+                SELECT
+                    l.user_id,
+                    l.log_date,
+                    coalesce(sum(coalesce(l.quantity_grams, l.quantity, 0) * f.calories_per_g), 0),
+                    coalesce(sum(coalesce(l.quantity_grams, l.quantity, 0) * f.protein_per_g), 0),
+                    coalesce(sum(coalesce(l.quantity_grams, l.quantity, 0) * f.carbs_per_g), 0),
+                    coalesce(sum(coalesce(l.quantity_grams, l.quantity, 0) * f.fats_per_g), 0),
+                    count(l.id),
+                    CURRENT_TIMESTAMP
+                FROM user_food_log l
+                LEFT JOIN food f ON f.id = l.food_id
+                WHERE l.log_date IS NOT NULL AND l.user_id IN ({in_list})
+                GROUP BY l.user_id, l.log_date
+                """
+            ),
+            params,
+        )
+
+
+def downgrade():
+    # The original NULLs are not recorded; the backfilled dates are kept.
+    pass
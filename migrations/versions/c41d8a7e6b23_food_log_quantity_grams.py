@@ -0,0 +1,81 @@
+"""Store resolved gram quantity on food log rows.
+
+Revision ID: c41d8a7e6b23
+Revises: 5b1e7c9d2f40
+Create Date: 2025-11-19 10:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41d8a7e6b23'
+down_revision = '5b1e7c9d2f40'
+branch_labels = None
+depends_on = None
+
+
+# Frozen copy of app.models.UNIT_TO_GRAMS at the time of this migration.
+UNIT_TO_GRAMS = {
+    "g": 1,
+    "kg": 1000,
+    "oz": 28.35,
+    "lb": 453.592,
+    "tsp": 4.2,
+    "teaspoon": 4.2,
+    "teaspoons": 4.2,
+    "tbsp": 14.3,
+    "tbs": 14.3,
+    "tablespoon": 14.3,
+    "tablespoons": 14.3,
+    "cup": 240,
+    "cups": 240,
+    "fl oz": 29.5735,
+    "floz": 29.5735,
+    "fluid ounce": 29.5735,
+    "fluid ounces": 29.5735,
+    "ml": 1,
+    "milliliter": 1,
+    "milliliters": 1,
+    "l": 1000,
+    "liter": 1000,
+    "liters": 1000,
+}
+
+
+def upgrade():
+    with op.batch_alter_table('user_food_log', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('quantity_grams', sa.Float(), nullable=True))
+
+    # Same resolution order as UserFoodLog.quantity_in_grams: grams as-is, then
+    # the food's own measure, then the generic unit table, else the raw quantity.
+    generic_cases = " ".join(
+        f"WHEN '{unit}' THEN {grams}" for unit, grams in UNIT_TO_GRAMS.items()
+    )
+    op.execute(
+        f"""
+        UPDATE user_food_log
+        SET quantity_grams = CASE
+            WHEN lower(coalesce(unit, 'g')) = 'g' THEN quantity
+            ELSE quantity * coalesce(
+                (
+                    SELECT fm.grams FROM food_measure fm
+                    WHERE fm.food_id = user_food_log.food_id
+                      AND fm.measure_name = lower(user_food_log.unit)
+                      AND fm.grams IS NOT NULL AND fm.grams <> 0
+                    ORDER BY fm.id
+                    LIMIT 1
+                ),
+                CASE lower(unit) {generic_cases} END,
+                1
+            )
+        END
+        WHERE quantity_grams IS NULL
+        """
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('user_food_log', schema=None) as batch_op:
+        batch_op.drop_column('quantity_grams')
@@ -0,0 +1,77 @@
+"""Add materialized per-day nutrition totals.
+
+Revision ID: e7a2b91c4d58
+Revises: c41d8a7e6b23
+Create Date: 2025-11-19 16:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a2b91c4d58'
+down_revision = 'c41d8a7e6b23'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_nutrition_totals',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('calories', sa.Float(), nullable=False),
+    sa.Column('protein_g', sa.Float(), nullable=False),
+    sa.Column('carbs_g', sa.Float(), nullable=False),
+    sa.Column('fats_g', sa.Float(), nullable=False),
+    sa.Column('log_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'date')
+    )
+
+    # Backfill from existing logs using the same scaling rules as
+    # app.services.nutrition.scale_food_nutrients.
+    op.execute(
+        """
+        INSERT INTO daily_nutrition_totals
+            (user_id, date, calories, protein_g, carbs_g, fats_g, log_count, updated_at)
+        SELECT
+            user_id,
+            log_date,
+            coalesce(sum(
+                CASE WHEN protein * 4 + carbs * 4 + fats * 9 != 0
+                     THEN protein * 4 + carbs * 4 + fats * 9
+                     ELSE calories
+                END * factor
+            ), 0),
+            coalesce(sum(protein * factor), 0),
+            coalesce(sum(carbs * factor), 0),
+            coalesce(sum(fats * factor), 0),
+            count(id),
+            CURRENT_TIMESTAMP
+        FROM (
+            SELECT
+                l.id,
+                l.user_id,
+                l.log_date,
+                coalesce(f.calories, 0) AS calories,
+                coalesce(f.protein_g, 0) AS protein,
+                coalesce(f.carbs_g, 0) AS carbs,
+                coalesce(f.fats_g, 0) AS fats,
+                coalesce(l.quantity_grams, l.quantity, 0) / CASE
+                    WHEN f.serving_size > 0 THEN f.serving_size
+                    WHEN f.grams_per_unit > 0 THEN f.grams_per_unit
+                    ELSE 100.0
+                END AS factor
+            FROM user_food_log l
+            LEFT JOIN food f ON f.id = l.food_id
+            WHERE l.log_date IS NOT NULL
+        ) scaled
+        GROUP BY user_id, log_date
+        """
+    )
+
+
+def downgrade():
+    op.drop_table('daily_nutrition_totals')
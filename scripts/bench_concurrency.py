@@ -0,0 +1,220 @@
+"""Read throughput while other workers log food, per SQLite pragma profile.
+
+Usage::
+
+    python scripts/bench_concurrency.py [--readers 4] [--writers 2] [--duration 10] [--profile both]
+
+Spawns ``--readers`` processes that request member pages and ``--writers``
+processes that POST ``/member/log-food``, all against the same SQLite file
+for ``--duration`` seconds, which is how gunicorn workers share it. Each
+process builds its own app and test client. ``stock`` runs SQLite's default
+rollback journal; ``tuned`` runs the ``SQLITE_*`` profile from
+``config.Config`` (WAL and friends). For each profile the report gives
+reads and writes per second, latency percentiles and failed requests, which
+includes "database is locked".
+
+The database named by ``DATABASE_URL`` is copied per run unless
+``--in-place`` is given, because the writers add food logs. Seed it first
+with ``scripts/seed_synthetic.py``.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+READ_PATHS = [
+    "/member/dashboard",
+    "/member/get-totals",
+    "/member/summary/chart-data",
+    "/member/autocomplete-foods?q=ch",
+]
+PROFILES = {
+    # SQLite's own defaults, written out so a WAL-mode file is switched back.
+    "stock": {
+        "SQLITE_TUNING": "True",
+        "SQLITE_JOURNAL_MODE": "DELETE",
+        "SQLITE_SYNCHRONOUS": "FULL",
+        "SQLITE_BUSY_TIMEOUT_MS": "5000",
+        "SQLITE_MMAP_SIZE": "0",
+        "SQLITE_CACHE_SIZE": "-2000",
+        "SQLITE_TEMP_STORE": "DEFAULT",
+    },
+    # Whatever config.Config resolves from the environment.
+    "tuned": {"SQLITE_TUNING": "True"},
+}
+
+
+def _worker(kind, env, start_at, deadline, member_ids, food_ids, seed, results):
+    # Config reads the environment at import time, so import the app only now.
+    os.environ.update(env)
+    from app import create_app
+    # Like the app, bench_load must not be imported before the environment is set.
+    from scripts.bench_load import login_test_client
+
+    app = create_app()
+    rnd = random.Random(seed)
+    clients = {}
+    latencies = []
+    errors = 0
+
+    def client_for(user_id):
+        client = clients.get(user_id)
+        if client is None:
+            client = clients[user_id] = login_test_client(app, user_id, "member")
+        return client
+
+    for user_id in member_ids:
+        client_for(user_id)
+    # Fill the per-process caches (autocomplete index, measures) before timing.
+    for path in READ_PATHS:
+        client_for(member_ids[0]).get(path)
+    time.sleep(max(0.0, start_at - time.time()))
+    while time.time() < deadline:
+        client = client_for(rnd.choice(member_ids))
+        started = time.perf_counter()
+        try:
+            if kind == "write":
+                response = client.post("/member/log-food", data={
+                    "food_id": str(rnd.choice(food_ids)), "quantity": str(rnd.randint(50, 250)), "unit": "g",
+                })
+            else:
+                response = client.get(rnd.choice(READ_PATHS))
+            failed = response.status_code >= 400
+        except Exception:
+            failed = True
+        latencies.append((time.perf_counter() - started) * 1000)
+        errors += int(failed)
+    results.put((kind, latencies, errors))
+
+
+def _copy_database(path):
+    handle, copy_path = tempfile.mkstemp(prefix="bench-concurrency-", suffix=".sqlite3")
+    os.close(handle)
+    # The backup API includes pages still sitting in a WAL file.
+    source = sqlite3.connect(path)
+    target = sqlite3.connect(copy_path)
+    with target:
+        source.backup(target)
+    source.close()
+    target.close()
+    return copy_path
+
+
+def _load_ids(database_url, tag, limit):
+    os.environ["DATABASE_URL"] = database_url
+    from app import create_app, db
+    from app.models import Food, User
+
+    app = create_app()
+    with app.app_context():
+        query = User.query.filter(User.role == "member")
+        if tag:
+            query = query.filter(User.email.like(f"{tag}-%@example.com"))
+        member_ids = [user.id for user in query.order_by(User.id).limit(limit)]
+        food_ids = db.session.execute(db.select(Food.id).limit(500)).scalars().all()
+        db.engine.dispose()
+    return member_ids, food_ids
+
+
+def run_profile(name, database_path, args, member_ids, food_ids):
+    env = dict(PROFILES[name], DATABASE_URL="sqlite:///" + database_path)
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    # Leave time for every process to import and build its app before the clock starts.
+    start_at = time.time() + args.startup
+    deadline = start_at + args.duration
+    processes = [
+        context.Process(target=_worker, args=(kind, env, start_at, deadline, member_ids, food_ids, seed, results))
+        for seed, kind in enumerate(["read"] * args.readers + ["write"] * args.writers)
+    ]
+    for process in processes:
+        process.start()
+    collected = {"read": ([], 0), "write": ([], 0)}
+    for _ in processes:
+        kind, latencies, errors = results.get()
+        merged, total_errors = collected[kind]
+        merged.extend(latencies)
+        collected[kind] = (merged, total_errors + errors)
+    for process in processes:
+        process.join()
+
+    from scripts.bench_load import percentile
+
+    report = {}
+    for kind, (latencies, errors) in collected.items():
+        latencies.sort()
+        report[kind] = {
+            "requests": len(latencies),
+            "errors": errors,
+            "per_second": round(len(latencies) / args.duration, 1),
+            "p50_ms": round(percentile(latencies, 0.50), 2) if latencies else None,
+            "p95_ms": round(percentile(latencies, 0.95), 2) if latencies else None,
+            "p99_ms": round(percentile(latencies, 0.99), 2) if latencies else None,
+            "max_ms": round(latencies[-1], 2) if latencies else None,
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure read throughput under concurrent food-log writes")
+    parser.add_argument("--readers", type=int, default=4, help="Reader processes.")
+    parser.add_argument("--writers", type=int, default=2, help="Processes posting /member/log-food.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per profile.")
+    parser.add_argument("--startup", type=float, default=10.0, help="Seconds allowed for workers to start.")
+    parser.add_argument("--profile", choices=["stock", "tuned", "both"], default="both")
+    parser.add_argument("--tag", default="", help="Only act as members seeded with this --tag.")
+    parser.add_argument("--users", type=int, default=50, help="Distinct members to act as.")
+    parser.add_argument("--in-place", action="store_true", help="Write to DATABASE_URL itself instead of a copy.")
+    parser.add_argument("--output", default="", help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args()
+
+    from config import Config
+
+    database_url = Config.SQLALCHEMY_DATABASE_URI
+    if not database_url.startswith("sqlite:///"):
+        print("This benchmark compares SQLite profiles; DATABASE_URL must be a sqlite file.", file=sys.stderr)
+        return 2
+    database_path = database_url[len("sqlite:///"):]
+    member_ids, food_ids = _load_ids(database_url, args.tag, args.users)
+    if not member_ids or not food_ids:
+        print("No members or foods found; run scripts/seed_synthetic.py first.", file=sys.stderr)
+        return 1
+
+    profiles = ["stock", "tuned"] if args.profile == "both" else [args.profile]
+    report = {
+        "meta": {"readers": args.readers, "writers": args.writers, "duration_s": args.duration, "members": len(member_ids)},
+        "profiles": {},
+    }
+    for name in profiles:
+        path = database_path if args.in_place else _copy_database(database_path)
+        try:
+            result = report["profiles"][name] = run_profile(name, path, args, member_ids, food_ids)
+        finally:
+            if not args.in_place:
+                for suffix in ("", "-wal", "-shm", "-journal"):
+                    if os.path.exists(path + suffix):
+                        os.remove(path + suffix)
+        for kind in ("read", "write"):
+            stats = result[kind]
+            print(
+                f"{name:<6} {kind:<5} {stats['per_second']:>8.1f}/s  p50 {stats['p50_ms'] or 0:>7.1f}ms  "
+                f"p95 {stats['p95_ms'] or 0:>7.1f}ms  p99 {stats['p99_ms'] or 0:>7.1f}ms  errors {stats['errors']}",
+                file=sys.stderr,
+            )
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
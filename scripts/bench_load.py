@@ -0,0 +1,285 @@
+"""Load benchmark for the main member and trainer endpoints.
+
+Usage::
+
+    python scripts/bench_load.py [--requests 200] [--concurrency 8] [--output report.json]
+    python scripts/bench_load.py --base-url http://127.0.0.1:5000 --password synthetic-password
+
+Seed the database first with ``scripts/seed_synthetic.py``. Each route is
+driven in its own phase by ``--concurrency`` threads, each request as a
+randomly chosen member or trainer. By default requests go through Flask's
+test client in this process against ``DATABASE_URL``. With ``--base-url``
+they go over HTTP to a running server, logging in with the shared synthetic
+password.
+
+The report gives, per route, request and error counts, throughput and
+p50/p95/p99 latency. It is written as JSON so two releases can be compared
+run for run.
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from app import create_app, db
+from app.models import Food, User
+
+# (name, role, method, path template, form data builder or None)
+ROUTES = [
+    ("member.dashboard", "member", "GET", "/member/dashboard", None),
+    ("member.dashboard[calendar]", "member", "GET", "/member/dashboard?view=calendar", None),
+    ("member.dashboard[profile]", "member", "GET", "/member/dashboard?view=profile", None),
+    ("member.get_totals", "member", "GET", "/member/get-totals", None),
+    ("member.search_foods", "member", "GET", "/member/search-foods?q={word}&unit=g&quantity=100", None),
+    ("member.autocomplete_foods", "member", "GET", "/member/autocomplete-foods?q={prefix}", None),
+    ("member.member_summary", "member", "GET", "/member/summary", None),
+    ("member.member_summary_chart_data", "member", "GET", "/member/summary/chart-data", None),
+    ("trainer.dashboard_trainer", "trainer", "GET", "/trainer/dashboard-trainer", None),
+    ("trainer.client_roster", "trainer", "GET", "/trainer/roster", None),
+    ("trainer.client_detail", "trainer", "GET", "/trainer/clients/{client_id}", None),
+    ("trainer.client_summary_view", "trainer", "GET", "/trainer/clients/{client_id}/summary-view", None),
+    ("template.search_exercises_api", "member", "GET", "/templates/api/search?q={exercise}", None),
+]
+WRITE_ROUTES = [
+    ("member.log_food", "member", "POST", "/member/log-food",
+     lambda ctx: {"food_id": str(ctx["food_id"]), "quantity": "100", "unit": "g"}),
+]
+_SEARCH_WORDS = ["chicken", "rice", "banana", "milk", "egg", "yogurt", "oats", "beans", "apple", "cheese"]
+_EXERCISE_WORDS = ["squat", "press", "curl", "row", "deadlift", "chest", "biceps", "barbell"]
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    # The epsilon keeps float noise (0.07 * 100 == 7.000000000000001) off the next rank.
+    rank = max(1, math.ceil(fraction * len(sorted_values) - 1e-9))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def login_test_client(app, user_id, role):
+    """A test client whose session is already logged in as ``user_id``."""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user_id)
+        session["_fresh"] = True
+        session["user_id"] = user_id
+        session["role"] = role
+    return client
+
+
+class TestClientDriver:
+    """Requests through Flask's test client, one logged-in client per thread and user."""
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def _client(self, user_id, role):
+        clients = getattr(self._local, "clients", None)
+        if clients is None:
+            clients = self._local.clients = {}
+        client = clients.get(user_id)
+        if client is None:
+            client = clients[user_id] = login_test_client(self.app, user_id, role)
+        return client
+
+    def request(self, user_id, role, method, path, data):
+        response = self._client(user_id, role).open(path, method=method, data=data)
+        return response.status_code
+
+
+class _HttpDriver:
+    """Requests over HTTP to a running server, logging each user in once per thread."""
+
+    def __init__(self, base_url, password, emails):
+        import requests
+
+        self._requests = requests
+        self.base_url = base_url.rstrip("/")
+        self.password = password
+        self.emails = emails
+        self._local = threading.local()
+
+    def _session(self, user_id, role):
+        sessions = getattr(self._local, "sessions", None)
+        if sessions is None:
+            sessions = self._local.sessions = {}
+        http = sessions.get(user_id)
+        if http is None:
+            http = self._requests.Session()
+            login = "/auth/login-trainer" if role == "trainer" else "/auth/login-member"
+            http.post(
+                self.base_url + login,
+                data={"email": self.emails[user_id], "password": self.password},
+                timeout=30,
+            )
+            sessions[user_id] = http
+        return http
+
+    def request(self, user_id, role, method, path, data):
+        response = self._session(user_id, role).request(
+            method, self.base_url + path, data=data, timeout=60, allow_redirects=False
+        )
+        return response.status_code
+
+
+def load_actors(tag, limit):
+    query = User.query.filter(User.role == "member", User.trainer_id.isnot(None))
+    if tag:
+        query = query.filter(User.email.like(f"{tag}-%@example.com"))
+    members = query.order_by(User.id).limit(limit).all()
+    trainer_ids = sorted({member.trainer_id for member in members})
+    trainers = User.query.filter(User.id.in_(trainer_ids)).all() if trainer_ids else []
+    clients_by_trainer = {}
+    for member in members:
+        clients_by_trainer.setdefault(member.trainer_id, []).append(member.id)
+    food_ids = db.session.execute(db.select(Food.id).limit(500)).scalars().all()
+    emails = {user.id: user.email for user in members + trainers}
+    return [member.id for member in members], clients_by_trainer, food_ids, emails
+
+
+def build_jobs(route, actors, count, rnd_seed):
+    """``count`` requests for ``route`` as ``(user_id, path, form data)``."""
+    _, role, _, path_template, build_data = route
+    member_ids, clients_by_trainer, food_ids, _ = actors
+    trainer_ids = list(clients_by_trainer)
+    rnd = random.Random(rnd_seed)
+
+    jobs = []
+    for _ in range(count):
+        if role == "trainer":
+            user_id = rnd.choice(trainer_ids)
+            client_id = rnd.choice(clients_by_trainer[user_id])
+        else:
+            user_id = rnd.choice(member_ids)
+            client_id = user_id
+        word = rnd.choice(_SEARCH_WORDS)
+        ctx = {
+            "client_id": client_id,
+            "word": word,
+            "prefix": word[:rnd.randint(2, 4)],
+            "exercise": rnd.choice(_EXERCISE_WORDS),
+            "food_id": rnd.choice(food_ids) if food_ids else 1,
+        }
+        data = build_data(ctx) if build_data else None
+        jobs.append((user_id, path_template.format(**ctx), data))
+    return jobs
+
+
+def _run_route(driver, route, args, actors, rnd_seed):
+    _, role, method, _, _ = route
+    jobs = build_jobs(route, actors, args.requests, rnd_seed)
+
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def run(job):
+        nonlocal errors
+        user_id, path, data = job
+        started = time.perf_counter()
+        try:
+            status = driver.request(user_id, role, method, path, data)
+        except Exception:
+            status = None
+        elapsed = (time.perf_counter() - started) * 1000
+        with lock:
+            latencies.append(elapsed)
+            if status is None or status >= 400 or (method == "GET" and 300 <= status < 400):
+                errors += 1
+
+    # Warm caches and log-ins so the measured phase is steady state.
+    for job in jobs[:min(args.warmup, len(jobs))]:
+        run(job)
+    latencies.clear()
+    errors = 0
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(run, jobs))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 1) if wall else None,
+        "mean_ms": round(sum(latencies) / len(latencies), 2) if latencies else None,
+        "p50_ms": round(percentile(latencies, 0.50), 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 0.95), 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99), 2) if latencies else None,
+        "max_ms": round(latencies[-1], 2) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the main endpoints and report latency percentiles")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per route.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent client threads.")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests per route before timing.")
+    parser.add_argument("--routes", default="", help="Comma-separated route names or prefixes (default: all).")
+    parser.add_argument("--include-writes", action="store_true", help="Also benchmark POST /member/log-food.")
+    parser.add_argument("--tag", default="", help="Only act as users seeded with this --tag.")
+    parser.add_argument("--users", type=int, default=200, help="Maximum distinct members to act as.")
+    parser.add_argument("--base-url", default="", help="Benchmark a running server instead of the test client.")
+    parser.add_argument("--password", default="synthetic-password", help="Login password for --base-url mode.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="", help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        actors = load_actors(args.tag, args.users)
+    if not actors[0]:
+        print("No members with a trainer found; run scripts/seed_synthetic.py first.", file=sys.stderr)
+        return 1
+
+    driver = _HttpDriver(args.base_url, args.password, actors[3]) if args.base_url else TestClientDriver(app)
+    routes = ROUTES + (WRITE_ROUTES if args.include_writes else [])
+    if args.routes:
+        wanted = [value.strip() for value in args.routes.split(",") if value.strip()]
+        routes = [route for route in routes if any(route[0].startswith(prefix) for prefix in wanted)]
+
+    results = {}
+    for index, route in enumerate(routes):
+        results[route[0]] = stats = _run_route(driver, route, args, actors, args.seed + index)
+        print(
+            f"{route[0]:<36} {stats['throughput_rps'] or 0:>8.1f} req/s  p50 {stats['p50_ms'] or 0:>7.1f}ms  "
+            f"p95 {stats['p95_ms'] or 0:>7.1f}ms  p99 {stats['p99_ms'] or 0:>7.1f}ms  errors {stats['errors']}",
+            file=sys.stderr,
+        )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "mode": "http" if args.base_url else "test-client",
+            "base_url": args.base_url or None,
+            "database": app.config["SQLALCHEMY_DATABASE_URI"] if not args.base_url else None,
+            "requests_per_route": args.requests,
+            "concurrency": args.concurrency,
+            "members": len(actors[0]),
+            "trainers": len(actors[1]),
+            "python": platform.python_version(),
+        },
+        "routes": results,
+    }
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(payload + "\n")
+        print(f"Report written to {args.output}", file=sys.stderr)
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
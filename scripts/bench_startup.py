@@ -0,0 +1,70 @@
+"""Measure cold-start cost of ``create_app()``.
+
+Usage::
+
+    python scripts/bench_startup.py [--runs 5]
+
+Each run starts a fresh interpreter, imports the app package, calls
+``create_app()`` and reports wall time, peak RSS and whether heavy optional
+libraries (pandas, plotly, numpy) were pulled in along the way.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("pandas", "plotly", "numpy")
+
+_PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app()
+done = time.perf_counter()
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "total_ms": (done - start) * 1000,
+    "rss_mb": rss_kb / 1024,
+    "heavy": [name for name in %r if name in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def _run_once():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = PROJECT_ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark create_app() cold start time and memory")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh interpreters to time.")
+    args = parser.parse_args()
+
+    samples = [_run_once() for _ in range(max(1, args.runs))]
+    import_ms = [sample["import_ms"] for sample in samples]
+    total_ms = [sample["total_ms"] for sample in samples]
+    rss_mb = [sample["rss_mb"] for sample in samples]
+
+    print(f"runs:            {len(samples)}")
+    print(f"import app:      median {statistics.median(import_ms):.0f} ms (min {min(import_ms):.0f})")
+    print(f"create_app():    median {statistics.median(total_ms):.0f} ms (min {min(total_ms):.0f})")
+    print(f"peak RSS:        median {statistics.median(rss_mb):.1f} MB")
+    print(f"heavy modules:   {', '.join(samples[-1]['heavy']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
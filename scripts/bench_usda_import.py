@@ -0,0 +1,104 @@
+"""Throughput benchmark for the USDA bulk import pipeline.
+
+Usage::
+
+    python scripts/bench_usda_import.py [--records 50000] [--chunk-size 2000] [--workers 4]
+
+Writes a synthetic FoodData Central file (BrandedFoods layout, half the
+records with portions) to a temporary directory, imports it into a fresh
+SQLite database and reports records/second for the first load and for a
+re-run over the same data (every record unchanged, so only hashing happens).
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+_WORDS = (
+    "chicken beef rice bean apple banana milk cheese bread pasta tomato "
+    "sauce oat corn soy almond yogurt spinach potato turkey"
+).split()
+
+
+def write_synthetic_fdc(path, records, seed=1):
+    rnd = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write('{"BrandedFoods": [')
+        for index in range(records):
+            nutrients = [
+                {"nutrient": {"name": "Energy", "unitName": "kJ"}, "amount": rnd.uniform(100, 2000)},
+                {"nutrient": {"name": "Energy", "unitName": "kcal"}, "amount": rnd.uniform(20, 500)},
+                {"nutrient": {"name": "Protein", "unitName": "g"}, "amount": rnd.uniform(0, 30)},
+                {"nutrient": {"name": "Carbohydrate, by difference", "unitName": "g"}, "amount": rnd.uniform(0, 80)},
+                {"nutrient": {"name": "Total lipid (fat)", "unitName": "g"}, "amount": rnd.uniform(0, 40)},
+            ]
+            nutrients += [
+                {"nutrient": {"name": f"Nutrient {n}", "unitName": "mg"}, "amount": rnd.uniform(0, 100)}
+                for n in range(20)
+            ]
+            portions = []
+            if index % 2:
+                portions = [
+                    {"measureUnit": {"name": "cup"}, "gramWeight": rnd.uniform(100, 250)},
+                    {"measureUnit": {"name": "Tbsp"}, "gramWeight": rnd.uniform(5, 20)},
+                ]
+            record = {
+                "fdcId": 1000000 + index,
+                "description": f"{' '.join(rnd.sample(_WORDS, 3)).upper()} {index}",
+                "dataType": "Branded",
+                "brandOwner": "Synthetic Foods Inc.",
+                "ingredients": ", ".join(rnd.choices(_WORDS, k=rnd.randint(5, 40))),
+                "foodNutrients": nutrients,
+                "foodPortions": portions,
+            }
+            if index:
+                handle.write(",")
+            handle.write(json.dumps(record))
+        handle.write("]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark USDA bulk import throughput")
+    parser.add_argument("--records", type=int, default=50000, help="Synthetic foods to generate.")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Foods per bulk write/commit.")
+    parser.add_argument("--workers", type=int, default=1, help="Parser processes (see cache_usda_json.py --workers).")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="usda-bench-")
+    fdc_path = os.path.join(workdir, "BrandedFoods.json")
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(workdir, "bench.sqlite3")
+
+    # Imported after DATABASE_URL is set so the app binds to the scratch database.
+    from app import create_app, db
+    from app.models import Food, FoodMeasure
+    from app.services.usda_import import CHUNK_SIZE, UsdaBulkLoader, iter_normalized_foods
+
+    started = time.perf_counter()
+    write_synthetic_fdc(fdc_path, args.records)
+    size_mb = os.path.getsize(fdc_path) / (1024 * 1024)
+    print(f"Synthetic file: {args.records:,} records, {size_mb:,.1f} MB ({time.perf_counter() - started:.1f}s)")
+    print(f"Parser workers: {args.workers}")
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        for label in ("initial load", "re-run"):
+            started = time.perf_counter()
+            loader = UsdaBulkLoader(chunk_size=args.chunk_size or CHUNK_SIZE)
+            for foods, _, _ in iter_normalized_foods(fdc_path, workers=args.workers):
+                loader.add_many(foods)
+            loader.flush()
+            elapsed = time.perf_counter() - started
+            print(
+                f"{label:>12}: {elapsed:6.2f}s | {args.records / elapsed:,.0f} rec/s | "
+                f"foods +{loader.counts['added']:,} ~{loader.counts['changed']:,} ={loader.counts['unchanged']:,} | "
+                f"portions +{loader.counts['portions_added']:,}"
+            )
+        print(f"Rows: {Food.query.count():,} foods, {FoodMeasure.query.count():,} measures")
+    print(f"Scratch files left in {workdir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Flag benchmarked queries that SQLite answers with a full table scan.
+
+Usage::
+
+    python scripts/index_advisor.py [--requests 3] [--min-rows 1000] [--json report.json]
+
+Drives every route of ``scripts/bench_load.py`` through the test client and
+captures the distinct statements with ``record_queries``. Each one is then
+run through ``EXPLAIN QUERY PLAN``. A plan step that reads a table of at
+least ``--min-rows`` rows with ``SCAN`` and no index is reported, together
+with the routes that issued the statement. Temp B-trees built for ORDER BY
+or GROUP BY are listed as notes.
+
+Exits with status 1 when a scan is found, so new queries can be checked
+before they ship. Seed the database first with ``scripts/seed_synthetic.py``,
+otherwise most tables stay below the row threshold.
+"""
+import argparse
+import json
+import re
+import sys
+
+from app import create_app, db
+from app.services.perf import record_queries
+from scripts.bench_load import ROUTES, WRITE_ROUTES, TestClientDriver, build_jobs, load_actors
+
+_EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE")
+# "SCAN user_food_log" on SQLite >= 3.36, "SCAN TABLE user_food_log" before.
+_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?(.*)$")
+
+
+def _table_sizes(connection):
+    names = connection.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    ).scalars().all()
+    sizes = {}
+    for name in names:
+        try:
+            sizes[name] = connection.exec_driver_sql(f'SELECT COUNT(*) FROM "{name}"').scalar()
+        except Exception:
+            # FTS shadow tables and the like can refuse direct reads.
+            continue
+    return sizes
+
+
+def _capture(app, actors, requests_per_route, include_writes):
+    """Map each distinct statement to its raw sample and the routes that ran it."""
+    driver = TestClientDriver(app)
+    routes = ROUTES + (WRITE_ROUTES if include_writes else [])
+    captured = {}
+    for index, route in enumerate(routes):
+        name, role, method, _, _ = route
+        with record_queries(keep_samples=True) as recorder:
+            for user_id, path, data in build_jobs(route, actors, requests_per_route, index + 1):
+                driver.request(user_id, role, method, path, data)
+        for normalized, sample in recorder.samples.items():
+            entry = captured.setdefault(normalized, {"sample": sample, "routes": set(), "count": 0})
+            entry["routes"].add(name)
+            entry["count"] += recorder.statements[normalized][0]
+    return captured
+
+
+def _explain(connection, statement, parameters):
+    rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters or ()).all()
+    return [row[-1] for row in rows]
+
+
+def analyse(connection, captured, min_rows):
+    sizes = _table_sizes(connection)
+    findings = []
+    for normalized, entry in captured.items():
+        statement, parameters = entry["sample"]
+        if not statement.lstrip().upper().startswith(_EXPLAINABLE):
+            continue
+        try:
+            plan = _explain(connection, statement, parameters)
+        except Exception as exc:
+            plan, error = [], str(exc)
+        else:
+            error = None
+        scans = []
+        notes = []
+        for step in plan:
+            match = _SCAN_RE.match(step)
+            if match and "USING" not in match.group(2) and "VIRTUAL TABLE" not in match.group(2):
+                table = match.group(1)
+                rows = sizes.get(table)
+                if rows is not None and rows >= min_rows:
+                    scans.append({"table": table, "rows": rows, "step": step})
+            elif step.startswith("USE TEMP B-TREE"):
+                notes.append(step)
+        if scans or error:
+            findings.append({
+                "statement": normalized,
+                "routes": sorted(entry["routes"]),
+                "executions": entry["count"],
+                "scans": scans,
+                "notes": notes,
+                "plan": plan,
+                "error": error,
+            })
+    findings.sort(key=lambda item: -max((scan["rows"] for scan in item["scans"]), default=0))
+    return findings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN every benchmarked query and flag full table scans")
+    parser.add_argument("--requests", type=int, default=3, help="Requests per route while capturing.")
+    parser.add_argument("--min-rows", type=int, default=1000, help="Ignore scans of tables smaller than this.")
+    parser.add_argument("--include-writes", action="store_true", help="Also capture POST /member/log-food.")
+    parser.add_argument("--tag", default="", help="Only act as users seeded with this --tag.")
+    parser.add_argument("--json", default="", help="Also write the findings to this file.")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if db.engine.dialect.name != "sqlite":
+            print("The index advisor reads SQLite query plans; point DATABASE_URL at a SQLite copy.", file=sys.stderr)
+            return 2
+        actors = load_actors(args.tag, 200)
+    if not actors[0]:
+        print("No members with a trainer found; run scripts/seed_synthetic.py first.", file=sys.stderr)
+        return 2
+
+    captured = _capture(app, actors, args.requests, args.include_writes)
+    with app.app_context():
+        with db.engine.connect() as connection:
+            findings = analyse(connection, captured, args.min_rows)
+
+    flagged = [item for item in findings if item["scans"]]
+    print(f"Explained {len(captured)} distinct statements; {len(flagged)} scan a table of >= {args.min_rows} rows.")
+    for item in findings:
+        print()
+        tables = ", ".join(f"{scan['table']} ({scan['rows']} rows)" for scan in item["scans"])
+        print(f"SCAN {tables}" if tables else "EXPLAIN failed")
+        print(f"  routes: {', '.join(item['routes'])}  executions: {item['executions']}")
+        print(f"  sql: {item['statement'][:300]}")
+        for step in item["plan"]:
+            print(f"    {step}")
+        if item["error"]:
+            print(f"  error: {item['error']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(findings, handle, indent=2)
+            handle.write("\n")
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""Rebuild the daily_nutrition_totals table from raw food logs.
+
+Usage::
+
+    python scripts/rebuild_daily_totals.py [--user USER_ID]
+
+Totals are maintained incrementally as logs are added and removed; run this
+after editing food macros or whenever the table is suspected to have drifted.
+"""
+import argparse
+
+from app import create_app, db
+from app.services.daily_totals import rebuild_daily_totals
+
+app = create_app()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild per-day nutrition totals from food logs")
+    parser.add_argument("--user", type=int, default=None, help="Only rebuild totals for this user id.")
+    args = parser.parse_args()
+
+    with app.app_context():
+        rows = rebuild_daily_totals(args.user)
+        db.session.commit()
+
+    scope = f"user {args.user}" if args.user is not None else "all users"
+    print(f"Rebuilt {rows} daily total row(s) for {scope}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+"""Generate production-scale synthetic data for local load testing.
+
+Usage::
+
+    flask db upgrade
+    python scripts/seed_synthetic.py [--trainers 5] [--members-per-trainer 20] [--years 2] [--seed 1]
+
+The database named by ``DATABASE_URL`` must already be migrated to the
+latest revision, so benchmarks run against the production schema including
+the migration-only objects (the food search index and its triggers); the
+script refuses to run otherwise rather than creating tables itself.
+
+Creates trainers, their members and years of history for every member: food
+logs, weigh-ins, workout sessions with sets, trainer and member meals, and
+trainer messages. Everything except the users is written with Core
+``executemany`` inserts in batches, and ``daily_nutrition_totals`` is rebuilt
+once at the end, so a few hundred thousand logs take seconds rather than the
+hours the per-row ORM listeners would need.
+
+Behaviour varies per member so the data has realistic skew: some members log
+food nearly every day and others a few times a week, each member eats mostly
+from a personal set of favourite foods, weights drift toward a goal with
+day-to-day noise, and workout frequency ranges from occasional to five times
+a week.
+
+All synthetic accounts share the password given by ``--password`` (email
+verified) so ``scripts/bench_load.py --base-url`` can log in over HTTP.
+Emails are tagged with ``--tag`` so several data sets can coexist.
+"""
+import argparse
+import math
+import random
+import string
+import sys
+import time
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from flask import current_app
+from werkzeug.security import generate_password_hash
+
+from app import create_app, db
+from app.models import (
+    AssignedTemplate,
+    ExerciseCatalog,
+    ExerciseTemplate,
+    Food,
+    FoodMeasure,
+    MemberMeal,
+    MemberMealIngredient,
+    Message,
+    Progress,
+    TemplateExercise,
+    TrainerMeal,
+    TrainerMealIngredient,
+    User,
+    UserFoodLog,
+    WorkoutSession,
+    WorkoutSet,
+)
+from app.services.daily_totals import rebuild_daily_totals
+from app.services.nutrition import nutrient_densities
+
+DEFAULT_PASSWORD = "synthetic-password"
+BATCH_SIZE = 5000
+SYNTHETIC_FOODS = 300
+FAVOURITE_FOODS = 25
+
+_FOOD_WORDS = (
+    "chicken beef turkey salmon tuna egg rice oats quinoa pasta bread potato "
+    "broccoli spinach apple banana berries yogurt milk cheese almonds peanut "
+    "beans lentils avocado tofu"
+).split()
+_FALLBACK_EXERCISES = [
+    ("Barbell Squat", "quadriceps", "barbell"),
+    ("Bench Press", "chest", "barbell"),
+    ("Deadlift", "hamstrings", "barbell"),
+    ("Overhead Press", "shoulders", "barbell"),
+    ("Pull-Up", "lats", "body only"),
+    ("Dumbbell Row", "middle back", "dumbbell"),
+    ("Dumbbell Curl", "biceps", "dumbbell"),
+    ("Triceps Pushdown", "triceps", "cable"),
+    ("Leg Press", "quadriceps", "machine"),
+    ("Romanian Deadlift", "hamstrings", "barbell"),
+]
+_MESSAGES = [
+    "Great work this week, keep it up!",
+    "Remember to log your meals today.",
+    "Let's bump the squat weight next session.",
+    "How are you feeling after yesterday's workout?",
+    "Try to hit your protein target this week.",
+    "Nice consistency on your weigh-ins.",
+]
+
+
+class _BatchWriter:
+    """Buffer rows per table and flush them with executemany in batches."""
+
+    def __init__(self, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+        self.counts = {}
+        self._rows = {}
+
+    def add(self, table, row):
+        rows = self._rows.setdefault(table, [])
+        rows.append(row)
+        if len(rows) >= self.batch_size:
+            self._write(table)
+
+    def _write(self, table):
+        rows = self._rows.get(table)
+        if rows:
+            db.session.execute(table.insert(), rows)
+            self.counts[table.name] = self.counts.get(table.name, 0) + len(rows)
+            self._rows[table] = []
+
+    def flush(self):
+        for table in list(self._rows):
+            self._write(table)
+
+
+def _insert_returning_ids(table, rows):
+    if not rows:
+        return []
+    result = db.session.execute(table.insert().returning(table.c.id), rows)
+    return list(result.scalars())
+
+
+def _food_pool(rnd):
+    """Return [(food_id, {measure_name: grams})], creating synthetic foods if the table is small."""
+    existing = db.session.execute(db.select(Food.id).order_by(Food.id).limit(SYNTHETIC_FOODS * 10)).scalars().all()
+    if len(existing) >= SYNTHETIC_FOODS:
+        food_ids = rnd.sample(existing, SYNTHETIC_FOODS)
+    else:
+        rows = []
+        for index in range(SYNTHETIC_FOODS):
+            protein, carbs, fats = rnd.uniform(0, 30), rnd.uniform(0, 70), rnd.uniform(0, 30)
+            row = {
+                "name": f"{' '.join(rnd.sample(_FOOD_WORDS, 2)).title()} (synthetic {index})",
+                "calories": protein * 4 + carbs * 4 + fats * 9 + rnd.uniform(-10, 10),
+                "protein_g": protein,
+                "carbs_g": carbs,
+                "fats_g": fats,
+                "serving_size": 100,
+                "serving_unit": "g",
+            }
+            rows.append({**row, **nutrient_densities(SimpleNamespace(**row))})
+        food_ids = _insert_returning_ids(Food.__table__, rows)
+        measures = []
+        for food_id in food_ids:
+            for measure_name, grams in (("cup", rnd.uniform(80, 250)), ("serving", rnd.uniform(30, 200))):
+                if rnd.random() < 0.6:
+                    measures.append({"food_id": food_id, "measure_name": measure_name, "grams": grams})
+        if measures:
+            db.session.execute(FoodMeasure.__table__.insert(), measures)
+
+    pool = {food_id: {} for food_id in food_ids}
+    rows = db.session.execute(
+        db.select(FoodMeasure.food_id, FoodMeasure.measure_name, FoodMeasure.grams)
+        .where(FoodMeasure.food_id.in_(food_ids))
+        .order_by(FoodMeasure.id)
+    )
+    for food_id, measure_name, grams in rows:
+        if measure_name and grams:
+            pool[food_id].setdefault(measure_name, grams)
+    return list(pool.items())
+
+
+def _exercise_pool():
+    rows = db.session.execute(
+        db.select(ExerciseCatalog.name, ExerciseCatalog.primary_muscles, ExerciseCatalog.equipment).limit(200)
+    ).all()
+    return [tuple(row) for row in rows] or _FALLBACK_EXERCISES
+
+
+def _quantity(rnd, measures):
+    """Pick a logged (quantity, unit, grams) like a member would enter it."""
+    if measures and rnd.random() < 0.4:
+        unit, grams = rnd.choice(list(measures.items()))
+        quantity = rnd.choice([0.5, 1, 1, 1, 1.5, 2])
+        return quantity, unit, quantity * grams
+    grams = round(min(800, max(10, rnd.lognormvariate(math.log(150), 0.5))))
+    return grams, "g", grams
+
+
+def _at(day, hour):
+    return datetime.combine(day, datetime.min.time()) + timedelta(hours=hour)
+
+
+def seed(trainers, members_per_trainer, years, tag, password, seed_value):
+    rnd = random.Random(seed_value)
+    # Trainer codes are unique across data sets, so they don't follow --seed.
+    code_rnd = random.SystemRandom()
+    today = date.today()
+    days = int(365 * years)
+    now = datetime.utcnow()
+    password_hash = generate_password_hash(password)
+    writer = _BatchWriter()
+
+    foods = _food_pool(rnd)
+    exercises = _exercise_pool()
+    popularity = [1 / (rank + 1) for rank in range(len(foods))]
+
+    for trainer_index in range(trainers):
+        trainer_id = _insert_returning_ids(User.__table__, [{
+            "first_name": f"Trainer{trainer_index}",
+            "last_name": tag.title(),
+            "email": f"{tag}-trainer{trainer_index}@example.com",
+            "password_hash": password_hash,
+            "role": "trainer",
+            "trainer_code": "".join(code_rnd.choices(string.ascii_uppercase + string.digits, k=6)),
+            "email_verified": True,
+            "created_at": _at(today - timedelta(days=days), 9),
+        }])[0]
+
+        member_rows = []
+        for member_index in range(members_per_trainer):
+            gender = rnd.choice(["male", "female"])
+            member_rows.append({
+                "first_name": f"Member{trainer_index}_{member_index}",
+                "last_name": tag.title(),
+                "email": f"{tag}-member{trainer_index}-{member_index}@example.com",
+                "password_hash": password_hash,
+                "role": "member",
+                "trainer_id": trainer_id,
+                "email_verified": True,
+                "gender": gender,
+                "age": rnd.randint(18, 65),
+                "height_cm": rnd.gauss(178 if gender == "male" else 164, 7),
+                "activity_level": rnd.choice([1.2, 1.375, 1.55, 1.725]),
+                "calorie_goal": rnd.choice([1600, 1800, 2000, 2200, 2500, 2800]),
+                "created_at": _at(today - timedelta(days=days), 10),
+            })
+        member_ids = _insert_returning_ids(User.__table__, member_rows)
+
+        # Templates and meals belong to the trainer and are shared by clients.
+        template_ids = _insert_returning_ids(ExerciseTemplate.__table__, [
+            {"owner_id": trainer_id, "name": name, "description": f"{name} program", "created_at": now}
+            for name in ("Full body A", "Full body B", "Upper / lower")
+        ])
+        template_exercises = {}
+        for template_id in template_ids:
+            picks = rnd.sample(exercises, min(len(exercises), rnd.randint(4, 6)))
+            rows = [
+                {"template_id": template_id, "exercise_name": name, "muscle": muscle, "equipment": equipment,
+                 "default_sets": 3, "default_reps": rnd.choice([5, 8, 10, 12])}
+                for name, muscle, equipment in picks
+            ]
+            template_exercises[template_id] = list(zip(_insert_returning_ids(TemplateExercise.__table__, rows), picks))
+
+        meal_ids = _insert_returning_ids(TrainerMeal.__table__, [
+            {"trainer_id": trainer_id, "member_id": rnd.choice(member_ids) if slot == "snacks" else None,
+             "name": f"{slot.title()} plan {index}", "meal_slot": slot, "created_at": now, "updated_at": now}
+            for index, slot in enumerate(["meal1", "meal2", "meal3", "snacks", "meal1"])
+        ])
+        for meal_id in meal_ids:
+            for position, (food_id, measures) in enumerate(rnd.sample(foods, rnd.randint(3, 5))):
+                quantity, unit, grams = _quantity(rnd, measures)
+                writer.add(TrainerMealIngredient.__table__, {
+                    "meal_id": meal_id, "food_id": food_id, "quantity_value": quantity, "quantity_unit": unit,
+                    "quantity_grams": grams, "position": position, "created_at": now,
+                })
+
+        for member_id in member_ids:
+            _seed_member(rnd, writer, member_id, trainer_id, days, today, foods, popularity, template_ids,
+                         template_exercises)
+        writer.flush()
+        db.session.commit()
+        print(f"   trainer {trainer_index + 1}/{trainers}: {members_per_trainer} members, "
+              f"{writer.counts.get('user_food_log', 0):,} food logs so far")
+
+    rebuilt = rebuild_daily_totals()
+    db.session.commit()
+    writer.counts["daily_nutrition_totals"] = rebuilt
+    return writer.counts
+
+
+def _seed_member(rnd, writer, member_id, trainer_id, days, today, foods, popularity, template_ids, template_exercises):
+    # Per-member habits drive the skew in the data set.
+    adherence = rnd.betavariate(4, 1.5)
+    favourites = rnd.choices(foods, weights=popularity, k=FAVOURITE_FOODS)
+    weigh_in_rate = rnd.uniform(0.15, 0.9)
+    workouts_per_week = rnd.choice([0.5, 1, 2, 3, 3, 4, 5])
+    weight = rnd.gauss(185, 30)
+    weekly_change = rnd.choice([-1.0, -0.5, -0.5, 0.0, 0.25])
+    template_id = rnd.choice(template_ids)
+
+    writer.add(AssignedTemplate.__table__, {
+        "template_id": template_id, "trainer_id": trainer_id, "member_id": member_id,
+        "assigned_at": _at(today - timedelta(days=days), 12),
+    })
+    for index in range(2):
+        meal_id = _insert_returning_ids(MemberMeal.__table__, [{
+            "user_id": member_id, "name": f"My meal {index + 1}", "meal_slot": f"meal{index + 1}",
+            "created_at": _at(today, 8), "updated_at": _at(today, 8),
+        }])[0]
+        for position, (food_id, measures) in enumerate(rnd.sample(favourites, 3)):
+            quantity, unit, grams = _quantity(rnd, measures)
+            writer.add(MemberMealIngredient.__table__, {
+                "meal_id": meal_id, "food_id": food_id, "quantity_value": quantity, "quantity_unit": unit,
+                "quantity_grams": grams, "position": position, "created_at": _at(today, 8),
+            })
+
+    workout_day_rate = workouts_per_week / 7
+    lift = {}
+    for day_offset in range(days, -1, -1):
+        day = today - timedelta(days=day_offset)
+        weekend = day.weekday() >= 5
+
+        if rnd.random() < adherence * (0.8 if weekend else 1.0):
+            for _ in range(max(1, int(rnd.gauss(4, 1.5)))):
+                food_id, measures = rnd.choice(favourites) if rnd.random() < 0.75 else rnd.choice(foods)
+                quantity, unit, grams = _quantity(rnd, measures)
+                hour = rnd.choice([12, 13, 16, 17, 22, 23]) + rnd.random()
+                writer.add(UserFoodLog.__table__, {
+                    "user_id": member_id, "food_id": food_id, "quantity": quantity, "unit": unit,
+                    "quantity_grams": grams, "log_date": day, "created_at": _at(day, hour),
+                })
+
+        weight += weekly_change / 7
+        if rnd.random() < weigh_in_rate:
+            writer.add(Progress.__table__, {
+                "user_id": member_id, "date": _at(day, 11 + rnd.random()),
+                "weight": round(weight + rnd.gauss(0, 1.2), 1),
+            })
+
+        if rnd.random() < workout_day_rate:
+            started = _at(day, rnd.choice([10, 14, 21, 22]) + rnd.random())
+            completed = started + timedelta(minutes=rnd.randint(35, 90)) if rnd.random() < 0.95 else None
+            session_id = _insert_returning_ids(WorkoutSession.__table__, [{
+                "user_id": member_id, "template_id": template_id, "started_at": started,
+                "completed_at": completed, "summary": "Synthetic session",
+            }])[0]
+            for template_exercise_id, (name, _, _) in template_exercises[template_id]:
+                base = lift.setdefault(name, rnd.uniform(45, 185))
+                lift[name] = base * 1.002
+                for set_number in range(1, rnd.randint(3, 4) + 1):
+                    writer.add(WorkoutSet.__table__, {
+                        "session_id": session_id, "template_exercise_id": template_exercise_id,
+                        "exercise_name": name, "set_number": set_number, "reps": rnd.randint(5, 12),
+                        "weight": round(base / 5) * 5,
+                    })
+
+        if rnd.random() < 0.25:
+            writer.add(Message.__table__, {
+                "trainer_id": trainer_id, "client_id": member_id, "content": rnd.choice(_MESSAGES),
+                "timestamp": _at(day, 15 + rnd.random()),
+                "read_at": None if day_offset < 3 and rnd.random() < 0.5 else _at(day, 20),
+            })
+
+
+def unmigrated_reason():
+    """Why the current database is not at the latest migration, or None if it is."""
+    script = ScriptDirectory(current_app.extensions["migrate"].directory)
+    with db.engine.connect() as connection:
+        current = set(MigrationContext.configure(connection).get_current_heads())
+    heads = set(script.get_heads())
+    if not current:
+        return "the database has no migration stamp"
+    if current != heads:
+        return f"the database is at {', '.join(sorted(current))}, not {', '.join(sorted(heads))}"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed synthetic trainers, members and history for load testing")
+    parser.add_argument("--trainers", type=int, default=5)
+    parser.add_argument("--members-per-trainer", type=int, default=20)
+    parser.add_argument("--years", type=float, default=2.0, help="Years of history per member.")
+    parser.add_argument("--tag", default="synthetic", help="Email prefix identifying this data set.")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="Password for every synthetic account.")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed; the same seed gives the same data.")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        reason = unmigrated_reason()
+        if reason is not None:
+            print(f"Refusing to seed: {reason}. Run 'flask db upgrade' first.", file=sys.stderr)
+            return 2
+        taken = User.query.filter(User.email.like(f"{args.tag}-%@example.com")).first()
+        if taken is not None:
+            print(f"Synthetic data tagged '{args.tag}' already exists; pick another --tag.")
+            return 1
+
+        started = time.perf_counter()
+        counts = seed(args.trainers, args.members_per_trainer, args.years, args.tag, args.password, args.seed)
+        elapsed = time.perf_counter() - started
+
+    for table, count in sorted(counts.items()):
+        print(f"{table:>28}: {count:,}")
+    print(f"Seeded {args.trainers} trainers x {args.members_per_trainer} members "
+          f"({args.years:g} years) in {elapsed:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
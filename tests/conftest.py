@@ -0,0 +1,204 @@
+"""Shared fixtures: one seeded SQLite database for the whole test session.
+
+The data set is sized so per-row queries show up in query counts: a member
+with a year of food logs, weigh-ins and workouts, and a trainer with 100
+clients who each logged something today. Every log of a day uses a different
+food, so a lazy per-log food load cannot hide behind the identity map.
+"""
+import os
+import random
+import tempfile
+from datetime import date, datetime, timedelta
+
+import pytest
+
+_DB_DIR = tempfile.mkdtemp(prefix="flex-tests-")
+# config.Config reads DATABASE_URL at import time, so set it before importing the app.
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_DB_DIR, "test.sqlite3")
+
+from app import create_app, db  # noqa: E402
+from app.models import (  # noqa: E402
+    AssignedTemplate,
+    ExerciseCatalog,
+    ExerciseTemplate,
+    Food,
+    FoodMeasure,
+    Progress,
+    TemplateExercise,
+    User,
+    UserFoodLog,
+    WorkoutSession,
+    WorkoutSet,
+)
+from app.services.daily_totals import rebuild_daily_totals  # noqa: E402
+from app.services.food_search import ensure_food_search_index  # noqa: E402
+from scripts.bench_load import login_test_client  # noqa: E402
+
+CLIENT_COUNT = 100
+HISTORY_DAYS = 365
+# Filler foods on top of _FOODS, so days can log only distinct foods.
+EXTRA_FOODS = 40
+
+_FOODS = [
+    ("Bananas, raw", 89, 1.1, 23, 0.3, {"cup": 150}),
+    ("Milk, whole", 61, 3.2, 4.8, 3.3, {"cup": 244}),
+    ("Banana bread", 326, 4.3, 54, 10.5, {"slice": 60}),
+    ("Chicken breast, raw", 120, 22.5, 0, 2.6, {}),
+    ("Blueberries, raw", 57, 0.7, 14, 0.3, {"cup": 148}),
+    ("Oats, rolled", 379, 13.2, 67.7, 6.5, {"cup": 81}),
+    ("Rice, white, cooked", 130, 2.7, 28, 0.3, {"cup": 158}),
+    ("Egg, whole, raw", 143, 12.6, 0.7, 9.5, {}),
+    ("Peanut butter", 588, 25, 20, 50, {"tbsp": 16}),
+    ("Greek yogurt, plain", 59, 10, 3.6, 0.4, {"cup": 245}),
+]
+_EXERCISES = [
+    ("sq", "Barbell Squat", "barbell", "quadriceps", "glutes, hamstrings"),
+    ("bp", "Bench Press", "barbell", "chest", "triceps"),
+    ("dl", "Deadlift", "barbell", "hamstrings", "glutes, lower back"),
+    ("cu", "Dumbbell Curl", "dumbbell", "biceps", None),
+    ("op", "Overhead Press", "barbell", "shoulders", "triceps"),
+]
+
+
+def _seed():
+    rnd = random.Random(7)
+    today = date.today()
+
+    trainer = User(
+        first_name="Tess", last_name="Trainer", email="trainer@example.com",
+        password_hash="x", role="trainer", trainer_code="TRN001",
+    )
+    db.session.add(trainer)
+    db.session.flush()
+
+    foods = []
+    extra = [
+        (f"Pantry item {index}", 50 + index * 7, index % 9, 5 + index % 30, index % 12, {})
+        for index in range(EXTRA_FOODS)
+    ]
+    for name, calories, protein, carbs, fats, measures in _FOODS + extra:
+        food = Food(
+            name=name, calories=calories, protein_g=protein, carbs_g=carbs, fats_g=fats,
+            serving_size=100, serving_unit="g",
+        )
+        db.session.add(food)
+        foods.append((food, measures))
+    for code, name, equipment, primary, secondary in _EXERCISES:
+        db.session.add(ExerciseCatalog(
+            source_id=code, name=name, equipment=equipment, category="strength",
+            primary_muscles=primary, secondary_muscles=secondary,
+        ))
+    db.session.flush()
+    for food, measures in foods:
+        for measure_name, grams in measures.items():
+            db.session.add(FoodMeasure(food_id=food.id, measure_name=measure_name, grams=grams))
+
+    clients = []
+    for index in range(CLIENT_COUNT):
+        clients.append(User(
+            first_name=f"Client{index}", last_name="Member", email=f"client{index}@example.com",
+            password_hash="x", role="member", trainer_id=trainer.id,
+            gender="female" if index % 2 else "male", age=25 + index % 30, height_cm=160 + index % 30,
+            calorie_goal=2000,
+        ))
+    db.session.add_all(clients)
+    db.session.flush()
+    member = clients[0]
+
+    template = ExerciseTemplate(owner_id=trainer.id, name="Full body", description="Three lifts")
+    db.session.add(template)
+    db.session.flush()
+    template_exercises = [
+        TemplateExercise(template_id=template.id, exercise_name=name, muscle=primary, equipment=equipment,
+                         default_sets=3, default_reps=5)
+        for _, name, equipment, primary, _ in _EXERCISES[:3]
+    ]
+    db.session.add_all(template_exercises)
+    db.session.add(AssignedTemplate(template_id=template.id, trainer_id=trainer.id, member_id=member.id))
+    db.session.flush()
+
+    # Bulk rows go through Core; quantity_grams is filled in here and the
+    # daily totals are rebuilt once at the end instead of per insert.
+    logs = []
+    for day_offset in range(HISTORY_DAYS):
+        day = today - timedelta(days=day_offset)
+        for food, measures in rnd.sample(foods, rnd.randint(3, 6)):
+            if measures and rnd.random() < 0.5:
+                unit, grams = next(iter(measures.items()))
+                quantity = rnd.choice([0.5, 1, 2])
+                quantity_grams = quantity * grams
+            else:
+                unit, quantity = "g", rnd.randint(30, 300)
+                quantity_grams = quantity
+            logs.append({
+                "user_id": member.id, "food_id": food.id, "quantity": quantity, "unit": unit,
+                "quantity_grams": quantity_grams, "log_date": day,
+                "created_at": datetime.combine(day, datetime.min.time()) + timedelta(hours=17),
+            })
+    for client in clients[1:]:
+        food, _ = rnd.choice(foods)
+        logs.append({
+            "user_id": client.id, "food_id": food.id, "quantity": 150, "unit": "g",
+            "quantity_grams": 150, "log_date": today, "created_at": datetime.utcnow(),
+        })
+    db.session.execute(UserFoodLog.__table__.insert(), logs)
+
+    progress = []
+    for client in clients:
+        days = range(0, HISTORY_DAYS, 3) if client is member else (0, 7)
+        for day_offset in days:
+            progress.append({
+                "user_id": client.id,
+                "date": datetime.combine(today - timedelta(days=day_offset), datetime.min.time()) + timedelta(hours=15),
+                "weight": 180 - day_offset / 30 + rnd.uniform(-1, 1),
+            })
+    db.session.execute(Progress.__table__.insert(), progress)
+
+    for day_offset in range(0, HISTORY_DAYS, 2):
+        started = datetime.combine(today - timedelta(days=day_offset), datetime.min.time()) + timedelta(hours=14)
+        session = WorkoutSession(
+            user_id=member.id, template_id=template.id, started_at=started,
+            completed_at=started + timedelta(minutes=55),
+        )
+        db.session.add(session)
+        db.session.flush()
+        db.session.execute(WorkoutSet.__table__.insert(), [
+            {
+                "session_id": session.id, "template_exercise_id": exercise.id,
+                "exercise_name": exercise.exercise_name, "set_number": set_number,
+                "reps": 5, "weight": 135 + set_number * 10,
+            }
+            for exercise in template_exercises
+            for set_number in range(1, 4)
+        ])
+
+    rebuild_daily_totals()
+    db.session.commit()
+    return {"trainer_id": trainer.id, "member_id": member.id}
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = create_app()
+    app.config.update(TESTING=True)
+    with app.app_context():
+        db.create_all()
+        ensure_food_search_index(db.engine)
+        app.config["SEEDED"] = _seed()
+        db.session.remove()
+    yield app
+
+
+@pytest.fixture(scope="session")
+def seeded(app):
+    return app.config["SEEDED"]
+
+
+@pytest.fixture
+def member_client(app, seeded):
+    return login_test_client(app, seeded["member_id"], "member")
+
+
+@pytest.fixture
+def trainer_client(app, seeded):
+    return login_test_client(app, seeded["trainer_id"], "trainer")
@@ -0,0 +1,32 @@
+"""Query-budget assertions for route regression tests.
+
+Usage::
+
+    with assert_max_queries(8, "member dashboard"):
+        client.get("/member/dashboard")
+
+The block fails when it executes more statements than the budget, and the
+error lists the most repeated statements, which is where an N+1 shows up.
+"""
+from contextlib import contextmanager
+
+from app.services.perf import record_queries
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def assert_max_queries(limit, label="block"):
+    with record_queries() as recorder:
+        yield recorder
+    if recorder.count > limit:
+        repeated = "".join(
+            f"\n  {count}x {statement[:200]}"
+            for statement, count, _ in recorder.top_repeated()
+        )
+        raise QueryBudgetExceeded(
+            f"{label} ran {recorder.count} queries, budget is {limit}"
+            + (f"; most repeated:{repeated}" if repeated else "")
+        )
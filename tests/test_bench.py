@@ -0,0 +1,18 @@
+"""Benchmark report helpers give the same nearest ranks for any sample size."""
+import pytest
+
+from scripts.bench_load import percentile
+
+
+@pytest.mark.parametrize("size", [100, 200, 1000])
+def test_percentile_nearest_rank(size):
+    values = list(range(1, size + 1))
+    assert percentile(values, 0.50) == size * 50 // 100
+    assert percentile(values, 0.95) == size * 95 // 100
+    assert percentile(values, 0.99) == size * 99 // 100
+
+
+def test_percentile_small_samples():
+    assert percentile([], 0.5) is None
+    assert percentile([7.0], 0.99) == 7.0
+    assert percentile([1, 2, 3], 0.5) == 2
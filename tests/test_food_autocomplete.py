@@ -0,0 +1,36 @@
+"""The autocomplete index follows food renames and deletes."""
+from app import db
+from app.models import Food
+from app.services.food_autocomplete import food_autocomplete
+
+
+def test_rename_and_delete_are_reflected(app):
+    with app.app_context():
+        food = Food(name="Zzyzx crackers", calories=400, protein_g=8, carbs_g=70, fats_g=10,
+                    serving_size=100, serving_unit="g")
+        db.session.add(food)
+        db.session.commit()
+        food_id = food.id
+        assert food_id in food_autocomplete.lookup("zzyz")
+
+        food.name = "Quokka crackers"
+        db.session.commit()
+        assert food_id not in food_autocomplete.lookup("zzyz")
+        assert food_id in food_autocomplete.lookup("quok")
+
+        db.session.delete(food)
+        db.session.commit()
+        assert food_id not in food_autocomplete.lookup("quok")
+        db.session.remove()
+
+
+def test_rolled_back_rename_keeps_index(app):
+    with app.app_context():
+        food = Food.query.filter_by(name="Milk, whole").one()
+        assert food.id in food_autocomplete.lookup("milk")
+        food.name = "Renamed milk"
+        db.session.flush()
+        db.session.rollback()
+        assert not food_autocomplete._stale
+        assert food.id in food_autocomplete.lookup("milk")
+        db.session.remove()
@@ -0,0 +1,63 @@
+"""FTS index bootstrap: the index is rebuilt on demand but never at app startup."""
+import os
+import tempfile
+
+from flask import Flask
+from sqlalchemy import create_engine
+
+from app import db
+
+from app.models import Food
+from app.services import food_search
+
+
+def _bare_engine():
+    handle, path = tempfile.mkstemp(suffix=".sqlite3")
+    os.close(handle)
+    engine = create_engine("sqlite:///" + path)
+    Food.__table__.create(engine)
+    return engine
+
+
+def test_missing_index_is_rechecked(monkeypatch):
+    engine = _bare_engine()
+    assert food_search.fts_enabled(engine) is False
+
+    # Another process creates the index; the negative answer must not stick.
+    with engine.begin() as conn:
+        for statement in food_search.FOOD_FTS_DDL:
+            conn.exec_driver_sql(statement)
+    monkeypatch.setattr(food_search, "FTS_RECHECK_SECONDS", 0.0)
+    assert food_search.fts_enabled(engine) is True
+
+
+def test_ensure_indexes_existing_rows():
+    engine = _bare_engine()
+    with engine.begin() as conn:
+        conn.execute(Food.__table__.insert(), [{"name": "Bananas, raw"}, {"name": "Milk, whole"}])
+
+    assert food_search.ensure_food_search_index(engine) is True
+    assert food_search.fts_enabled(engine) is True
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(
+            f"SELECT rowid FROM {food_search.FOOD_FTS_TABLE} WHERE {food_search.FOOD_FTS_TABLE} MATCH 'banan*'"
+        ).all()
+    assert [row[0] for row in rows] == [1]
+
+
+def test_startup_warns_instead_of_building(caplog):
+    handle, path = tempfile.mkstemp(suffix=".sqlite3")
+    os.close(handle)
+    app = Flask(__name__)
+    app.config.from_object("config.Config")
+    app.config.update(SQLALCHEMY_DATABASE_URI="sqlite:///" + path)
+    db.init_app(app)
+    with app.app_context():
+        Food.__table__.create(db.engine)
+
+    food_search.init_food_search(app)
+
+    with app.app_context():
+        assert food_search._fts_table_exists(db.engine) is False
+        db.engine.dispose()
+    assert "flask db upgrade" in caplog.text
@@ -0,0 +1,89 @@
+"""The grams-per-unit cache never serves uncommitted or outdated measures."""
+from app import db
+from app.models import CatalogVersion, Food, FoodMeasure
+from app.services import nutrition
+from app.services.catalog_version import bump_catalog_version, get_catalog_version
+from app.services.nutrition import MEASURE_CATALOG, grams_per_unit
+
+
+def _oats():
+    return Food.query.filter_by(name="Oats, rolled").one().id
+
+
+def test_rollback_drops_uncommitted_measure(app):
+    with app.app_context():
+        food_id = _oats()
+        db.session.add(FoodMeasure(food_id=food_id, measure_name="bowl", grams=55))
+        db.session.flush()
+        assert grams_per_unit(food_id, "bowl") == 55
+        db.session.rollback()
+        assert grams_per_unit(food_id, "bowl") != 55
+        db.session.remove()
+
+
+def test_orm_commit_bumps_version(app):
+    with app.app_context():
+        food_id = _oats()
+        before = get_catalog_version(MEASURE_CATALOG)
+        db.session.add(FoodMeasure(food_id=food_id, measure_name="scoop", grams=40))
+        db.session.commit()
+        assert get_catalog_version(MEASURE_CATALOG) == before + 1
+        assert grams_per_unit(food_id, "scoop") == 40
+        db.session.remove()
+
+
+def test_core_write_seen_after_version_bump(app, monkeypatch):
+    with app.app_context():
+        food_id = _oats()
+        monkeypatch.setattr(nutrition, "VERSION_CHECK_INTERVAL", 3600.0)
+        assert grams_per_unit(food_id, "cup") == 81
+
+        # Another process rewrites the measure with Core and bumps the version.
+        table = FoodMeasure.__table__
+        db.session.execute(
+            table.update().where(table.c.food_id == food_id, table.c.measure_name == "cup").values(grams=90)
+        )
+        bump_catalog_version(MEASURE_CATALOG)
+        db.session.commit()
+
+        assert grams_per_unit(food_id, "cup") == 81  # within the poll interval
+        monkeypatch.setattr(nutrition, "VERSION_CHECK_INTERVAL", 0.0)
+        assert grams_per_unit(food_id, "cup") == 90
+
+        db.session.execute(
+            table.update().where(table.c.food_id == food_id, table.c.measure_name == "cup").values(grams=81)
+        )
+        bump_catalog_version(MEASURE_CATALOG)
+        db.session.commit()
+        db.session.remove()
+
+
+def test_new_food_and_macro_edits_do_not_bump(app):
+    with app.app_context():
+        before = get_catalog_version(MEASURE_CATALOG)
+        food = Food(name="Test crackers", calories=400, protein_g=8, carbs_g=70, fats_g=10)
+        db.session.add(food)
+        db.session.commit()
+        food.calories = 410
+        db.session.commit()
+        assert get_catalog_version(MEASURE_CATALOG) == before
+
+        food.serving_unit = "cracker"
+        db.session.commit()
+        assert get_catalog_version(MEASURE_CATALOG) == before + 1
+
+        db.session.delete(food)
+        db.session.commit()
+        db.session.remove()
+
+
+def test_bump_creates_missing_row_then_increments(app):
+    with app.app_context():
+        assert get_catalog_version("test_catalog") == 0
+        assert bump_catalog_version("test_catalog") == 1
+        assert bump_catalog_version("test_catalog") == 2
+        db.session.commit()
+        assert get_catalog_version("test_catalog") == 2
+        db.session.execute(db.delete(CatalogVersion).where(CatalogVersion.name == "test_catalog"))
+        db.session.commit()
+        db.session.remove()
@@ -0,0 +1,44 @@
+"""Perf instrumentation: the debug endpoint stays closed and failed statements do not leak timers."""
+import pytest
+from flask import Flask
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from app.services.perf import init_perf, record_queries
+
+
+def _perf_app(**config):
+    # create_app() wires perf from the environment; build a bare app so the
+    # flags under test are what init_perf sees.
+    app = Flask(__name__)
+    app.config.from_object("config.Config")
+    app.config.update(TESTING=True, PERF_INSTRUMENTATION=True, **config)
+    init_perf(app)
+    return app
+
+
+def test_debug_endpoint_off_by_default():
+    app = _perf_app()
+    assert app.test_client().get("/_debug/perf").status_code == 404
+
+
+def test_debug_endpoint_requires_token():
+    app = _perf_app(PERF_DEBUG_ENDPOINT=True, PERF_DEBUG_TOKEN="s3cret")
+    client = app.test_client()
+    # Loopback alone is not enough.
+    assert client.get("/_debug/perf", environ_base={"REMOTE_ADDR": "127.0.0.1"}).status_code == 404
+    assert client.get("/_debug/perf", headers={"X-Perf-Token": "wrong"}).status_code == 404
+    response = client.get("/_debug/perf", headers={"X-Perf-Token": "s3cret"})
+    assert response.status_code == 200
+    assert "endpoints" in response.get_json()
+
+
+def test_failed_statement_does_not_leak_timer(app):
+    with app.app_context():
+        with db.engine.connect() as connection:
+            with record_queries() as recorder:
+                with pytest.raises(OperationalError):
+                    connection.exec_driver_sql("SELECT * FROM no_such_table")
+                connection.exec_driver_sql("SELECT 1")
+            assert connection.info.get("perf_query_start") == []
+            assert recorder.count == 1
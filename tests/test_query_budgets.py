@@ -0,0 +1,80 @@
+"""Pin the number of SQL statements the main pages run.
+
+Budgets are the current counts against the seeded data set (a year of
+history for one member, 100 clients for the trainer), so a change that adds
+a query per row, day or client fails here. If a change legitimately needs
+another query, raise the budget in the same commit and say why.
+"""
+from datetime import date
+
+import pytest
+
+from tests.query_budget import QueryBudgetExceeded, assert_max_queries
+
+
+@pytest.mark.parametrize(
+    "query_string, budget",
+    [
+        ("", 8),
+        ("?view=calendar", 11),
+        ("?view=calendar&day={today}", 12),
+        ("?view=profile", 10),
+    ],
+    ids=["today", "calendar", "calendar-day", "profile"],
+)
+def test_member_dashboard(member_client, query_string, budget):
+    url = "/member/dashboard" + query_string.format(today=date.today().isoformat())
+    with assert_max_queries(budget, url):
+        response = member_client.get(url)
+    assert response.status_code == 200
+
+
+def test_member_summary(member_client):
+    with assert_max_queries(7, "member_summary"):
+        response = member_client.get("/member/summary")
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize(
+    "query_string",
+    ["q=banana&unit=cup&quantity=2", "q=rice", "q=chicken+breast&unit=g&quantity=150"],
+)
+def test_search_foods(member_client, query_string):
+    with assert_max_queries(4, "search_foods"):
+        response = member_client.get("/member/search-foods?" + query_string)
+    assert response.status_code == 200
+    assert response.get_json()["results"]
+
+
+def test_dashboard_trainer(trainer_client):
+    with assert_max_queries(4, "dashboard_trainer"):
+        response = trainer_client.get("/trainer/dashboard-trainer")
+    assert response.status_code == 200
+    assert b"Client99" in response.data
+
+
+def test_client_detail(trainer_client, seeded):
+    with assert_max_queries(10, "client_detail"):
+        response = trainer_client.get(f"/trainer/clients/{seeded['member_id']}")
+    assert response.status_code == 200
+
+
+def test_client_summary_view(trainer_client, seeded):
+    with assert_max_queries(8, "client_summary_view"):
+        response = trainer_client.get(f"/trainer/clients/{seeded['member_id']}/summary-view")
+    assert response.status_code == 200
+
+
+def test_budget_failure_lists_repeated_statements(app, seeded):
+    from app import db
+    from app.models import User
+
+    with app.app_context():
+        with pytest.raises(QueryBudgetExceeded) as excinfo:
+            with assert_max_queries(2, "per-row loop"):
+                for user_id in range(1, 6):
+                    db.session.get(User, user_id)
+        db.session.remove()
+    message = str(excinfo.value)
+    assert "ran 5 queries, budget is 2" in message
+    assert "5x SELECT user.id" in message
@@ -0,0 +1,49 @@
+"""Fail when a main page starts scanning one of the large tables.
+
+Runs the same statements the index advisor checks (``scripts/index_advisor.py``)
+against the seeded data set, where the member's history tables hold a few
+hundred to a couple of thousand rows.
+"""
+from app import db
+from app.services.perf import record_queries
+from scripts.index_advisor import analyse
+
+MIN_ROWS = 150
+
+
+def _capture(client, urls):
+    captured = {}
+    with record_queries(keep_samples=True) as recorder:
+        for url in urls:
+            assert client.get(url).status_code == 200
+    for normalized, sample in recorder.samples.items():
+        captured[normalized] = {"sample": sample, "routes": {"test"}, "count": recorder.statements[normalized][0]}
+    return captured
+
+
+def _scans(app, captured):
+    with app.app_context():
+        with db.engine.connect() as connection:
+            return [item for item in analyse(connection, captured, MIN_ROWS) if item["scans"]]
+
+
+def test_member_pages_use_indexes(app, member_client):
+    captured = _capture(member_client, [
+        "/member/dashboard",
+        "/member/dashboard?view=calendar",
+        "/member/dashboard?view=profile",
+        "/member/summary",
+        "/member/summary/chart-data",
+        "/member/get-totals",
+    ])
+    assert _scans(app, captured) == []
+
+
+def test_trainer_pages_use_indexes(app, trainer_client, seeded):
+    captured = _capture(trainer_client, [
+        "/trainer/dashboard-trainer",
+        "/trainer/roster",
+        f"/trainer/clients/{seeded['member_id']}",
+        f"/trainer/clients/{seeded['member_id']}/summary-view",
+    ])
+    assert _scans(app, captured) == []
@@ -0,0 +1,79 @@
+"""USDA refresh: stored daily totals are rebuilt only for days whose food macros moved."""
+from datetime import date
+
+import pytest
+
+from app import db
+from app.models import DailyNutritionTotal, Food, UserFoodLog
+from app.services.daily_totals import get_totals_between
+from app.services.usda_import import UsdaBulkLoader, normalize_fdc_food
+
+SOURCE_ID = "test-fdc-1"
+# Well before the seeded history, so no other logs share these days.
+DAYS = (date(2001, 3, 1), date(2001, 3, 2))
+
+
+def _record(protein):
+    nutrients = [("Energy", "kcal", 380), ("Protein", "g", protein),
+                 ("Carbohydrate, by difference", "g", 68), ("Total lipid (fat)", "g", 6.5)]
+    return {
+        "fdcId": SOURCE_ID,
+        "description": "Test oats",
+        "foodNutrients": [
+            {"nutrient": {"name": name, "unitName": unit}, "amount": amount} for name, unit, amount in nutrients
+        ],
+    }
+
+
+@pytest.fixture
+def logged_food(app, seeded):
+    with app.app_context():
+        # Imported before content hashes existed: same macros, no stored hash.
+        food = Food(
+            name="Test oats", source_id=SOURCE_ID, calories=380, protein_g=13, carbs_g=68, fats_g=6.5,
+            serving_size=100, serving_unit="g",
+        )
+        db.session.add(food)
+        db.session.flush()
+        for day in DAYS:
+            db.session.add(UserFoodLog(
+                user_id=seeded["member_id"], food_id=food.id, quantity=100, unit="g", log_date=day,
+            ))
+        db.session.commit()
+        food_id = food.id
+        db.session.remove()
+    yield food_id
+    with app.app_context():
+        for log in UserFoodLog.query.filter_by(food_id=food_id).all():
+            db.session.delete(log)
+        db.session.delete(db.session.get(Food, food_id))
+        db.session.commit()
+        db.session.remove()
+
+
+def _load(record):
+    loader = UsdaBulkLoader()
+    loader.add(normalize_fdc_food(record))
+    loader.flush()
+    return loader.counts
+
+
+def test_missing_hash_with_same_macros_skips_totals(app, logged_food):
+    with app.app_context():
+        counts = _load(_record(protein=13))
+        assert counts["changed"] == 1
+        assert counts["totals_rebuilt"] == 0
+        assert db.session.get(Food, logged_food).content_hash is not None
+        db.session.remove()
+
+
+def test_macro_change_rebuilds_only_logged_days(app, seeded, logged_food):
+    with app.app_context():
+        before = db.session.get(DailyNutritionTotal, (seeded["member_id"], DAYS[0])).protein_g
+        counts = _load(_record(protein=20))
+        assert counts["totals_rebuilt"] == len(DAYS)
+        for day in DAYS:
+            row = db.session.get(DailyNutritionTotal, (seeded["member_id"], day))
+            assert row.protein_g == pytest.approx(get_totals_between(seeded["member_id"], day, day)["protein"])
+        assert row.protein_g == pytest.approx(20) and before == pytest.approx(13)
+        db.session.remove()
@@ -0,0 +1,148 @@
+"""Edge cases of the FDC streaming reader and the raw record slicer.
+
+Buffer sizes are patched down to a few bytes so records, strings, escape
+runs and multi-byte characters straddle read boundaries.
+"""
+import json
+
+import pytest
+
+from app.services import usda_stream
+from app.services.usda_stream import FdcFormatError, iter_fdc_foods, iter_fdc_record_batches
+
+RECORDS = [
+    {"fdcId": 1, "description": 'Say "cheese" \\"quoted\\"'},
+    {"fdcId": 2, "description": "Trailing backslashes \\\\", "note": "\\\\\\\"x"},
+    {"fdcId": 3, "description": "Braces { [ inside } ] strings", "tags": ["{", "]", "}}"]},
+    {"fdcId": 4, "description": "Crème brûlée – 甜点 🍮", "nested": {"a": [1, {"b": "}"}]}},
+    {"fdcId": 5, "description": "plain", "foodPortions": [{"gramWeight": 30.5, "modifier": "cup"}]},
+]
+
+
+def _write(tmp_path, text, name="foods.json", bom=False):
+    path = tmp_path / name
+    data = text.encode("utf-8")
+    path.write_bytes((b"\xef\xbb\xbf" if bom else b"") + data)
+    return str(path)
+
+
+def _fdc_file(tmp_path, records=RECORDS, **kwargs):
+    body = ",\n  ".join(json.dumps(record, ensure_ascii=False) for record in records)
+    return _write(tmp_path, '{"BrandedFoods": [\n  ' + body + "\n]}\n", **kwargs)
+
+
+@pytest.fixture(params=[3, 7, 1 << 20], ids=["read3", "read7", "read1M"])
+def small_reads(request, monkeypatch):
+    monkeypatch.setattr(usda_stream, "READ_SIZE", request.param)
+    monkeypatch.setattr(usda_stream, "SLICE_READ_SIZE", request.param)
+    return request.param
+
+
+def _foods(path, start_offset=None):
+    return list(iter_fdc_foods(path, start_offset))
+
+
+def _batches(path, start_offset=None, batch_size=2):
+    return list(iter_fdc_record_batches(path, start_offset, batch_size=batch_size))
+
+
+# -- iter_fdc_foods ----------------------------------------------------------
+
+
+def test_decodes_tricky_strings(tmp_path, small_reads):
+    path = _fdc_file(tmp_path)
+    assert [record for record, _ in _foods(path)] == RECORDS
+
+
+def test_offsets_are_byte_offsets(tmp_path, small_reads):
+    path = _fdc_file(tmp_path)
+    data = open(path, "rb").read()
+    for record, end_offset in _foods(path):
+        # The byte just before the offset closes the record.
+        assert data[end_offset - 1:end_offset] == b"}"
+        assert json.loads(data[:end_offset].rsplit(b"\n  ", 1)[-1].lstrip(b"[ \n")) == record
+
+
+def test_bom_and_bare_array(tmp_path, small_reads):
+    body = "[" + ",".join(json.dumps(record, ensure_ascii=False) for record in RECORDS) + "]"
+    path = _write(tmp_path, body, bom=True)
+    assert usda_stream.fdc_dataset_name(path) is None
+    assert [record for record, _ in _foods(path)] == RECORDS
+    assert [json.loads(raw) for batch, _ in _batches(path) for raw in batch] == RECORDS
+
+
+def test_dataset_key_after_other_keys(tmp_path):
+    body = ",".join(json.dumps(record) for record in RECORDS)
+    path = _write(tmp_path, '{"meta": {"x": [1, "]"]}, "SRLegacyFoods": [' + body + "]}")
+    assert usda_stream.fdc_dataset_name(path) == "SRLegacyFoods"
+    assert [record for record, _ in _foods(path)] == RECORDS
+
+
+@pytest.mark.parametrize("resume_after", range(len(RECORDS)))
+def test_resume_from_each_offset(tmp_path, small_reads, resume_after):
+    path = _fdc_file(tmp_path)
+    offsets = [offset for _, offset in _foods(path)]
+    resumed = [record for record, _ in _foods(path, offsets[resume_after])]
+    assert resumed == RECORDS[resume_after + 1:]
+
+
+def test_empty_array(tmp_path):
+    path = _write(tmp_path, '{"FoundationFoods": []}')
+    assert _foods(path) == []
+    assert _batches(path) == []
+
+
+@pytest.mark.parametrize("cut", [-3, -6, -20, -60])
+def test_truncated_file_raises(tmp_path, small_reads, cut):
+    path = _fdc_file(tmp_path)
+    data = open(path, "rb").read()
+    truncated = _write(tmp_path, data[:cut].decode("utf-8", "ignore"), name="truncated.json")
+    with pytest.raises(FdcFormatError):
+        _foods(truncated)
+    with pytest.raises(FdcFormatError):
+        _batches(truncated)
+
+
+def test_not_an_fdc_file(tmp_path):
+    with pytest.raises(FdcFormatError):
+        _foods(_write(tmp_path, '"just a string"'))
+    with pytest.raises(FdcFormatError):
+        _foods(_write(tmp_path, '{"Other": [1, 2]}', name="other.json"))
+
+
+# -- raw record slicing ------------------------------------------------------
+
+
+def test_record_bounds_escapes():
+    # An even backslash run before a quote does not escape it; an odd run does.
+    buf = b'{"a": "x\\\\"}, {"b": "y\\"}"}, {"c": "\\\\\\"}"}]'
+    starts, ends, closed = usda_stream._record_bounds(buf)
+    assert closed
+    assert [json.loads(buf[start:end + 1]) for start, end in zip(starts, ends)] == [
+        {"a": "x\\"}, {"b": 'y"}'}, {"c": '\\"}'},
+    ]
+
+
+def test_record_bounds_incomplete_tail():
+    buf = b'{"a": 1}, {"b": "}{'
+    starts, ends, closed = usda_stream._record_bounds(buf)
+    assert not closed
+    assert len(starts) == 2 and len(ends) == 1
+
+
+def test_batches_match_streaming_reader(tmp_path, small_reads):
+    path = _fdc_file(tmp_path)
+    foods = _foods(path)
+    batches = _batches(path)
+    assert [json.loads(raw) for batch, _ in batches for raw in batch] == [record for record, _ in foods]
+    # Batch offsets are the offsets of the last record in each batch.
+    food_offsets = [offset for _, offset in foods]
+    assert [offset for _, offset in batches] == [food_offsets[1], food_offsets[3], food_offsets[4]]
+
+
+@pytest.mark.parametrize("resume_after", range(len(RECORDS)))
+def test_batches_resume_without_gaps(tmp_path, small_reads, resume_after):
+    path = _fdc_file(tmp_path)
+    offsets = [offset for _, offset in _foods(path)]
+    resumed = [json.loads(raw) for batch, _ in _batches(path, offsets[resume_after]) for raw in batch]
+    assert resumed == RECORDS[resume_after + 1:]